@@ -0,0 +1,75 @@
+"""
+Compare the default and fast conversion of algorithm output to a parquet table.
+
+Data extraction and preprocessing steps return a pandas DataFrame that the wrapper
+converts to an Arrow table. For a wide numeric frame and a string-heavy frame, the
+time of the default conversion (index stored, schema inferred) is compared with
+the fast path of `@data_extraction(preserve_index=False,
+schema=..., nthreads=...)`.
+
+Run as:
+
+    python benchmarks/convert_to_parquet.py [number of rows]
+
+in an environment where `vantage6-algorithm-tools` is installed.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from vantage6.algorithm.decorator.action import _convert_to_parquet
+
+n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+repeats = 3
+nthreads = os.cpu_count()
+
+rng = np.random.default_rng(0)
+frames = {
+    "wide (500 float columns)": pd.DataFrame(
+        rng.normal(size=(n_rows, 500)), columns=[f"x{i}" for i in range(500)]
+    ),
+    "string-heavy (10 text columns)": pd.DataFrame(
+        {
+            f"text{i}": pd.Series(
+                rng.integers(0, 1_000_000, n_rows).astype(str), dtype=object
+            )
+            for i in range(10)
+        }
+    ),
+}
+
+
+def best_of(fn) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# the conversion logs every call
+devnull = open(os.devnull, "w")
+stdout, sys.stdout = sys.stdout, devnull
+
+results = []
+for name, df in frames.items():
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    default = best_of(lambda: _convert_to_parquet(df))
+    fast = best_of(
+        lambda: _convert_to_parquet(
+            df, preserve_index=False, schema=schema, nthreads=nthreads
+        )
+    )
+    results.append((name, default, fast))
+
+sys.stdout = stdout
+print(f"{n_rows} rows, {nthreads} threads for the fast path")
+print(f"{'frame':<32} {'default s':>10} {'fast s':>8} {'speedup':>8}")
+for name, default, fast in results:
+    print(f"{name:<32} {default:>10.3f} {fast:>8.3f} {default / fast:>7.1f}x")
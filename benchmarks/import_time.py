@@ -0,0 +1,132 @@
+"""
+Import-time regression check for the algorithm container startup.
+
+Each module below is imported in a fresh interpreter with `python -X importtime`,
+with the patched vantage6 modules of `patches/` in front of the installed ones, as
+in the Docker image. For comparison the import time against the installed package
+alone (the baseline) is reported as well. The check fails (exit code 1) when
+
+- the cumulative import time of a module exceeds its budget, or
+- a module pulls in a dependency that should only be loaded by the methods that
+  need it (e.g. sqlalchemy, requests or the algorithm client).
+
+The budgets apply to the patched modules. The fastest of several runs is used, as
+import times are noisy. The budgets are generous on purpose: they catch eager heavy
+imports, not small fluctuations. Scale them with `--budget-factor` on slow
+machines.
+
+Run as:
+
+    python benchmarks/import_time.py [--runs 5] [--budget-factor 1.0]
+
+in an environment where `vantage6-algorithm-tools` is installed.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).parent.parent
+
+# module: (budget in ms, modules that must not be imported)
+BUDGETS = {
+    "vantage6.algorithm.tools.wrap": (
+        150,
+        ["pandas", "pyarrow.parquet", "sqlalchemy", "requests"],
+    ),
+    "vantage6.algorithm.decorator": (
+        900,
+        ["sqlalchemy", "SPARQLWrapper", "requests", "jwt"],
+    ),
+    "vantage6.algorithm.tools.wrappers": (
+        900,
+        ["sqlalchemy", "SPARQLWrapper"],
+    ),
+    "v6-session-basics": (
+        1000,
+        ["sqlalchemy", "SPARQLWrapper", "requests", "psutil", "dns"],
+    ),
+}
+
+
+def measure(module: str, patched: bool = True) -> tuple[float | None, set[str]]:
+    """
+    Return the cumulative import time in ms and the names of imported modules.
+
+    The time is None if the module can not be imported, e.g. the algorithm against
+    the installed package without the patches.
+    """
+    paths = [str(repo_root / "patches")] if patched else []
+    paths += [str(repo_root), os.environ.get("PYTHONPATH", "")]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, paths))}
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"__import__({module!r})",
+        ],
+        cwd=repo_root,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None, set()
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        name = name.strip()
+        if cumulative_us.strip().isdigit():
+            imported.add(name)
+            if name == module:
+                cumulative = int(cumulative_us) / 1000
+    return cumulative, imported
+
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--runs", type=int, default=5)
+parser.add_argument("--budget-factor", type=float, default=1.0)
+options = parser.parse_args()
+
+failures = []
+
+
+def fastest_of(module: str, patched: bool) -> tuple[float | None, set[str]]:
+    runs = [measure(module, patched) for _ in range(options.runs)]
+    if any(ms is None for ms, _ in runs):
+        return None, set()
+    return min(ms for ms, _ in runs), runs[0][1]
+
+
+def format_ms(ms: float | None) -> str:
+    return "n/a" if ms is None else f"{ms:.1f}"
+
+
+print(f"{'module':<36} {'ms':>8} {'baseline':>9} {'budget':>8}")
+for module, (budget, forbidden) in BUDGETS.items():
+    fastest, imported = fastest_of(module, patched=True)
+    baseline, _ = fastest_of(module, patched=False)
+    budget = budget * options.budget_factor
+    print(
+        f"{module:<36} {format_ms(fastest):>8} {format_ms(baseline):>9} "
+        f"{budget:>8.0f}"
+    )
+
+    if fastest is None:
+        failures.append(f"{module} can not be imported")
+    elif fastest > budget:
+        failures.append(f"{module} takes {fastest:.0f} ms, budget is {budget:.0f} ms")
+    for name in forbidden:
+        if name in imported:
+            failures.append(f"{module} eagerly imports {name}")
+
+for failure in failures:
+    print(f"FAIL: {failure}")
+sys.exit(1 if failures else 0)
@@ -0,0 +1,78 @@
+"""
+Compare reading the session dataframes of `@data` one by one and concurrently.
+
+For 2, 3 and 4 large parquet files in a session folder, the time to read them one
+after another (as `@data` used to do) and through the thread pool of `@data` is
+reported.
+
+Run as:
+
+    python benchmarks/parallel_data_loading.py [number of rows per file]
+
+in an environment where `vantage6-algorithm-tools` is installed.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+repeats = 3
+
+session_folder = tempfile.mkdtemp(prefix="v6-data-bench-")
+os.environ["SESSION_FOLDER"] = session_folder
+
+# imported after setting the session folder, which is read once per process
+from vantage6.algorithm.decorator.data import (  # noqa: E402
+    _read_df_from_disk,
+    _read_dfs_from_disk,
+)
+
+rng = np.random.default_rng(0)
+names = [f"df{i}" for i in range(4)]
+for name in names:
+    pd.DataFrame(
+        {
+            "patient_id": np.arange(n_rows),
+            "age": rng.integers(18, 95, n_rows),
+            "weight": rng.normal(75, 12, n_rows),
+            "systolic": rng.normal(125, 15, n_rows),
+            "site": rng.choice([f"hospital-{i}" for i in range(20)], n_rows),
+        }
+    ).to_parquet(os.path.join(session_folder, f"{name}.parquet"))
+
+
+def best_of(fn) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# the decorators log every file they read
+devnull = open(os.devnull, "w")
+stdout, sys.stdout = sys.stdout, devnull
+
+results = []
+for n_files in range(2, len(names) + 1):
+    selected = names[:n_files]
+    sequential = best_of(lambda: [_read_df_from_disk(name) for name in selected])
+    parallel = best_of(lambda: _read_dfs_from_disk(selected))
+    results.append((n_files, sequential, parallel))
+
+sys.stdout = stdout
+print(f"{n_rows} rows per file")
+print(f"{'files':>5} {'sequential s':>13} {'parallel s':>11} {'speedup':>8}")
+for n_files, sequential, parallel in results:
+    print(
+        f"{n_files:>5} {sequential:>13.3f} {parallel:>11.3f} "
+        f"{sequential / parallel:>7.1f}x"
+    )
+shutil.rmtree(session_folder)
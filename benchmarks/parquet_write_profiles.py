@@ -0,0 +1,77 @@
+"""
+Benchmark matrix of parquet write profiles for session dataframes.
+
+For a typical session table (numeric measurements, low-cardinality categoricals,
+free text and dates) every profile is used to write the table as the wrapper does
+for data extraction and preprocessing steps. The write time, file size and the time
+`@data` needs to read the file back are reported.
+
+Run as:
+
+    python benchmarks/parquet_write_profiles.py [number of rows]
+
+in an environment where `vantage6-algorithm-tools` is installed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from vantage6.algorithm.tools.parquet import NAMED_PROFILES, ParquetWriteProfile
+
+n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+repeats = 3
+
+rng = np.random.default_rng(0)
+df = pd.DataFrame(
+    {
+        "patient_id": np.arange(n_rows),
+        "age": rng.integers(18, 95, n_rows),
+        "weight": rng.normal(75, 12, n_rows).round(1),
+        "systolic": rng.normal(125, 15, n_rows),
+        "sex": rng.choice(["M", "F", "X"], n_rows),
+        "site": rng.choice([f"hospital-{i}" for i in range(20)], n_rows),
+        "diagnosis": rng.choice([f"ICD-{i:04d}" for i in range(2000)], n_rows),
+        "note": [f"free text note {i} " * 3 for i in rng.integers(0, 10**6, n_rows)],
+        "visit_date": pd.Timestamp("2020-01-01")
+        + pd.to_timedelta(rng.integers(0, 1500, n_rows), unit="D"),
+    }
+)
+table = pa.Table.from_pandas(df)
+
+profiles = {
+    **NAMED_PROFILES,
+    "zstd-1": ParquetWriteProfile(compression="zstd", compression_level=1),
+    "gzip": ParquetWriteProfile(compression="gzip"),
+    "snappy-no-dict": ParquetWriteProfile(use_dictionary=False),
+    "snappy-rg-64k": ParquetWriteProfile(row_group_size=65_536),
+    "snappy-no-stats": ParquetWriteProfile(write_statistics=False),
+    "zstd-sorted-site": ParquetWriteProfile(compression="zstd", sort_by="site"),
+}
+
+folder = tempfile.mkdtemp(prefix="v6-parquet-bench-")
+print(f"{n_rows} rows, {table.nbytes / 2**20:.0f} MiB in memory")
+print(f"{'profile':<18} {'write s':>8} {'size MiB':>9} {'read s':>8}")
+for name, profile in profiles.items():
+    path = os.path.join(folder, f"{name}.parquet")
+
+    write_times, read_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        profile.write_table(table, path)
+        write_times.append(time.perf_counter() - start)
+
+        # this is how the @data decorator reads session dataframes
+        start = time.perf_counter()
+        pd.read_parquet(path)
+        read_times.append(time.perf_counter() - start)
+
+    size = os.path.getsize(path) / 2**20
+    print(f"{name:<18} {min(write_times):>8.3f} {size:>9.1f} {min(read_times):>8.3f}")
+    os.remove(path)
+os.rmdir(folder)
@@ -0,0 +1,89 @@
+"""
+Compare the typed result serialization with converting results to lists first.
+
+Algorithm methods used to call `.tolist()` / `.to_dict()` on numpy and pandas
+results before returning them, as only plain JSON types could be serialized. The
+typed encoding of `vantage6.common.serialization.serialize` (``typed=True``, used
+for results that a central method reads) stores the numeric data as base64 encoded
+raw bytes instead. For a few typical result shapes the payload size and the encode
+and decode times of both approaches are reported.
+
+Run as:
+
+    python benchmarks/serialization.py [number of rows]
+
+in an environment where `vantage6-algorithm-tools` is installed.
+"""
+
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from vantage6.common.serialization import serialize
+from vantage6.common.client.deserialization import decode_typed_object
+
+n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+repeats = 5
+
+rng = np.random.default_rng(0)
+results = {
+    "gram matrix 200x200": rng.normal(size=(200, 200)),
+    "float vector": rng.normal(size=n_rows),
+    "int series": pd.Series(rng.integers(0, 1000, n_rows), name="count"),
+    "numeric frame": pd.DataFrame(
+        {
+            "age": rng.integers(18, 95, n_rows),
+            "weight": rng.normal(75, 12, n_rows),
+            "systolic": rng.normal(125, 15, n_rows),
+        }
+    ),
+}
+
+
+def as_lists(value):
+    """How results had to be converted before the typed encoding."""
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict(orient="list")
+    return value.tolist()
+
+
+def best_of(fn) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+print(
+    f"{'result':<20} {'encoding':<8} {'size MiB':>9} {'encode s':>9} "
+    f"{'decode s':>9}"
+)
+for name, value in results.items():
+    lists = as_lists(value)
+    plain = json.dumps(lists).encode()
+    typed = serialize(value, typed=True)
+
+    rows = [
+        (
+            "lists",
+            plain,
+            best_of(lambda: json.dumps(as_lists(value)).encode()),
+            best_of(lambda: json.loads(plain)),
+        ),
+        (
+            "typed",
+            typed,
+            best_of(lambda: serialize(value, typed=True)),
+            best_of(lambda: json.loads(typed, object_hook=decode_typed_object)),
+        ),
+    ]
+    for encoding, payload, encode, decode in rows:
+        print(
+            f"{name:<20} {encoding:<8} {len(payload) / 2**20:>9.2f} "
+            f"{encode:>9.4f} {decode:>9.4f}"
+        )
@@ -0,0 +1,76 @@
+"""
+Compare the memory use of materialized and streamed SQL extraction.
+
+A local SQLite table is extracted to a parquet file in two ways: by loading the
+complete result with `load_sql_data`, and by streaming it in batches with
+`load_sql_batches`, as a data extraction step would. Every mode runs in a fresh
+process, so that the peak resident memory of the process can be compared.
+
+Run as:
+
+    python benchmarks/sql_streaming.py [number of rows]
+
+in an environment where `vantage6-algorithm-tools` is installed.
+"""
+
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+QUERY = "SELECT * FROM visits"
+
+
+def extract(mode: str, database: str, output: str) -> None:
+    import pyarrow as pa
+
+    from vantage6.algorithm.tools.parquet import ParquetWriteProfile
+    from vantage6.algorithm.tools.wrappers import load_sql_batches, load_sql_data
+
+    start = time.perf_counter()
+    if mode == "materialized":
+        table = pa.Table.from_pandas(load_sql_data(database, QUERY))
+    else:
+        table = load_sql_batches(database, QUERY)
+    ParquetWriteProfile().write_table(table, output)
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:<13} {time.perf_counter() - start:>7.2f} {peak_mib:>13.0f}")
+
+
+if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+    extract(*sys.argv[2:])
+    sys.exit()
+
+n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+folder = tempfile.mkdtemp(prefix="v6-sql-bench-")
+database = os.path.join(folder, "source.sqlite")
+
+rng = np.random.default_rng(0)
+with sqlite3.connect(database) as connection:
+    for offset in range(0, n_rows, 500_000):
+        size = min(500_000, n_rows - offset)
+        pd.DataFrame(
+            {
+                "patient_id": np.arange(offset, offset + size),
+                "age": rng.integers(18, 95, size),
+                "weight": rng.normal(75, 12, size),
+                "site": rng.choice([f"hospital-{i}" for i in range(20)], size),
+            }
+        ).to_sql("visits", connection, index=False, if_exists="append")
+
+print(f"{n_rows} rows")
+print(f"{'mode':<13} {'time s':>7} {'peak RSS MiB':>13}")
+for mode in ("materialized", "streamed"):
+    subprocess.run(
+        [sys.executable, __file__, "--mode", mode, database, f"{database}.parquet"],
+        check=True,
+    )
+for name in os.listdir(folder):
+    os.remove(os.path.join(folder, name))
+os.rmdir(folder)
@@ -0,0 +1,104 @@
+"""
+Compare the throughput of cold algorithm containers with the warm worker mode.
+
+Every cold job starts a new Python process that runs `wrap_algorithm()`, like the
+Dockerfile `CMD` does. The warm jobs are submitted to a single `run_worker()` process
+through a spool directory. Both run the `echo` method of this algorithm on a small
+session dataframe.
+
+Run as:
+
+    python benchmarks/warm_worker.py [number of jobs]
+
+from the root of the repository, in an environment where the algorithm and
+`vantage6-algorithm-tools` are installed.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+repo_root = Path(__file__).parent.parent
+n_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+workdir = Path(tempfile.mkdtemp(prefix="v6-worker-bench-"))
+session_folder = workdir / "session"
+session_folder.mkdir()
+pd.read_csv(repo_root / "test" / "test_data.csv").to_parquet(
+    session_folder / "default.parquet"
+)
+
+input_file = workdir / "input.json"
+input_file.write_text(json.dumps({"args": ["hello"], "kwargs": {}}))
+
+job_env = {
+    "SESSION_FOLDER": str(session_folder),
+    "USER_REQUESTED_DATAFRAMES": "default",
+}
+base_env = {**os.environ, "PKG_NAME": "v6-session-basics"}
+
+# cold starts: one process per job
+start = time.perf_counter()
+for i in range(n_jobs):
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from vantage6.algorithm.tools.wrap import wrap_algorithm; "
+            "wrap_algorithm()",
+        ],
+        cwd=repo_root,
+        env={
+            **base_env,
+            **job_env,
+            "INPUT_FILE": str(input_file),
+            "OUTPUT_FILE": str(workdir / f"cold-{i}.out"),
+            "ALGORITHM_METHOD": "echo",
+            "FUNCTION_ACTION": "federated_compute",
+        },
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+cold = time.perf_counter() - start
+
+# warm worker: one process for all jobs
+spool = workdir / "spool"
+spool.mkdir()
+start = time.perf_counter()
+worker = subprocess.Popen(
+    [
+        sys.executable,
+        "-c",
+        "from vantage6.algorithm.tools.worker import run_worker; "
+        f"run_worker({str(spool)!r}, max_jobs={n_jobs})",
+    ],
+    cwd=repo_root,
+    env=base_env,
+    stdout=subprocess.DEVNULL,
+)
+for i in range(n_jobs):
+    job = {
+        "input_file": str(input_file),
+        "output_file": str(workdir / f"warm-{i}.out"),
+        "method": "echo",
+        "action": "federated_compute",
+        "env": job_env,
+    }
+    (spool / f"{i:06d}.tmp").write_text(json.dumps(job))
+    os.rename(spool / f"{i:06d}.tmp", spool / f"{i:06d}.job")
+worker.wait()
+warm = time.perf_counter() - start
+
+statuses = [json.loads(f.read_text())["status"] for f in spool.glob("*.done")]
+assert statuses.count("completed") == n_jobs, statuses
+
+print(f"{'mode':<6} {'jobs':>6} {'seconds':>9} {'jobs/s':>8}")
+print(f"{'cold':<6} {n_jobs:>6} {cold:>9.2f} {n_jobs / cold:>8.1f}")
+print(f"{'warm':<6} {n_jobs:>6} {warm:>9.2f} {n_jobs / warm:>8.1f}")
+print(f"speedup: {cold / warm:.1f}x")
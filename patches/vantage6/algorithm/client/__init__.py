@@ -9,8 +9,10 @@ from typing import Any
 from vantage6.common.client.client_base import ClientBase
 from vantage6.common import base64s_to_bytes, bytes_to_base64s
 from vantage6.common.enum import RunStatus, AlgorithmStepType
-from vantage6.common.serialization import serialize
+from vantage6.common.serialization import serialize, serialize_binary
+from vantage6.common.client.deserialization import decode_typed_object
 from vantage6.algorithm.tools.util import info
+from vantage6.algorithm.tools.progress import ProgressLogger
 
 # make sure the version is available
 from vantage6.algorithm.client._version import __version__  # noqa: F401
@@ -130,6 +132,9 @@ class AlgorithmClient(ClientBase):
         Poll the central server until results are available and then return
         them.
 
+        While waiting, the number of finished runs is logged periodically (see
+        ``vantage6.algorithm.tools.progress``) instead of on every poll.
+
         Parameters
         ----------
         task_id: int
@@ -142,15 +147,45 @@ class AlgorithmClient(ClientBase):
         list
             List of task results.
         """
+        progress = ProgressLogger(f"Waiting for results of task {task_id}")
         status = self.task.get(task_id).get("status")
         while not RunStatus.has_finished(status):
-            info(f"Waiting for results of task {task_id}...")
+            progress.update(lambda: self._run_progress(task_id))
             time.sleep(interval)
             status = self.task.get(task_id).get("status")
+        progress.done()
         info("Done!")
 
         return self.result.from_task(task_id)
 
+    def _run_progress(self, task_id: int) -> str | None:
+        """
+        Summarize how many runs of a task have finished.
+
+        This is only used to log the progress, so a failure to obtain the runs must
+        not end the wait for the results. In that case no summary is returned.
+
+        Parameters
+        ----------
+        task_id: int
+            ID of the task.
+
+        Returns
+        -------
+        str | None
+            Summary, e.g. '3/5 runs finished', or None if the runs could not be
+            obtained.
+        """
+        try:
+            runs = self.run.from_task(task_id)
+            finished = [
+                run for run in runs if RunStatus.has_finished(run.get("status"))
+            ]
+        except Exception as e:
+            self.log.debug(f"Could not obtain the runs of task {task_id}: {e}")
+            return None
+        return f"{len(finished)}/{len(runs)} runs finished"
+
     def _multi_page_request(self, endpoint: str, params: dict = None) -> dict:
         """
         Make multiple requests to the central server to get all pages of a list
@@ -266,7 +301,8 @@ class AlgorithmClient(ClientBase):
             if response.get("result"):
                 try:
                     result = json_lib.loads(
-                        base64s_to_bytes(response.get("result")).decode()
+                        base64s_to_bytes(response.get("result")).decode(),
+                        object_hook=decode_typed_object,
                     )
                 except Exception as e:
                     self.parent.log.error("Unable to load results")
@@ -304,7 +340,10 @@ class AlgorithmClient(ClientBase):
             decoded_results = []
             try:
                 decoded_results = [
-                    json_lib.loads(base64s_to_bytes(result.get("result")).decode())
+                    json_lib.loads(
+                        base64s_to_bytes(result.get("result")).decode(),
+                        object_hook=decode_typed_object,
+                    )
                     for result in results
                     if result.get("result")
                 ]
@@ -344,6 +383,7 @@ class AlgorithmClient(ClientBase):
             organizations: list[int] = None,
             name: str = "subtask",
             description: str = None,
+            binary_input: bool = False,
         ) -> dict:
             """
             Create a new (child) task at the central server.
@@ -365,6 +405,12 @@ class AlgorithmClient(ClientBase):
                 Name of the subtask
             description : str, optional
                 Description of the subtask
+            binary_input : bool, optional
+                Send the input in the binary input format, in which numpy arrays and
+                pyarrow tables are stored as raw buffers instead of JSON lists. The
+                subtask receives these as read-only views of its input file, so
+                they must be copied before they are modified in place. By default
+                False.
 
             Returns
             -------
@@ -381,7 +427,10 @@ class AlgorithmClient(ClientBase):
 
             # serializing input. Note that the input is not encrypted here, but
             # in the proxy server (self.parent.request())
-            serialized_input = bytes_to_base64s(serialize(input_))
+            if binary_input:
+                serialized_input = bytes_to_base64s(serialize_binary(input_))
+            else:
+                serialized_input = bytes_to_base64s(serialize(input_))
             organization_json_list = []
             for org_id in organizations:
                 organization_json_list.append({"id": org_id, "input": serialized_input})
@@ -1,8 +1,9 @@
 import pyarrow as pa
 import pandas as pd
 
-from typing import Any
+from typing import Any, Callable, Iterator
 from functools import wraps
+from itertools import chain
 
 from vantage6.common import info
 from vantage6.common.enum import AlgorithmStepType
@@ -11,6 +12,7 @@ from vantage6.algorithm.tools.exceptions import (
     SessionError,
 )
 from vantage6.algorithm.tools.util import get_action
+from vantage6.algorithm.tools.timing import phase
 
 
 def _exit_if_action_mismatch(function_action: AlgorithmStepType):
@@ -48,19 +50,41 @@ def _exit_if_action_mismatch(function_action: AlgorithmStepType):
         )
 
 
-def _convert_to_parquet(data: Any) -> pa.Table:
+def _convert_to_parquet(
+    data: Any,
+    preserve_index: bool | None = None,
+    schema: pa.Schema | None = None,
+    nthreads: int | None = None,
+) -> pa.Table | pa.RecordBatchReader:
     """
     Convert the algorithm output to a Parquet Table.
 
+    Supported outputs are pandas DataFrames (including subclasses), pyarrow Tables
+    and RecordBatches, and streams of data: a pyarrow RecordBatchReader or an
+    iterator of RecordBatches and/or DataFrames. Streams are returned as a
+    RecordBatchReader, so that the wrapper writes them batch by batch without
+    holding the complete table in memory.
+
     Parameters
     ----------
     data : Any
         The algorithm output data.
+    preserve_index : bool | None
+        Whether to store the index of DataFrames. The default (None) stores it
+        as metadata if it is a RangeIndex and as column(s) otherwise. False skips
+        the index, which is faster.
+    schema : pa.Schema | None
+        Schema of the output. Declaring it up front saves inferring the types from
+        the data, and makes every batch of a stream use the same types.
+    nthreads : int | None
+        Number of threads used to convert DataFrame columns. The default (None)
+        follows ``pyarrow.cpu_count()``, 1 converts the columns one by one, which
+        avoids oversubscribing the CPUs of a container with a CPU limit.
 
     Returns
     -------
-    pa.Table
-        The converted Parquet Table.
+    pa.Table | pa.RecordBatchReader
+        The converted Parquet Table, or a reader for streams.
 
     Raises
     ------
@@ -70,60 +94,157 @@ def _convert_to_parquet(data: Any) -> pa.Table:
         If the data extraction function returns an unsupported dataframe type.
     """
     info("Converting algorithm output to a Parquet Table.")
-    match type(data):
-
-        case pd.DataFrame:
-            try:
-                data = pa.Table.from_pandas(data)
-            except Exception as e:
-                raise SessionError(
-                    "Could not convert DataFrame to Parquet Table"
-                ) from e
-            return data
-
-        case pa.Table:
-            return data
-        case _:
-            raise DataTypeError(
-                "Data extraction function did not return a supported data "
-                f"frame type. Got {type(data)} instead. Supported types are: "
-                "pandas.DataFrame, pyarrow.Table."
+    if isinstance(data, pd.DataFrame):
+        try:
+            return pa.Table.from_pandas(
+                data, schema=schema, preserve_index=preserve_index, nthreads=nthreads
             )
+        except Exception as e:
+            raise SessionError("Could not convert DataFrame to Parquet Table") from e
+    elif isinstance(data, pa.Table):
+        return data.cast(schema) if schema is not None else data
+    elif isinstance(data, pa.RecordBatch):
+        table = pa.Table.from_batches([data])
+        return table.cast(schema) if schema is not None else table
+    elif isinstance(data, pa.RecordBatchReader):
+        return data
+    elif isinstance(data, Iterator):
+        return _stream_to_reader(data, preserve_index, schema, nthreads)
+
+    raise DataTypeError(
+        "Data extraction function did not return a supported data "
+        f"frame type. Got {type(data)} instead. Supported types are: "
+        "pandas.DataFrame, pyarrow.Table, pyarrow.RecordBatch, "
+        "pyarrow.RecordBatchReader and iterators of RecordBatches or DataFrames."
+    )
+
+
+def _stream_to_reader(
+    batches: Iterator,
+    preserve_index: bool | None,
+    schema: pa.Schema | None,
+    nthreads: int | None,
+) -> pa.RecordBatchReader:
+    """
+    Wrap an iterator of RecordBatches and/or DataFrames in a RecordBatchReader.
 
+    Without a schema, the schema of the first batch is used for all batches.
+    """
 
-def data_extraction(func: callable) -> callable:
-    """Decorator for data extraction functions."""
-
-    @wraps(func)
-    def wrapper(*args, **kwargs) -> callable:
+    def to_batch(batch: Any, schema: pa.Schema | None) -> pa.RecordBatch:
+        if isinstance(batch, pd.DataFrame):
+            batch = pa.RecordBatch.from_pandas(
+                batch, schema=schema, preserve_index=preserve_index, nthreads=nthreads
+            )
+        elif not isinstance(batch, pa.RecordBatch):
+            raise DataTypeError(
+                "Data extraction function returned an iterator with an unsupported "
+                f"item type {type(batch)}. Use pyarrow.RecordBatch or "
+                "pandas.DataFrame."
+            )
+        if schema is None or batch.schema == schema:
+            return batch
+        return batch.cast(schema)
 
-        # Validate that the correct action is invoked in combination with the function
-        # that is wrapped by this decorator.
-        _exit_if_action_mismatch(AlgorithmStepType.DATA_EXTRACTION)
+    first = next(batches, None)
+    if first is None:
+        if schema is None:
+            raise DataTypeError(
+                "Data extraction function returned an empty iterator. Declare the "
+                "schema of the output to allow empty results."
+            )
+        return pa.RecordBatchReader.from_batches(schema, iter([]))
+
+    first = to_batch(first, schema)
+    schema = first.schema
+    return pa.RecordBatchReader.from_batches(
+        schema,
+        chain([first], (to_batch(batch, schema) for batch in batches)),
+    )
+
+
+def _session_action(
+    action: AlgorithmStepType,
+    func: Callable | None,
+    preserve_index: bool | None,
+    schema: pa.Schema | None,
+    nthreads: int | None,
+) -> callable:
+    """
+    Create the decorator of an action that stores its output in the session.
 
-        # TODO: should we add the data in here??
-        result = func(*args, **kwargs)
+    The decorator can be used with or without arguments, see ``data_extraction``.
+    """
 
-        return _convert_to_parquet(result)
+    def decorator(func: callable) -> callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> callable:
 
-    return wrapper
+            # Validate that the correct action is invoked in combination with the
+            # function that is wrapped by this decorator.
+            with phase("validate_action"):
+                _exit_if_action_mismatch(action)
 
+            result = func(*args, **kwargs)
 
-def pre_processing(func: callable) -> callable:
-    """Decorator for pre-processing functions."""
+            with phase("convert_to_parquet"):
+                return _convert_to_parquet(
+                    result,
+                    preserve_index=preserve_index,
+                    schema=schema,
+                    nthreads=nthreads,
+                )
 
-    @wraps(func)
-    def wrapper(*args, **kwargs) -> callable:
+        return wrapper
 
-        # Validate that the correct action is invoked in combination with the function
-        # that is wrapped by this decorator.
-        _exit_if_action_mismatch(AlgorithmStepType.PREPROCESSING)
+    return decorator(func) if func is not None else decorator
 
-        result = func(*args, **kwargs)
 
-        return _convert_to_parquet(result)
+def data_extraction(
+    func: Callable | None = None,
+    *,
+    preserve_index: bool | None = None,
+    schema: pa.Schema | None = None,
+    nthreads: int | None = None,
+) -> callable:
+    """
+    Decorator for data extraction functions.
+
+    The function may return a pandas DataFrame, a pyarrow Table or RecordBatch, or
+    a stream of data (a RecordBatchReader or an iterator of RecordBatches or
+    DataFrames). The options tune the conversion to parquet, see
+    ``_convert_to_parquet``.
+
+    Examples
+    --------
+    >>> @data_extraction
+    >>> def read_file(connection_details: dict) -> pd.DataFrame:
+    >>>     ...
+
+    >>> @data_extraction(preserve_index=False, nthreads=4)
+    >>> def read_large_file(connection_details: dict) -> pd.DataFrame:
+    >>>     ...
+    """
+    return _session_action(
+        AlgorithmStepType.DATA_EXTRACTION, func, preserve_index, schema, nthreads
+    )
+
+
+def pre_processing(
+    func: Callable | None = None,
+    *,
+    preserve_index: bool | None = None,
+    schema: pa.Schema | None = None,
+    nthreads: int | None = None,
+) -> callable:
+    """
+    Decorator for pre-processing functions.
 
-    return wrapper
+    Accepts the same outputs and options as ``data_extraction``.
+    """
+    return _session_action(
+        AlgorithmStepType.PREPROCESSING, func, preserve_index, schema, nthreads
+    )
 
 
 def federated(func: callable) -> callable:
@@ -131,7 +252,8 @@ def federated(func: callable) -> callable:
 
     @wraps(func)
     def wrapper(*args, **kwargs) -> callable:
-        _exit_if_action_mismatch(AlgorithmStepType.FEDERATED_COMPUTE)
+        with phase("validate_action"):
+            _exit_if_action_mismatch(AlgorithmStepType.FEDERATED_COMPUTE)
         result = func(*args, **kwargs)
         return result
 
@@ -143,7 +265,8 @@ def central(func: callable) -> callable:
 
     @wraps(func)
     def wrapper(*args, **kwargs) -> callable:
-        _exit_if_action_mismatch(AlgorithmStepType.CENTRAL_COMPUTE)
+        with phase("validate_action"):
+            _exit_if_action_mismatch(AlgorithmStepType.CENTRAL_COMPUTE)
         result = func(*args, **kwargs)
         return result
 
@@ -1,12 +1,14 @@
-import os
+from __future__ import annotations
 
 from functools import wraps
+from typing import TYPE_CHECKING
 
-from vantage6.common.globals import ContainerEnvNames
-from vantage6.algorithm.client import AlgorithmClient
-from vantage6.algorithm.tools.mock_client import MockAlgorithmClient
+from vantage6.algorithm.tools.context import get_context
 from vantage6.algorithm.tools.util import info, error
 
+if TYPE_CHECKING:
+    from vantage6.algorithm.tools.mock_client import MockAlgorithmClient
+
 
 def _algorithm_client() -> callable:
     """
@@ -58,7 +60,8 @@ def _algorithm_client() -> callable:
                 return func(mock_client, *args, **kwargs)
 
             # read token from the environment
-            token = os.environ.get(ContainerEnvNames.CONTAINER_TOKEN.value)
+            context = get_context()
+            token = context.token
             if not token:
                 error(
                     "Token not found. Is the method you called started as a "
@@ -67,11 +70,16 @@ def _algorithm_client() -> callable:
                 exit(1)
 
             # read server address from the environment
-            host = os.environ[ContainerEnvNames.HOST.value]
-            port = os.environ[ContainerEnvNames.PORT.value]
-            api_path = os.environ[ContainerEnvNames.API_PATH.value]
-
-            client = AlgorithmClient(token=token, host=host, port=port, path=api_path)
+            # imported here as the client stack is only needed by methods that are
+            # actually called with this decorator
+            from vantage6.algorithm.client import AlgorithmClient
+
+            client = AlgorithmClient(
+                token=token,
+                host=context.host,
+                port=context.port,
+                path=context.api_path,
+            )
             return func(client, *args, **kwargs)
 
         # set attribute that this function is wrapped in an algorithm client
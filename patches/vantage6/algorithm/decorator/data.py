@@ -1,10 +1,29 @@
+from __future__ import annotations
+
 import os
+import inspect
 import pandas as pd
 
-from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from typing import TYPE_CHECKING
 
-from vantage6.common.globals import ContainerEnvNames
+from vantage6.algorithm.tools.context import get_context
+from vantage6.algorithm.tools.dataframe_cache import get_dataframe_cache
+from vantage6.algorithm.tools.lazy_dataframe import LazyDataFrame
+from vantage6.algorithm.tools.exceptions import DataTypeError
 from vantage6.algorithm.tools.util import info, error, warn
+from vantage6.algorithm.tools.timing import phase
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# the forms in which @data can provide the dataframes to the function
+PANDAS = "pandas"
+ARROW = "arrow"
+PANDAS_ARROW = "pandas_arrow"
+LAZY = "lazy"
+DATA_BACKENDS = (PANDAS, ARROW, PANDAS_ARROW, LAZY)
 
 
 def _get_user_dataframes() -> list[str]:
@@ -16,11 +35,15 @@ def _get_user_dataframes() -> list[str]:
     list[str]
         List of database names
     """
-    dfs = os.environ[ContainerEnvNames.USER_REQUESTED_DATAFRAMES.value]
-    return dfs.split(",")
+    return list(get_context().dataframes)
 
 
-def _read_df_from_disk(df_name: str) -> pd.DataFrame:
+def _read_df_from_disk(
+    df_name: str,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+    backend: str = PANDAS,
+) -> pd.DataFrame | pa.Table | LazyDataFrame:
     """
     Load data from a dataframe file
 
@@ -28,23 +51,217 @@ def _read_df_from_disk(df_name: str) -> pd.DataFrame:
     ----------
     df_name : str
         Label of the database to load
+    columns : list[str] | None
+        Columns to read, None to read all columns
+    filters : list[tuple] | None
+        Row filters, as ``(column, operator, value)`` tuples that all have to hold.
+        Row groups that can not match are skipped using the parquet statistics.
+    backend : str
+        Form of the data: 'pandas' for a pandas DataFrame, 'arrow' for a memory
+        mapped pyarrow Table, 'pandas_arrow' for a pandas DataFrame backed by
+        pyarrow arrays and 'lazy' for a LazyDataFrame.
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame | pa.Table | LazyDataFrame
         Data from the database
     """
     # Load the dataframe by the user specified df name. The dataframes are always stored
     # in the session folder, which is set by the vantage6 node. The label is the name of
     # the dataframe file, which is set by the user when creating the task.
-    dataframe_folder = os.environ[ContainerEnvNames.SESSION_FOLDER.value]
+    dataframe_folder = get_context().session_folder
     dataframe_file = os.path.join(dataframe_folder, f"{df_name}.parquet")
     info(f"Using '{dataframe_file}' with dataframe name '{df_name}' as database")
 
-    return pd.read_parquet(dataframe_file)
+    if backend == LAZY:
+        # only the schema is read here, the columns are read when they are used
+        return LazyDataFrame(dataframe_file, columns=columns, filters=filters)
+
+    # the file is read again when it is rewritten, e.g. by a preprocessing step
+    cache = get_dataframe_cache()
+    if cache.enabled:
+        stat = os.stat(dataframe_file)
+        key = (
+            dataframe_file,
+            stat.st_mtime_ns,
+            stat.st_size,
+            tuple(columns) if columns is not None else None,
+            repr(filters),
+            backend,
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        return cache.put(key, _read_parquet(dataframe_file, columns, filters, backend))
+    return _read_parquet(dataframe_file, columns, filters, backend)
+
+
+def _read_parquet(
+    path: str, columns: list[str] | None, filters: list[tuple] | None, backend: str
+) -> pd.DataFrame | pa.Table:
+    """Read a parquet file, see ``_read_df_from_disk`` for the parameters."""
+    if backend == ARROW:
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+    elif backend == PANDAS_ARROW:
+        return pd.read_parquet(
+            path,
+            columns=columns,
+            filters=filters,
+            memory_map=True,
+            dtype_backend="pyarrow",
+        )
+    return pd.read_parquet(path, columns=columns, filters=filters)
+
+
+def _to_backend(
+    df: pd.DataFrame, backend: str
+) -> pd.DataFrame | pa.Table | LazyDataFrame:
+    """
+    Convert (mock) pandas data to the form of the given backend
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data
+    backend : str
+        One of the ``DATA_BACKENDS``
+
+    Returns
+    -------
+    pd.DataFrame | pa.Table | LazyDataFrame
+        The data in the form of the backend
+    """
+    if backend == ARROW and isinstance(df, pd.DataFrame):
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(df)
+    elif backend == PANDAS_ARROW and isinstance(df, pd.DataFrame):
+        return df.convert_dtypes(dtype_backend="pyarrow")
+    elif backend == LAZY and isinstance(df, pd.DataFrame):
+        return LazyDataFrame(df)
+    return df
+
+
+def _read_dfs_from_disk(
+    df_names: list[str],
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+    backend: str = PANDAS,
+) -> list[pd.DataFrame | pa.Table | LazyDataFrame]:
+    """
+    Load several dataframe files concurrently
+
+    The parquet reader releases the GIL while reading and decoding, so the files are
+    read in parallel by a thread pool.
+
+    Parameters
+    ----------
+    df_names : list[str]
+        Labels of the databases to load
+    columns : list[str] | None
+        Columns to read from each database, None to read all columns
+    filters : list[tuple] | None
+        Row filters to apply to each database
+    backend : str
+        Form of the data, see ``_read_df_from_disk``
+
+    Returns
+    -------
+    list[pd.DataFrame | pa.Table | LazyDataFrame]
+        Data from the databases, in the same order as ``df_names``
+    """
+    read = partial(
+        _read_df_from_disk, columns=columns, filters=filters, backend=backend
+    )
+    if len(df_names) <= 1:
+        return [read(df_name) for df_name in df_names]
+    with ThreadPoolExecutor(max_workers=len(df_names)) as pool:
+        return list(pool.map(read, df_names))
 
 
-def data(number_of_databases: int = 1) -> callable:
+def _get_columns(
+    func: callable,
+    number_of_databases: int,
+    columns: list[str] | None,
+    column_args: list[str] | None,
+    args: tuple,
+    kwargs: dict,
+) -> list[str] | None:
+    """
+    Get the columns to read from the decorator arguments and the task arguments
+
+    Parameters
+    ----------
+    func : callable
+        The decorated function
+    number_of_databases : int
+        Number of dataframes that are passed to the function
+    columns : list[str] | None
+        Columns that are always read
+    column_args : list[str] | None
+        Names of the function arguments that contain column names (a string or a
+        list of strings)
+    args : tuple
+        Positional arguments of the task, without the dataframes
+    kwargs : dict
+        Keyword arguments of the task
+
+    Returns
+    -------
+    list[str] | None
+        The columns to read, or None to read all columns. All columns are read if
+        one of the column arguments is not given or None.
+    """
+    if not column_args:
+        return list(columns) if columns else None
+
+    signature = inspect.signature(func)
+    parameters = list(signature.parameters.values())[number_of_databases:]
+    try:
+        bound = signature.replace(parameters=parameters).bind(*args, **kwargs)
+    except TypeError:
+        # the function will fail with a clear message on these arguments
+        return None
+    bound.apply_defaults()
+
+    selected = list(columns or [])
+    for name in column_args:
+        value = bound.arguments.get(name)
+        if value is None:
+            return None
+        selected.extend([value] if isinstance(value, str) else value)
+    # remove duplicates, keeping the order
+    return list(dict.fromkeys(selected))
+
+
+def _normalize_filters(filters: list | None) -> list[tuple] | None:
+    """
+    Convert row filters from the task input (JSON lists) to tuples
+
+    Parameters
+    ----------
+    filters : list | None
+        Row filters as ``[column, operator, value]`` lists or tuples
+
+    Returns
+    -------
+    list[tuple] | None
+        Row filters as tuples, None if there are no filters
+    """
+    if not filters:
+        return None
+    return [tuple(filter_) for filter_ in filters]
+
+
+def data(
+    number_of_databases: int = 1,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+    column_args: list[str] | None = None,
+    backend: str = PANDAS,
+) -> callable:
     """
     Decorator that adds algorithm data to a function
 
@@ -60,11 +277,38 @@ def data(number_of_databases: int = 1) -> callable:
     mocked data to the front of the argument list, instead of reading in the
     data from the databases.
 
+    To read only part of the data, the columns and row filters can be passed to the
+    parquet reader, so that other columns and row groups are never decompressed.
+    The columns are given by `columns` and/or inferred from the arguments of the
+    task that contain column names (`column_args`). Row filters are given by
+    `filters` and by the reserved argument `data_filters` of the task. The
+    filters are not applied to mock data.
+
+    By default the data is provided as pandas DataFrames. With `backend="arrow"`
+    the function receives pyarrow Tables instead, read from memory mapped files.
+    These are not converted to pandas, so vectorized methods can work on the
+    buffers directly and use much less memory. `backend="pandas_arrow"` provides
+    pandas DataFrames that are backed by pyarrow arrays. With `backend="lazy"` the
+    function receives a `LazyDataFrame`, which only reads the schema up front and
+    decodes each column when it is first accessed.
+
     Parameters
     ----------
     number_of_databases: int
         Number of data sources to load. These will be loaded in order by which
         the user provided them. Default is 1.
+    columns: list[str] | None
+        Columns to read. By default, all columns are read.
+    filters: list[tuple] | None
+        Row filters as ``(column, operator, value)`` tuples, e.g.
+        ``("age", ">=", 18)``. Only rows for which all filters hold are read.
+    column_args: list[str] | None
+        Names of the arguments of the function that contain a column name or a
+        list of column names. These columns are read in addition to `columns`. If
+        one of these arguments is None, all columns are read.
+    backend: str
+        Form of the data: 'pandas' (default), 'arrow', 'pandas_arrow' or 'lazy'.
+        Mock data is converted to the same form.
 
     Returns
     -------
@@ -77,12 +321,28 @@ def data(number_of_databases: int = 1) -> callable:
     >>> def my_algorithm(first_df: pd.DataFrame, second_df: pd.DataFrame,
     >>>                  <other arguments>):
     >>>     pass
+
+    >>> @data(1, column_args=["column"])
+    >>> def column_sum(df: pd.DataFrame, column: str):
+    >>>     # only `column` is read from the dataframe
+    >>>     return df[column].sum()
+
+    >>> @data(1, backend="arrow")
+    >>> def row_count(table: pa.Table):
+    >>>     return table.num_rows
     """
+    if backend not in DATA_BACKENDS:
+        raise DataTypeError(
+            f"Unknown data backend '{backend}', use one of {', '.join(DATA_BACKENDS)}."
+        )
 
     def protection_decorator(func: callable, *args, **kwargs) -> callable:
         @wraps(func)
         def decorator(
-            *args, mock_data: list[pd.DataFrame] = None, **kwargs
+            *args,
+            mock_data: list[pd.DataFrame] = None,
+            data_filters: list | None = None,
+            **kwargs,
         ) -> callable:
             """
             Wrap the function with the data
@@ -91,9 +351,12 @@ def data(number_of_databases: int = 1) -> callable:
             ----------
             mock_data : list[pd.DataFrame]
                 Mock data to use instead of the regular data
+            data_filters : list | None
+                Row filters in addition to the filters of the decorator
             """
 
             if mock_data is not None:
+                mock_data = [_to_backend(df, backend) for df in mock_data]
                 return func(*mock_data, *args, **kwargs)
 
             # get the dataframe names that the user requested
@@ -114,17 +377,25 @@ def data(number_of_databases: int = 1) -> callable:
                     f"first {number_of_databases} databases."
                 )
 
-            for i in range(number_of_databases):
-
-                dataframe_name = dataframes[i]
-                # read the data from the database
-                info("Reading dataframe")
-                data_ = _read_df_from_disk(dataframe_name)
+            # only read the columns and rows that the function needs
+            selected_columns = _get_columns(
+                func, number_of_databases, columns, column_args, args, kwargs
+            )
+            row_filters = _normalize_filters([*(filters or []), *(data_filters or [])])
 
-                # add the data to the arguments
-                args = (data_, *args)
+            # read the data from the databases
+            info("Reading dataframes")
+            with phase("read_dataframes"):
+                dfs = _read_dfs_from_disk(
+                    dataframes[:number_of_databases],
+                    columns=selected_columns,
+                    filters=row_filters,
+                    backend=backend,
+                )
 
-            return func(*args, **kwargs)
+            # pass the dataframes in the order in which they were requested, as
+            # the mock data is
+            return func(*dfs, *args, **kwargs)
 
         # set attribute that this function is wrapped in a data decorator
         decorator.wrapped_in_data_decorator = True
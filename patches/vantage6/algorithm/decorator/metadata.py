@@ -1,12 +1,8 @@
-import os
-import jwt
-
 from pathlib import Path
 from functools import wraps
 from dataclasses import dataclass
 
-from vantage6.common.globals import ContainerEnvNames
-
+from vantage6.algorithm.tools.context import get_context
 from vantage6.algorithm.tools.util import info
 
 
@@ -24,26 +20,6 @@ class RunMetaData:
     token_file: Path | None
 
 
-def _extract_token_payload(token: str) -> dict:
-    """
-    Extract the payload from the token.
-
-    Parameters
-    ----------
-    token: str
-        The token as a string.
-
-    Returns
-    -------
-    dict
-        The payload as a dictionary. It contains the keys: `client_type`,
-        `node_id`, `organization_id`, `collaboration_id`, `task_id`, `image`,
-        and `databases`.
-    """
-    jwt_payload = jwt.decode(token, options={"verify_signature": False})
-    return jwt_payload["sub"]
-
-
 def metadata(func: callable) -> callable:
     @wraps(func)
     def decorator(*args, **kwargs) -> callable:
@@ -60,22 +36,22 @@ def metadata(func: callable) -> callable:
         >>> def my_algorithm(metadata: RunMetaData, <other arguments>):
         >>>     pass
         """
-        token = os.environ[ContainerEnvNames.CONTAINER_TOKEN.value]
+        context = get_context()
 
+        # the payload is decoded once per context, not on every call
         info("Extracting payload from token")
-        payload = _extract_token_payload(token)
+        payload = context.token_payload
 
         metadata = RunMetaData(
             task_id=payload["task_id"],
             node_id=payload["node_id"],
             collaboration_id=payload["collaboration_id"],
             organization_id=payload["organization_id"],
-            temporary_directory=Path(
-                os.environ[ContainerEnvNames.SESSION_FOLDER.value]
-            ),
-            output_file=Path(os.environ[ContainerEnvNames.OUTPUT_FILE.value]),
-            input_file=Path(os.environ[ContainerEnvNames.INPUT_FILE.value]),
-            token=token,
+            temporary_directory=Path(context.session_folder),
+            output_file=Path(context.output_file),
+            input_file=Path(context.input_file),
+            # the node passes the token itself, not a token file
+            token_file=None,
         )
         return func(metadata, *args, **kwargs)
 
@@ -1,9 +1,6 @@
-import os
-
 from functools import wraps
 from vantage6.common import error
-from vantage6.common.globals import ContainerEnvNames
-from vantage6.algorithm.tools.util import get_env_var
+from vantage6.algorithm.tools.context import get_context
 
 
 def source_database(func) -> callable:
@@ -72,12 +69,19 @@ def source_database(func) -> callable:
             "some_other_parameter": "..."
         }
         ```
+
+        For SQL databases, use ``get_sql_engine(connection_details["uri"])`` from
+        ``vantage6.algorithm.tools.wrappers`` to connect, so that the connection
+        pool is shared with other extractions in the same process.
         """
         connection_details = {}
+        context = get_context()
 
         # At least need the URI and type needs to be provided by the node
-        uri = get_env_var(ContainerEnvNames.DATABASE_URI.value, mock_uri)
-        type_ = get_env_var(ContainerEnvNames.DATABASE_TYPE.value, mock_type)
+        uri = context.database_uri if context.database_uri is not None else mock_uri
+        type_ = (
+            context.database_type if context.database_type is not None else mock_type
+        )
         if not uri:
             error("No database URI provided. Exiting...")
             exit(1)
@@ -89,11 +93,7 @@ def source_database(func) -> callable:
         connection_details["type"] = type_
 
         # Get the other details
-        for key in os.environ:
-            if key.startswith(ContainerEnvNames.DB_PARAM_PREFIX.value):
-                connection_details[
-                    key.replace(ContainerEnvNames.DB_PARAM_PREFIX.value, "")
-                ] = os.environ[key]
+        connection_details.update(context.database_parameters)
 
         return func(connection_details, *args, **kwargs)
 
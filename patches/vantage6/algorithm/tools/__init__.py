@@ -1,4 +1,11 @@
 """Algorithm tools support the development of algorithms for the vantage6 platform."""
 
-# make sure the version is available
-from vantage6.algorithm.client._version import __version__  # noqa: F401
+
+def __getattr__(name: str):
+    # The version is imported on access only: importing the client package loads
+    # the full HTTP client stack, which most algorithm containers never use.
+    if name == "__version__":
+        from vantage6.algorithm.client._version import __version__
+
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
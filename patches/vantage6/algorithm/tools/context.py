@@ -0,0 +1,182 @@
+"""
+Parse-once snapshot of the algorithm container environment.
+
+The node passes everything an algorithm run needs (action, session folder,
+dataframes, database details, server address, token, ...) as environment variables.
+Instead of every decorator reading and parsing ``os.environ`` on every call, the
+``ContainerContext`` is built once per process from the (decoded) environment and
+shared by the wrapper and the decorators.
+
+The wrapper decodes the node-encoded environment variables before the context is
+built, so the context reads the values as they are. Processes that change the
+environment between runs, such as the warm worker, call ``reset_context`` so that
+the next ``get_context`` call builds a new snapshot.
+"""
+
+from __future__ import annotations
+
+import os
+
+from dataclasses import dataclass, field
+from functools import cached_property
+from types import MappingProxyType
+from typing import Mapping
+
+from vantage6.common.enum import AlgorithmStepType
+from vantage6.common.globals import ContainerEnvNames
+from vantage6.algorithm.tools.exceptions import EnvironmentVariableError
+
+
+@dataclass(frozen=True)
+class ContainerContext:
+    """
+    Typed, read-only view of the container environment of an algorithm run.
+
+    Attributes
+    ----------
+    action : AlgorithmStepType | None
+        Action of the container, from ``FUNCTION_ACTION``.
+    method : str | None
+        Algorithm method to run, from ``ALGORITHM_METHOD``.
+    input_file : str | None
+        Path of the input file, from ``INPUT_FILE``.
+    output_file : str | None
+        Path of the output file, from ``OUTPUT_FILE``.
+    session_folder : str | None
+        Folder containing the session dataframes, from ``SESSION_FOLDER``.
+    dataframes : tuple[str, ...]
+        Names of the dataframes the user requested, from
+        ``USER_REQUESTED_DATAFRAMES``.
+    database_uri : str | None
+        URI of the source database, from ``DATABASE_URI``.
+    database_type : str | None
+        Type of the source database, from ``DATABASE_TYPE``.
+    database_parameters : Mapping[str, str]
+        Other details of the source database, from the ``DB_PARAM_*`` variables
+        (without the prefix).
+    host : str | None
+        Address of the proxy server, from ``HOST``.
+    port : str | None
+        Port of the proxy server, from ``PORT``.
+    api_path : str | None
+        API path of the proxy server, from ``API_PATH``.
+    token : str | None
+        Container token, from ``CONTAINER_TOKEN``.
+    """
+
+    action: AlgorithmStepType | None = None
+    method: str | None = None
+    input_file: str | None = None
+    output_file: str | None = None
+    session_folder: str | None = None
+    dataframes: tuple[str, ...] = ()
+    database_uri: str | None = None
+    database_type: str | None = None
+    database_parameters: Mapping[str, str] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    host: str | None = None
+    port: str | None = None
+    api_path: str | None = None
+    token: str | None = None
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str] | None = None) -> ContainerContext:
+        """
+        Build the context from (decoded) environment variables.
+
+        Parameters
+        ----------
+        environ : Mapping[str, str] | None
+            Environment to read, defaults to ``os.environ``.
+
+        Returns
+        -------
+        ContainerContext
+            Snapshot of the environment.
+
+        Raises
+        ------
+        EnvironmentVariableError
+            If ``FUNCTION_ACTION`` is set to a value that is not a valid action.
+        """
+        environ = os.environ if environ is None else environ
+
+        action = environ.get(ContainerEnvNames.FUNCTION_ACTION.value)
+        if action is not None:
+            try:
+                action = AlgorithmStepType(action)
+            except ValueError as exc:
+                raise EnvironmentVariableError(
+                    f"Environment variable {ContainerEnvNames.FUNCTION_ACTION.value} "
+                    f"has value '{action}' which is not a valid action."
+                ) from exc
+
+        dataframes = environ.get(ContainerEnvNames.USER_REQUESTED_DATAFRAMES.value)
+        prefix = ContainerEnvNames.DB_PARAM_PREFIX.value
+        return cls(
+            action=action,
+            method=environ.get(ContainerEnvNames.ALGORITHM_METHOD.value),
+            input_file=environ.get(ContainerEnvNames.INPUT_FILE.value),
+            output_file=environ.get(ContainerEnvNames.OUTPUT_FILE.value),
+            session_folder=environ.get(ContainerEnvNames.SESSION_FOLDER.value),
+            dataframes=tuple(dataframes.split(",")) if dataframes is not None else (),
+            database_uri=environ.get(ContainerEnvNames.DATABASE_URI.value),
+            database_type=environ.get(ContainerEnvNames.DATABASE_TYPE.value),
+            database_parameters=MappingProxyType(
+                {
+                    key.replace(prefix, ""): value
+                    for key, value in environ.items()
+                    if key.startswith(prefix)
+                }
+            ),
+            host=environ.get(ContainerEnvNames.HOST.value),
+            port=environ.get(ContainerEnvNames.PORT.value),
+            api_path=environ.get(ContainerEnvNames.API_PATH.value),
+            token=environ.get(ContainerEnvNames.CONTAINER_TOKEN.value),
+        )
+
+    @cached_property
+    def token_payload(self) -> dict | None:
+        """
+        Payload of the container token, decoded on first access.
+
+        Returns
+        -------
+        dict | None
+            The payload, containing e.g. `task_id`, `node_id`, `organization_id`
+            and `collaboration_id`. None if there is no token.
+        """
+        if not self.token:
+            return None
+        import jwt
+
+        return jwt.decode(self.token, options={"verify_signature": False})["sub"]
+
+
+_context: ContainerContext | None = None
+
+
+def get_context() -> ContainerContext:
+    """
+    Get the container context of this process, building it on first use.
+
+    Returns
+    -------
+    ContainerContext
+        The container context.
+    """
+    global _context
+    if _context is None:
+        _context = ContainerContext.from_environ()
+    return _context
+
+
+def reset_context() -> None:
+    """
+    Forget the container context, e.g. after the environment has changed.
+
+    The next ``get_context`` call builds a new context from the environment.
+    """
+    global _context
+    _context = None
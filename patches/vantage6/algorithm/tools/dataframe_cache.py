@@ -0,0 +1,194 @@
+"""
+In-process cache of the session dataframes read by ``@data``.
+
+When several methods run in the same process, e.g. in the warm worker, they often
+read the same session dataframes. The cache keeps the decoded dataframes of recent
+reads in memory, up to a size budget, and evicts the least recently used ones
+first. Entries are keyed by the path, modification time and size of the parquet
+file (and the columns, filters and backend of the read), so a dataframe that is
+rewritten by a preprocessing step is read again.
+
+Methods receive a copy of the cached dataframe, as e.g. preprocessing methods modify
+their input in place. With pandas copy-on-write (the default from pandas 3) this is
+a cheap shallow copy; the data is only copied when the method modifies it. Arrow
+tables are immutable and are shared as is.
+
+The cache is disabled by default. Set the ``V6_DATAFRAME_CACHE_MB`` environment
+variable to the budget in MiB to enable it.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from vantage6.algorithm.tools.exceptions import EnvironmentVariableError
+from vantage6.algorithm.tools.util import (
+    check_envvar_value_positive,
+    get_env_var,
+    warn,
+)
+
+DATAFRAME_CACHE_ENV = "V6_DATAFRAME_CACHE_MB"
+
+
+def _nbytes(data: Any) -> int:
+    """Memory used by a pandas DataFrame or pyarrow Table."""
+    if hasattr(data, "memory_usage"):
+        return int(data.memory_usage(deep=True).sum())
+    return int(data.nbytes)
+
+
+def _copy(data: Any) -> Any:
+    """Copy of a dataframe that can be modified without changing ``data``."""
+    if not hasattr(data, "memory_usage"):
+        # arrow tables are immutable
+        return data
+
+    import pandas as pd
+
+    # copy-on-write is always enabled from pandas 3, the option is deprecated there
+    copy_on_write = (
+        int(pd.__version__.split(".")[0]) >= 3
+        or pd.get_option("mode.copy_on_write") is True
+    )
+    return data.copy(deep=not copy_on_write)
+
+
+class DataFrameCache:
+    """
+    Least recently used cache of dataframes with a budget in bytes.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Budget of the cache. Dataframes larger than the budget are not cached, 0
+        disables the cache.
+    """
+
+    def __init__(self, max_bytes: int = 0) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache has a budget."""
+        return self.max_bytes > 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Get a copy of a cached dataframe.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the dataframe.
+
+        Returns
+        -------
+        pd.DataFrame | pa.Table | None
+            Copy of the dataframe, or None if it is not in the cache.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _copy(entry[0])
+
+    def put(self, key: Hashable, data: Any) -> Any:
+        """
+        Add a dataframe to the cache, evicting the least recently used ones.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the dataframe.
+        data : pd.DataFrame | pa.Table
+            The dataframe.
+
+        Returns
+        -------
+        pd.DataFrame | pa.Table
+            Copy of the dataframe to give to the method, so that the cached
+            dataframe is not modified.
+        """
+        if not self.enabled:
+            return data
+        nbytes = _nbytes(data)
+        if nbytes > self.max_bytes:
+            return data
+
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (data, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.bytes -= evicted_bytes
+                self.evictions += 1
+        return _copy(data)
+
+    def clear(self) -> None:
+        """Remove all dataframes from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Statistics of the cache.
+
+        Returns
+        -------
+        dict
+            Number of hits, misses, evictions and entries, and the bytes in use and
+            budget of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache: DataFrameCache | None = None
+
+
+def get_dataframe_cache() -> DataFrameCache:
+    """
+    Get the dataframe cache of this process.
+
+    The budget is read from ``V6_DATAFRAME_CACHE_MB`` when the cache is first used.
+    An invalid budget disables the cache with a warning, as the cache is only an
+    optimization.
+
+    Returns
+    -------
+    DataFrameCache
+        The dataframe cache.
+    """
+    global _cache
+    if _cache is None:
+        try:
+            budget_mb = get_env_var(DATAFRAME_CACHE_ENV, "0", as_type="int")
+            check_envvar_value_positive(DATAFRAME_CACHE_ENV, budget_mb)
+        except EnvironmentVariableError as e:
+            warn(f"{e} Disabling the dataframe cache.")
+            budget_mb = 0
+        _cache = DataFrameCache(budget_mb * 2**20)
+    return _cache
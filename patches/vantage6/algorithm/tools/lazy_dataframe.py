@@ -0,0 +1,176 @@
+"""
+Dataframe handle that decodes columns when they are first accessed.
+
+Methods that only find out at runtime which columns they need would otherwise
+decode the complete session dataframe. A ``LazyDataFrame`` reads the parquet schema
+when it is created, but decodes a column only the first time it is accessed, and
+keeps it for later accesses. A method that uses 2 of 300 columns only pays for
+those 2 columns.
+
+Use ``@data(backend="lazy")`` to receive session dataframes as ``LazyDataFrame``:
+
+.. code-block:: python
+
+    @data(1, backend="lazy")
+    def column_means(df: LazyDataFrame, prefix: str) -> dict:
+        columns = [column for column in df.columns if column.startswith(prefix)]
+        return df[columns].mean().to_dict()
+"""
+
+from __future__ import annotations
+
+import threading
+
+from typing import TYPE_CHECKING, Iterator
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+class LazyDataFrame:
+    """
+    Read-only handle to a parquet file or dataframe that decodes columns on access.
+
+    Parameters
+    ----------
+    source : str | pd.DataFrame
+        Path of the parquet file, or an already loaded dataframe (e.g. mock data).
+    columns : list[str] | None
+        Columns that can be accessed, None for all columns of the source.
+    filters : list[tuple] | None
+        Row filters as ``(column, operator, value)`` tuples, applied to every
+        column that is read from a parquet file.
+    """
+
+    def __init__(
+        self,
+        source: str | pd.DataFrame,
+        columns: list[str] | None = None,
+        filters: list[tuple] | None = None,
+    ) -> None:
+        self._source = source
+        self._filters = filters
+        self._loaded: dict[str, pd.Series] = {}
+        self._lock = threading.Lock()
+
+        if isinstance(source, pd.DataFrame):
+            import pyarrow as pa
+
+            schema = pa.Schema.from_pandas(source, preserve_index=False)
+            self._num_rows = len(source) if not filters else None
+        else:
+            import pyarrow.parquet as pq
+
+            metadata = pq.read_metadata(source)
+            schema = metadata.schema.to_arrow_schema()
+            self._num_rows = metadata.num_rows if not filters else None
+
+        # index columns that pandas stored in the file are not data columns
+        index_columns = {
+            column
+            for column in (schema.pandas_metadata or {}).get("index_columns", [])
+            if isinstance(column, str)
+        }
+        names = [name for name in schema.names if name not in index_columns]
+        if columns is not None:
+            missing = [column for column in columns if column not in names]
+            if missing:
+                raise KeyError(f"Columns {missing} are not in the dataframe")
+            names = list(columns)
+        self._schema = _select_fields(schema, names)
+
+    @property
+    def columns(self) -> list[str]:
+        """Names of the columns, known without decoding any data."""
+        return self._schema.names
+
+    @property
+    def schema(self) -> pa.Schema:
+        """Arrow schema of the columns."""
+        return self._schema
+
+    @property
+    def loaded_columns(self) -> list[str]:
+        """Names of the columns that have been decoded so far."""
+        return list(self._loaded)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Number of rows and columns."""
+        return len(self), len(self.columns)
+
+    def __len__(self) -> int:
+        if self._num_rows is None:
+            # with filters the number of rows is only known after reading a column
+            self._num_rows = len(self[self.columns[0]]) if self.columns else 0
+        return self._num_rows
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyDataFrame({len(self.columns)} columns, "
+            f"{len(self._loaded)} loaded: {self.loaded_columns})"
+        )
+
+    def __getitem__(self, key: str | list[str]) -> pd.Series | pd.DataFrame:
+        """
+        Get one column as a Series, or several columns as a DataFrame.
+
+        Columns that have not been accessed before are decoded, in one read.
+        """
+        if isinstance(key, str):
+            return self._load([key])[key]
+        return pd.concat(self._load(list(key)), axis=1)[list(key)]
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Decode all columns.
+
+        Returns
+        -------
+        pd.DataFrame
+            The complete dataframe.
+        """
+        return self[self.columns]
+
+    def _load(self, columns: list[str]) -> dict[str, pd.Series]:
+        missing = [column for column in columns if column not in self.columns]
+        if missing:
+            raise KeyError(f"Columns {missing} are not in the dataframe")
+
+        with self._lock:
+            to_read = [column for column in columns if column not in self._loaded]
+            if to_read:
+                frame = self._read(to_read)
+                for column in to_read:
+                    self._loaded[column] = frame[column]
+            return {column: self._loaded[column] for column in columns}
+
+    def _read(self, columns: list[str]) -> pd.DataFrame:
+        if isinstance(self._source, pd.DataFrame):
+            return self._source[columns]
+
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(
+            self._source,
+            columns=columns,
+            filters=self._filters,
+            memory_map=True,
+            use_pandas_metadata=True,
+        )
+        return table.to_pandas()
+
+
+def _select_fields(schema: pa.Schema, names: list[str]) -> pa.Schema:
+    """Schema with only the given fields, keeping the pandas metadata."""
+    import pyarrow as pa
+
+    return pa.schema([schema.field(name) for name in names], metadata=schema.metadata)
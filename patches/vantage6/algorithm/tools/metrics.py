@@ -0,0 +1,123 @@
+"""
+Resource accounting of an algorithm run.
+
+At the end of every run the wrapper records the resources used by the algorithm
+process: peak resident memory, user and system CPU time, context switches and the
+bytes read from and written to storage. The record is logged, so that resource
+profiles per algorithm method can be collected to size the resource requests and
+limits of the algorithm containers. Set ``V6_RESOURCE_METRICS`` to 'true' to also
+write it to a JSON file next to the output file (``<output_file>.metrics.json``).
+This is off by default, as the output file of session steps is in the session
+folder, where the metrics file would end up next to the session dataframes.
+
+CPU time, context switches and I/O are counted from the start of the run, so that
+runs in a warm worker process are accounted separately. The peak memory is that of
+the process so far, as the operating system does not offer a per-run peak.
+
+The counters come from ``resource.getrusage``. If ``psutil`` is installed, it is used
+for the I/O counters, otherwise these are read from ``/proc/self/io`` where
+available.
+"""
+
+import json
+import os
+import resource
+import sys
+
+from vantage6.algorithm.tools.util import info
+
+# set this environment variable to 'true' to also write the metrics of a run to a
+# JSON file next to the output file
+RESOURCE_METRICS_ENV = "V6_RESOURCE_METRICS"
+RESOURCE_METRICS_SUFFIX = ".metrics.json"
+
+# counters that are reported as the difference between the start and end of a run
+_CUMULATIVE = (
+    "user_cpu_seconds",
+    "system_cpu_seconds",
+    "voluntary_context_switches",
+    "involuntary_context_switches",
+    "read_bytes",
+    "write_bytes",
+)
+
+
+def _io_counters() -> tuple[int | None, int | None]:
+    """Bytes read from and written to storage by this process, if available."""
+    try:
+        import psutil
+
+        counters = psutil.Process().io_counters()
+        return counters.read_bytes, counters.write_bytes
+    except (ImportError, AttributeError, OSError):
+        pass
+
+    try:
+        with open("/proc/self/io") as fp:
+            fields = dict(line.split(":") for line in fp.read().splitlines())
+        return int(fields["read_bytes"]), int(fields["write_bytes"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def resource_snapshot() -> dict:
+    """
+    Take a snapshot of the resource counters of this process.
+
+    Returns
+    -------
+    dict
+        Peak RSS in bytes, CPU times in seconds, number of context switches and
+        I/O bytes. I/O bytes are None if they can not be determined.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    read_bytes, write_bytes = _io_counters()
+    return {
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        "peak_rss_bytes": usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+        "user_cpu_seconds": usage.ru_utime,
+        "system_cpu_seconds": usage.ru_stime,
+        "voluntary_context_switches": usage.ru_nvcsw,
+        "involuntary_context_switches": usage.ru_nivcsw,
+        "read_bytes": read_bytes,
+        "write_bytes": write_bytes,
+    }
+
+
+def report_resources(
+    start: dict,
+    output_file: str | None = None,
+    write: bool = True,
+    **labels,
+) -> dict:
+    """
+    Log the resources used since ``start`` and write them next to the output file.
+
+    Parameters
+    ----------
+    start : dict
+        Snapshot taken with ``resource_snapshot`` at the start of the run.
+    output_file : str | None
+        Output file of the run. The metrics file is written next to it.
+    write : bool
+        Whether to write the metrics to ``<output_file>.metrics.json``.
+    **labels
+        Extra fields of the record, e.g. the method and action of the run.
+
+    Returns
+    -------
+    dict
+        The metrics record.
+    """
+    end = resource_snapshot()
+    metrics = dict(labels)
+    for name, value in end.items():
+        if name in _CUMULATIVE and value is not None and start[name] is not None:
+            value = value - start[name]
+        metrics[name] = round(value, 6) if isinstance(value, float) else value
+
+    info(f"resources {json.dumps(metrics)}")
+    if write and output_file and os.path.isdir(os.path.dirname(output_file) or "."):
+        with open(f"{output_file}{RESOURCE_METRICS_SUFFIX}", "w") as fp:
+            json.dump(metrics, fp)
+    return metrics
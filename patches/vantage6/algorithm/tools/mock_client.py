@@ -1,20 +1,61 @@
 import json
 import logging
+import os
+import tempfile
 
-from typing import Any
+from typing import Any, Iterator
 from importlib import import_module
+from contextlib import contextmanager
 from copy import deepcopy
 
 import pandas as pd
 
-from vantage6.common.globals import AuthStatus
+from vantage6.common.enum import AlgorithmStepType
+from vantage6.common.globals import AuthStatus, ContainerEnvNames
+from vantage6.common import bytes_to_base64s
+from vantage6.common.serialization import (
+    TYPED_RESULTS_INPUT_KEY,
+    serialize,
+    serialize_binary,
+)
+from vantage6.common.client.deserialization import (
+    decode_typed_object,
+    deserialize_binary,
+)
 from vantage6.algorithm.tools.wrappers import load_data
+from vantage6.algorithm.tools.context import reset_context
 from vantage6.algorithm.tools.util import info
 from vantage6.algorithm.tools.preprocessing import preprocess_data
 
 module_name = __name__.split(".")[1]
 
 
+def _read_binary_input(serialized: bytes) -> dict:
+    """Read input in the binary input format, as the algorithm container does."""
+    with tempfile.TemporaryFile() as fp:
+        fp.write(serialized)
+        fp.flush()
+        fp.seek(0)
+        return deserialize_binary(fp)
+
+
+@contextmanager
+def _container_action(action: AlgorithmStepType) -> Iterator[None]:
+    """Set the action of the mocked container, and restore it afterwards."""
+    name = ContainerEnvNames.FUNCTION_ACTION.value
+    previous = os.environ.get(name)
+    os.environ[name] = action.value
+    reset_context()
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = previous
+        reset_context()
+
+
 class MockAlgorithmClient:
     """
     The MockAlgorithmClient mimics the behaviour of the AlgorithmClient. It
@@ -186,6 +227,7 @@ class MockAlgorithmClient:
             input_: dict | None = None,
             name: str = "mock",
             description: str = "mock",
+            binary_input: bool = False,
         ) -> int:
             """
             Create a new task with the MockProtocol and return the task id.
@@ -202,6 +244,10 @@ class MockAlgorithmClient:
                 The name of the task, by default "mock"
             description : str, optional
                 The description of the task, by default "mock"
+            binary_input : bool, optional
+                Pass the input through the binary input format, as the algorithm
+                container would receive it. Numpy arrays in the input then arrive
+                as read-only arrays. By default False.
 
             Returns
             -------
@@ -222,6 +268,12 @@ class MockAlgorithmClient:
             # get input
             if not input_:
                 input_ = {}
+            if binary_input:
+                serialized = serialize_binary(input_)
+                serialized_input = bytes_to_base64s(serialized)
+                input_ = _read_binary_input(serialized)
+            else:
+                serialized_input = json.dumps(input_)
             args = input_.get("args", [])
             kwargs = input_.get("kwargs", {})
 
@@ -247,13 +299,18 @@ class MockAlgorithmClient:
                     # subsequent tasks
                     mocked_kwargs["mock_data"] = [d.copy() for d in data]
 
-                result = method_fn(*args, **kwargs, **mocked_kwargs)
+                # subtasks run in federated compute containers, also when they are
+                # created by a central method that runs in this process
+                with _container_action(AlgorithmStepType.FEDERATED_COMPUTE):
+                    result = method_fn(*args, **kwargs, **mocked_kwargs)
 
                 self.last_result_id += 1
                 self.parent.results.append(
                     {
                         "id": self.last_result_id,
-                        "result": json.dumps(result),
+                        "result": serialize(
+                            result, typed=bool(input_.get(TYPED_RESULTS_INPUT_KEY))
+                        ).decode(),
                         "run": {
                             "id": self.last_result_id,
                             "link": f"/api/run/{self.last_result_id}",
@@ -275,7 +332,7 @@ class MockAlgorithmClient:
                         "log": "mock_log",
                         "ports": [],
                         "status": "completed",
-                        "input": json.dumps(input_),
+                        "input": serialized_input,
                         "results": {
                             "id": self.last_result_id,
                             "link": f"/api/result/{self.last_result_id}",
@@ -438,7 +495,9 @@ class MockAlgorithmClient:
             """
             for result in self.parent.results:
                 if result.get("id") == id_:
-                    return json.loads(result.get("result"))
+                    return json.loads(
+                        result.get("result"), object_hook=decode_typed_object
+                    )
             return {"msg": f"Could not find result with id {id_}"}
 
         def from_task(self, task_id: int) -> list[Any]:
@@ -458,7 +517,11 @@ class MockAlgorithmClient:
             results = []
             for result in self.parent.results:
                 if result.get("task").get("id") == task_id:
-                    results.append(json.loads(result.get("result")))
+                    results.append(
+                        json.loads(
+                            result.get("result"), object_hook=decode_typed_object
+                        )
+                    )
             return results
 
     class Organization(SubClient):
@@ -544,6 +607,38 @@ class MockAlgorithmClient:
                 "organizations": f"/api/organization?collaboration_id={collab_id}",
             }
 
+    class Node(SubClient):
+        """
+        Node subclient for the MockAlgorithmClient
+        """
+
+        def get(self, id_: int | None = None) -> dict:
+            """
+            Get mocked node
+
+            Parameters
+            ----------
+            id_ : int | None
+                Id of the node. Defaults to the node of this organization.
+
+            Returns
+            -------
+            dict
+                A mocked node.
+            """
+            id_ = self.parent.node_id if id_ is None else id_
+            collab_id = self.parent.collaboration_id
+            return {
+                "id": id_,
+                "name": f"mock-node-{id_}",
+                "status": AuthStatus.ONLINE.value,
+                "collaboration": {
+                    "id": collab_id,
+                    "link": f"/api/collaboration/{collab_id}",
+                    "methods": ["DELETE", "PATCH", "GET"],
+                },
+            }
+
     # TODO implement the get_addresses method before using this part
     # class VPN(SubClient):
     #     """
@@ -0,0 +1,295 @@
+"""
+Parquet write profiles for session dataframes.
+
+Data extraction and preprocessing steps store their output as a parquet file in the
+session folder. How that file is written (compression codec, row group size, ...)
+is a trade-off between write time, file size and the read time of later steps. A
+``ParquetWriteProfile`` bundles these settings.
+
+The profile of a run is built from, in increasing order of precedence:
+
+1. the defaults of ``pyarrow.parquet.write_table``,
+2. a named profile in the ``V6_PARQUET_PROFILE`` environment variable and the
+   individual ``V6_PARQUET_*`` environment variables (see ``PROFILE_ENV_VARS``),
+3. the ``parquet_write_profile`` key of the task input, which is either the name of
+   a profile or a dictionary with the fields of ``ParquetWriteProfile`` (optionally
+   with a ``profile`` key to start from a named profile).
+
+Example task input:
+
+.. code-block:: python
+
+    input_ = {
+        "method": "read_csv",
+        "kwargs": {},
+        "parquet_write_profile": {"profile": "compact", "row_group_size": 100_000},
+    }
+"""
+
+from __future__ import annotations
+
+import os
+
+from dataclasses import dataclass, fields, replace
+from typing import TYPE_CHECKING
+
+from vantage6.algorithm.tools.exceptions import UserInputError
+from vantage6.algorithm.tools.util import get_env_var
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# key in the task input to select the write profile of that task
+WRITE_PROFILE_INPUT_KEY = "parquet_write_profile"
+
+PROFILE_ENV = "V6_PARQUET_PROFILE"
+
+# rows per row group if the profile does not set it, the default of pyarrow
+DEFAULT_ROW_GROUP_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ParquetWriteProfile:
+    """
+    Settings used to write a session dataframe to parquet.
+
+    Attributes
+    ----------
+    compression : str | None
+        Compression codec: 'snappy', 'lz4', 'zstd', 'gzip', 'brotli' or 'none'.
+    compression_level : int | None
+        Codec specific compression level, None for the codec default.
+    row_group_size : int | None
+        Maximum number of rows per row group, None for the pyarrow default.
+    use_dictionary : bool
+        Whether to dictionary-encode columns.
+    data_page_size : int | None
+        Approximate size of the encoded data pages in bytes.
+    write_statistics : bool
+        Whether to write min/max statistics, which readers use to skip row groups.
+    sort_by : str | list[str] | None
+        Column(s) to sort the table by (ascending) before writing. Sorting makes
+        statistics more selective and often improves compression.
+    """
+
+    compression: str | None = "snappy"
+    compression_level: int | None = None
+    row_group_size: int | None = None
+    use_dictionary: bool = True
+    data_page_size: int | None = None
+    write_statistics: bool = True
+    sort_by: str | list[str] | None = None
+
+    @classmethod
+    def from_dict(
+        cls, options: dict, base: ParquetWriteProfile | None = None
+    ) -> ParquetWriteProfile:
+        """
+        Create a profile from a dictionary, e.g. from the task input.
+
+        Parameters
+        ----------
+        options : dict
+            Fields of the profile to set. A ``profile`` key selects the named
+            profile to start from.
+        base : ParquetWriteProfile | None
+            Profile to start from if no named profile is selected. Defaults to the
+            pyarrow defaults.
+
+        Returns
+        -------
+        ParquetWriteProfile
+            The profile.
+
+        Raises
+        ------
+        UserInputError
+            If the named profile or one of the fields does not exist.
+        """
+        options = dict(options)
+        if "profile" in options:
+            base = get_named_profile(options.pop("profile"))
+        valid = {field.name for field in fields(cls)}
+        unknown = set(options) - valid
+        if unknown:
+            raise UserInputError(
+                f"Unknown parquet write profile option(s) {sorted(unknown)}. "
+                f"Valid options are: {sorted(valid)}."
+            )
+        return replace(base or cls(), **options)
+
+    @classmethod
+    def from_env(cls) -> ParquetWriteProfile:
+        """
+        Create a profile from the ``V6_PARQUET_*`` environment variables.
+
+        Returns
+        -------
+        ParquetWriteProfile
+            The profile, the pyarrow defaults if none of the variables are set.
+        """
+        profile_name = get_env_var(PROFILE_ENV)
+        profile = get_named_profile(profile_name) if profile_name else cls()
+
+        options = {}
+        for field_name, (env_var, as_type) in PROFILE_ENV_VARS.items():
+            if env_var in os.environ:
+                options[field_name] = get_env_var(env_var, as_type=as_type)
+        if "sort_by" in options:
+            options["sort_by"] = options["sort_by"].split(",")
+        return replace(profile, **options)
+
+    def write_table(self, table: pa.Table | pa.RecordBatchReader, path: str) -> None:
+        """
+        Write a table to a parquet file using this profile.
+
+        Parameters
+        ----------
+        table : pa.Table | pa.RecordBatchReader
+            The table to write. A record batch reader is written batch by batch,
+            so that the complete table never has to be in memory, unless the
+            profile sorts the table.
+        path : str
+            Path of the parquet file.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if isinstance(table, pa.RecordBatchReader):
+            if not self.sort_by:
+                self._write_batches(table, path)
+                return
+            # sorting needs the complete table
+            table = table.read_all()
+
+        if self.sort_by:
+            sort_by = [self.sort_by] if isinstance(self.sort_by, str) else self.sort_by
+            table = table.sort_by([(column, "ascending") for column in sort_by])
+
+        pq.write_table(table, path, **self._writer_options())
+
+    def _write_batches(self, reader: pa.RecordBatchReader, path: str) -> None:
+        """
+        Write the batches of a reader to a parquet file.
+
+        Batches are collected until they fill a row group, so that small batches,
+        e.g. the chunks fetched from a database, do not each become a row group of
+        their own. At most one row group and one batch are in memory at a time.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        options = self._writer_options()
+        # the row group size is an option of each write, not of the writer
+        row_group_size = options.pop("row_group_size", None) or DEFAULT_ROW_GROUP_SIZE
+        with pq.ParquetWriter(path, reader.schema, **options) as writer:
+            pending = []
+            n_pending = 0
+            for batch in reader:
+                pending.append(batch)
+                n_pending += batch.num_rows
+                if n_pending < row_group_size:
+                    continue
+                table = pa.Table.from_batches(pending, schema=reader.schema)
+                n_full = n_pending - n_pending % row_group_size
+                writer.write_table(
+                    table.slice(0, n_full), row_group_size=row_group_size
+                )
+                # the rows that do not fill a row group are kept for the next one
+                rest = table.slice(n_full)
+                pending = rest.to_batches()
+                n_pending = rest.num_rows
+            if n_pending:
+                writer.write_table(
+                    pa.Table.from_batches(pending, schema=reader.schema),
+                    row_group_size=row_group_size,
+                )
+
+    def _writer_options(self) -> dict:
+        """Keyword arguments for ``pq.write_table``, see also ``_write_batches``."""
+        options = {
+            "compression": self.compression or "none",
+            "use_dictionary": self.use_dictionary,
+            "write_statistics": self.write_statistics,
+        }
+        if self.compression_level is not None:
+            options["compression_level"] = self.compression_level
+        if self.row_group_size is not None:
+            options["row_group_size"] = self.row_group_size
+        if self.data_page_size is not None:
+            options["data_page_size"] = self.data_page_size
+        return options
+
+
+# profile field: (environment variable, type passed to `get_env_var`)
+PROFILE_ENV_VARS = {
+    "compression": ("V6_PARQUET_COMPRESSION", "str"),
+    "compression_level": ("V6_PARQUET_COMPRESSION_LEVEL", "int"),
+    "row_group_size": ("V6_PARQUET_ROW_GROUP_SIZE", "int"),
+    "use_dictionary": ("V6_PARQUET_USE_DICTIONARY", "bool"),
+    "data_page_size": ("V6_PARQUET_DATA_PAGE_SIZE", "int"),
+    "write_statistics": ("V6_PARQUET_WRITE_STATISTICS", "bool"),
+    "sort_by": ("V6_PARQUET_SORT_BY", "str"),
+}
+
+NAMED_PROFILES = {
+    # pyarrow defaults, which is what sessions were always written with
+    "default": ParquetWriteProfile(),
+    # cheapest to write and read, larger files
+    "fast": ParquetWriteProfile(compression="lz4"),
+    # smallest files, for large sessions on slow or shared storage
+    "compact": ParquetWriteProfile(compression="zstd", compression_level=9),
+    # no compression, e.g. for short-lived intermediate steps on fast local disks
+    "uncompressed": ParquetWriteProfile(compression=None),
+}
+
+
+def get_named_profile(name: str) -> ParquetWriteProfile:
+    """
+    Get one of the ``NAMED_PROFILES``.
+
+    Parameters
+    ----------
+    name : str
+        Name of the profile.
+
+    Returns
+    -------
+    ParquetWriteProfile
+        The profile.
+
+    Raises
+    ------
+    UserInputError
+        If there is no profile with this name.
+    """
+    try:
+        return NAMED_PROFILES[name]
+    except KeyError as exc:
+        raise UserInputError(
+            f"Unknown parquet write profile '{name}'. Available profiles are: "
+            f"{', '.join(NAMED_PROFILES)}."
+        ) from exc
+
+
+def get_write_profile(task_input: dict | None = None) -> ParquetWriteProfile:
+    """
+    Get the write profile of a task from the environment and the task input.
+
+    Parameters
+    ----------
+    task_input : dict | None
+        The task input, which may contain a ``parquet_write_profile`` key.
+
+    Returns
+    -------
+    ParquetWriteProfile
+        The profile to write the output of the task with.
+    """
+    profile = ParquetWriteProfile.from_env()
+    selected = (task_input or {}).get(WRITE_PROFILE_INPUT_KEY)
+    if isinstance(selected, str):
+        return get_named_profile(selected)
+    elif selected:
+        return ParquetWriteProfile.from_dict(selected, base=profile)
+    return profile
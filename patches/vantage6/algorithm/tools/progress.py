@@ -0,0 +1,130 @@
+"""
+Rate-limited progress logging for polling loops.
+
+Loops that poll the server every second, such as waiting for the results of a
+subtask, would log a line on every iteration. A ``ProgressLogger`` collapses these
+into a summary that is logged at most once per interval, e.g.
+
+.. code-block:: text
+
+    info > Waiting for results of task 12: waited 120 s, 3/5 runs finished
+
+The interval defaults to the ``V6_PROGRESS_INTERVAL`` environment variable, or 30
+seconds if that is not set or is not a positive number.
+"""
+
+import time
+
+from typing import Callable
+
+from vantage6.algorithm.tools.util import get_env_var, info, warn
+
+PROGRESS_INTERVAL_ENV = "V6_PROGRESS_INTERVAL"
+DEFAULT_PROGRESS_INTERVAL = 30.0
+
+
+def _interval_from_env() -> float:
+    """
+    Read the progress interval from the environment.
+
+    An invalid value is replaced by the default with a warning, as progress logging
+    must not make the algorithm fail.
+    """
+    value = get_env_var(PROGRESS_INTERVAL_ENV, str(DEFAULT_PROGRESS_INTERVAL))
+    try:
+        interval = float(value)
+    except ValueError:
+        interval = None
+    # `not >` also rejects NaN
+    if interval is None or not interval > 0:
+        warn(
+            f"Environment variable '{PROGRESS_INTERVAL_ENV}' has value '{value}' "
+            "while a positive number is required. Using "
+            f"{DEFAULT_PROGRESS_INTERVAL:.0f} seconds."
+        )
+        interval = DEFAULT_PROGRESS_INTERVAL
+    return interval
+
+
+class ProgressLogger:
+    """
+    Logs the progress of a polling loop at most once per interval.
+
+    Parameters
+    ----------
+    message : str
+        What the loop is doing, e.g. 'Waiting for results of task 12'.
+    interval : float | None
+        Minimum number of seconds between two summaries. Defaults to the
+        ``V6_PROGRESS_INTERVAL`` environment variable, or 30 seconds if that is
+        not a positive number.
+    log : Callable[[str], None]
+        Function to log the summaries with.
+
+    Examples
+    --------
+    >>> progress = ProgressLogger(f"Waiting for results of task {task_id}")
+    >>> while not finished():
+    >>>     progress.update(lambda: f"{count_finished()}/{n_runs} runs finished")
+    >>>     time.sleep(1)
+    >>> progress.done()
+    """
+
+    def __init__(
+        self,
+        message: str,
+        interval: float | None = None,
+        log: Callable[[str], None] = info,
+    ) -> None:
+        if interval is None:
+            interval = _interval_from_env()
+        self.message = message
+        self.interval = interval
+        self.log = log
+        self._start = time.monotonic()
+        self._last_logged: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the progress logger was created."""
+        return time.monotonic() - self._start
+
+    def update(self, status: str | Callable[[], str] | None = None) -> bool:
+        """
+        Record an iteration of the loop and log a summary if one is due.
+
+        The first update is always logged, after that at most one per interval.
+
+        Parameters
+        ----------
+        status : str | Callable[[], str] | None
+            Status to add to the summary. A callable is only called when a summary
+            is logged, so it may be expensive, e.g. a request to the server.
+
+        Returns
+        -------
+        bool
+            Whether a summary was logged.
+        """
+        now = time.monotonic()
+        if self._last_logged is not None and now - self._last_logged < self.interval:
+            return False
+
+        self._last_logged = now
+        self.log(self._summary(status() if callable(status) else status))
+        return True
+
+    def done(self, status: str | None = None) -> None:
+        """
+        Log the final summary of the loop.
+
+        Parameters
+        ----------
+        status : str | None
+            Final status to add to the summary.
+        """
+        self.log(self._summary(status, prefix="finished after"))
+
+    def _summary(self, status: str | None, prefix: str = "waited") -> str:
+        summary = f"{self.message}: {prefix} {self.elapsed:.0f} s"
+        return f"{summary}, {status}" if status else summary
@@ -0,0 +1,185 @@
+"""
+Node-local cache of parsed CSV and Excel source files.
+
+Every session that extracts the same CSV or Excel file of a node parses it again,
+which takes minutes for large Excel workbooks. The source cache stores the parsed
+table as an Arrow IPC file the first time a source file is read. Later extractions
+of the same file memory-map the cached table instead of parsing the file again.
+
+Callers that pass the table on as is, such as data extraction methods of which the
+result is written to the session, can ask for the Arrow table with ``as_table``. Its
+columns then point to the memory-mapped file and are never copied. A DataFrame is
+always converted from the table, so that it can be modified in place.
+
+Cached tables are keyed by the path, size and modification time of the source file
+and by the read options (e.g. the sheet of an Excel file), so a source file that is
+changed is parsed again. The table of the previous version is then removed.
+
+The cache is disabled by default. Set the ``V6_SOURCE_CACHE_DIR`` environment
+variable to a folder that outlives the algorithm containers, e.g. a volume of the
+node, to enable it.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+from typing import TYPE_CHECKING, Any, Callable
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+from vantage6.algorithm.tools.util import get_env_var, info, warn
+
+SOURCE_CACHE_ENV = "V6_SOURCE_CACHE_DIR"
+SOURCE_CACHE_SUFFIX = ".arrow"
+
+
+class SourceCache:
+    """
+    Cache of parsed source files, stored as Arrow IPC files in a folder.
+
+    Parameters
+    ----------
+    folder : str | None
+        Folder to store the cached tables in, None disables the cache.
+    """
+
+    def __init__(self, folder: str | None = None) -> None:
+        self.folder = folder
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache has a folder."""
+        return bool(self.folder)
+
+    def load(
+        self,
+        path: str,
+        parse: Callable[[], pd.DataFrame],
+        as_table: bool = False,
+        **options: Any,
+    ) -> pd.DataFrame | pa.Table:
+        """
+        Load a parsed source file from the cache, or parse and cache it.
+
+        Parameters
+        ----------
+        path : str
+            Path of the source file.
+        parse : Callable[[], pd.DataFrame]
+            Function that parses the source file.
+        as_table : bool
+            Return the Arrow table instead of a DataFrame. A cached table is then
+            memory-mapped without copying it.
+        **options
+            Read options that change the parsed table, e.g. the sheet name. They
+            must be JSON serializable.
+
+        Returns
+        -------
+        pd.DataFrame | pa.Table
+            The parsed source file.
+        """
+        import pyarrow as pa
+
+        if not self.enabled or not os.path.isfile(path):
+            df = parse()
+            return pa.Table.from_pandas(df) if as_table else df
+
+        cache_file = self._cache_file(path, options)
+        if os.path.exists(cache_file):
+            info(f"Reading parsed '{path}' from the source cache")
+            table = self._read(cache_file)
+            return table if as_table else table.to_pandas()
+
+        df = parse()
+        table = self._write(df, cache_file)
+        if not as_table:
+            return df
+        # a table that could not be converted fails here with the Arrow error
+        return table if table is not None else pa.Table.from_pandas(df)
+
+    def _cache_file(self, path: str, options: dict) -> str:
+        """Path of the cached table: '<source key>-<version key>.arrow'."""
+        stat = os.stat(path)
+        source = [os.path.abspath(path), options]
+        version = [stat.st_size, stat.st_mtime_ns]
+        return os.path.join(
+            self.folder, f"{_digest(source)}-{_digest(version)}{SOURCE_CACHE_SUFFIX}"
+        )
+
+    @staticmethod
+    def _read(cache_file: str) -> pa.Table:
+        """Memory-map a cached table, its buffers keep the mapping open."""
+        import pyarrow as pa
+
+        with pa.memory_map(cache_file) as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def _write(self, df: pd.DataFrame, cache_file: str) -> pa.Table | None:
+        """
+        Store a parsed source file in the cache.
+
+        Returns the Arrow table of the DataFrame, or None if it cannot be converted.
+        """
+        import pyarrow as pa
+
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowException, ValueError) as e:
+            # e.g. columns with mixed types can not be stored in an Arrow table
+            warn(f"Could not add '{cache_file}' to the source cache: {e}")
+            return None
+
+        os.makedirs(self.folder, exist_ok=True)
+        # other versions of the same source file are outdated
+        source_key = os.path.basename(cache_file).split("-")[0]
+        for outdated in glob.glob(
+            os.path.join(self.folder, f"{source_key}-*{SOURCE_CACHE_SUFFIX}")
+        ):
+            _remove(outdated)
+
+        # write to a temporary file first, so that containers that read the same
+        # source at the same time never see a partial table
+        fd, tmp_file = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            warn(f"Could not add '{cache_file}' to the source cache: {e}")
+            _remove(tmp_file)
+        return table
+
+
+def _digest(value: Any) -> str:
+    """Short hash of a JSON serializable value."""
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def get_source_cache() -> SourceCache:
+    """
+    Get the source cache configured by ``V6_SOURCE_CACHE_DIR``.
+
+    Returns
+    -------
+    SourceCache
+        The source cache, disabled if the environment variable is not set.
+    """
+    return SourceCache(get_env_var(SOURCE_CACHE_ENV))
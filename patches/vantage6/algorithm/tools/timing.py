@@ -0,0 +1,97 @@
+"""
+Timing of the phases of an algorithm run.
+
+The wrapper and the decorators record how long each phase of a run takes (reading
+the input, importing the module, reading dataframes, ...) in the process-wide
+``timer``. Phases can be nested: the time of a phase excludes the time spent in the
+phases nested in it, so that the phases add up to the total run time. For example,
+the ``method`` phase contains the algorithm method itself, but not the parquet reads
+done by its ``@data`` decorator, which are recorded as ``read_dataframes``.
+"""
+
+import json
+import time
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from vantage6.algorithm.tools.util import info
+
+# set this environment variable to 'true' to also write the timings of a run to a
+# JSON file next to the output file
+TIMINGS_SIDECAR_ENV = "V6_TIMINGS_SIDECAR"
+TIMINGS_SIDECAR_SUFFIX = ".timings.json"
+
+
+class PhaseTimer:
+    """Accumulates the exclusive wall time of named phases."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all recorded phases and restart the total run time."""
+        self.phases: dict[str, float] = {}
+        self._nested: list[float] = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Record the time spent in the body of the ``with`` statement as ``name``.
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase. Time of repeated phases with the same name is summed.
+        """
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested.pop()
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - nested
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def as_dict(self) -> dict[str, float]:
+        """
+        Return the recorded phases and the total time since the last reset.
+
+        Returns
+        -------
+        dict[str, float]
+            Time in seconds per phase, plus the ``total`` time.
+        """
+        return {**self.phases, "total": time.perf_counter() - self._start}
+
+
+# timer shared by the wrapper and the decorators of this process
+timer = PhaseTimer()
+phase = timer.phase
+
+
+def report_timings(output_file: str | None = None, sidecar: bool = False) -> dict:
+    """
+    Log the phase timings of this run as a single structured line.
+
+    Parameters
+    ----------
+    output_file : str | None
+        Output file of the run. The sidecar file is written next to it.
+    sidecar : bool
+        Whether to also write the timings to ``<output_file>.timings.json``.
+
+    Returns
+    -------
+    dict
+        The reported timings in seconds.
+    """
+    timings = {name: round(seconds, 6) for name, seconds in timer.as_dict().items()}
+    info(f"timings {json.dumps(timings)}")
+    if sidecar and output_file:
+        with open(f"{output_file}{TIMINGS_SIDECAR_SUFFIX}", "w") as fp:
+            json.dump(timings, fp)
+    return timings
@@ -1,7 +1,13 @@
 import sys
 import os
+import atexit
 import base64
 import binascii
+import json
+import threading
+import time
+
+from datetime import datetime, timezone
 
 from vantage6.common.globals import (
     STRING_ENCODING,
@@ -10,6 +16,214 @@ from vantage6.common.globals import (
 )
 from vantage6.common.enum import AlgorithmStepType
 from vantage6.algorithm.tools.exceptions import EnvironmentVariableError
+from vantage6.algorithm.tools.context import get_context
+
+# set to 'json' to log one JSON object per line instead of 'level > message'
+LOG_FORMAT_ENV = "V6_LOG_FORMAT"
+# number of messages that are buffered before they are written. Set to 0 (default)
+# to write every message immediately.
+LOG_BUFFER_SIZE_ENV = "V6_LOG_BUFFER_SIZE"
+# maximum number of seconds that messages stay in the buffer
+LOG_FLUSH_INTERVAL_ENV = "V6_LOG_FLUSH_INTERVAL"
+LOG_FORMATS = ("text", "json")
+
+# warnings about invalid log settings that were already written
+_log_setting_warnings: set[str] = set()
+
+
+def _warn_log_setting(msg: str) -> None:
+    """Warn about an invalid log setting on stderr, once per message."""
+    if msg not in _log_setting_warnings:
+        _log_setting_warnings.add(msg)
+        sys.stderr.write(f"warn > {msg}\n")
+
+
+class LogWriter:
+    """
+    Writes the log messages of the algorithm container to stdout.
+
+    Messages are either written as ``level > message`` or, in structured mode, as
+    JSON lines with the wall and monotonic time, level, method and the task and
+    organization ids that identify the run, which the node can parse and index.
+    Optionally, messages are collected in a bounded buffer which is written when it
+    is full, when an error is logged, every ``flush_interval`` seconds and when the
+    process exits.
+
+    Parameters
+    ----------
+    structured : bool
+        Whether to write JSON lines.
+    buffer_size : int
+        Maximum number of buffered messages, 0 to write every message directly.
+    flush_interval : float
+        Maximum number of seconds that messages stay in the buffer.
+    """
+
+    def __init__(
+        self,
+        structured: bool = False,
+        buffer_size: int = 0,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.structured = structured
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+        # JSON encoded labels of the run, rebuilt when the container context changes
+        self._labels: tuple[object, str] | None = None
+
+    @classmethod
+    def from_env(cls) -> "LogWriter":
+        """
+        Create a log writer from the ``V6_LOG_*`` environment variables.
+
+        Invalid values are replaced by the defaults, with a warning on stderr, as
+        logging must not make the algorithm fail.
+
+        Returns
+        -------
+        LogWriter
+            The log writer, writing unbuffered plain text if none are set.
+        """
+        log_format = get_env_var(LOG_FORMAT_ENV, "text")
+        if log_format not in LOG_FORMATS:
+            _warn_log_setting(
+                f"Environment variable '{LOG_FORMAT_ENV}' has value '{log_format}', "
+                f"expected one of {', '.join(LOG_FORMATS)}. Using 'text'."
+            )
+            log_format = "text"
+
+        try:
+            buffer_size = get_env_var(LOG_BUFFER_SIZE_ENV, "0", as_type="int")
+            check_envvar_value_positive(LOG_BUFFER_SIZE_ENV, buffer_size)
+        except EnvironmentVariableError as e:
+            _warn_log_setting(f"{e} Logging unbuffered.")
+            buffer_size = 0
+
+        flush_interval = get_env_var(LOG_FLUSH_INTERVAL_ENV, "1.0")
+        try:
+            flush_interval = float(flush_interval)
+            check_envvar_value_positive(LOG_FLUSH_INTERVAL_ENV, flush_interval)
+        except (ValueError, EnvironmentVariableError):
+            _warn_log_setting(
+                f"Environment variable '{LOG_FLUSH_INTERVAL_ENV}' has value "
+                f"'{flush_interval}' while a positive number is required. Using 1.0."
+            )
+            flush_interval = 1.0
+
+        return cls(
+            structured=log_format == "json",
+            buffer_size=buffer_size,
+            flush_interval=flush_interval,
+        )
+
+    def write(self, level: str, msg: str) -> None:
+        """
+        Write (or buffer) a log message.
+
+        Parameters
+        ----------
+        level : str
+            Level of the message: 'info', 'warn' or 'error'.
+        msg : str
+            The message.
+        """
+        line = self._format(level, msg)
+        if not self.buffer_size:
+            sys.stdout.write(line)
+            return
+
+        with self._lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.buffer_size
+        if full or level == "error":
+            self.flush()
+        elif self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="v6-log-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def flush(self) -> None:
+        """Write all buffered messages to stdout."""
+        with self._lock:
+            if self._buffer:
+                sys.stdout.write("".join(self._buffer))
+                sys.stdout.flush()
+                self._buffer.clear()
+
+    def _flush_periodically(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _format(self, level: str, msg: str) -> str:
+        if not self.structured:
+            return f"{level} > {msg}\n"
+
+        # only the time and the message differ between the messages of a run, so
+        # the other fields are encoded once
+        wall_time = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        return (
+            f'{{"time": "{wall_time}", "monotonic": {time.monotonic():.6f}, '
+            f'"level": "{level}", {self._encoded_labels()}, '
+            f'"message": {json.dumps(str(msg))}}}\n'
+        )
+
+    def _encoded_labels(self) -> str:
+        try:
+            context = get_context()
+        except Exception:
+            # logging must never fail, e.g. on an invalid environment
+            context = None
+        if self._labels is None or self._labels[0] is not context:
+            # the container does not know the id of its run. A run is the task
+            # executed by one organization, so the task and organization ids
+            # identify it.
+            try:
+                method = context.method
+                payload = context.token_payload or {}
+            except Exception:
+                method, payload = None, {}
+            labels = json.dumps(
+                {
+                    "method": method,
+                    "task_id": payload.get("task_id"),
+                    "organization_id": payload.get("organization_id"),
+                }
+            )[1:-1]
+            self._labels = (context, labels)
+        return self._labels[1]
+
+
+_log_writer: LogWriter | None = None
+
+
+def _get_log_writer() -> LogWriter:
+    global _log_writer
+    if _log_writer is None:
+        _log_writer = LogWriter.from_env()
+    return _log_writer
+
+
+def configure_logging() -> None:
+    """
+    Write the buffered messages and re-read the ``V6_LOG_*`` environment variables.
+    """
+    global _log_writer
+    flush_logs()
+    _log_writer = None
+
+
+def flush_logs() -> None:
+    """Write all buffered log messages to stdout."""
+    if _log_writer is not None:
+        _log_writer.flush()
+
+
+atexit.register(flush_logs)
 
 
 def info(msg: str) -> None:
@@ -21,7 +235,7 @@ def info(msg: str) -> None:
     msg : str
         Message to be printed
     """
-    sys.stdout.write(f"info > {msg}\n")
+    _get_log_writer().write("info", msg)
 
 
 def warn(msg: str) -> None:
@@ -33,19 +247,21 @@ def warn(msg: str) -> None:
     msg : str
         Warning message to be printed
     """
-    sys.stdout.write(f"warn > {msg}\n")
+    _get_log_writer().write("warn", msg)
 
 
 def error(msg: str) -> None:
     """
     Print an error message to stdout.
 
+    Buffered messages are written immediately, together with the error.
+
     Parameters
     ----------
     msg : str
         Error message to be printed
     """
-    sys.stdout.write(f"error > {msg}\n")
+    _get_log_writer().write("error", msg)
 
 
 def get_env_var(
@@ -195,18 +411,9 @@ def get_action() -> AlgorithmStepType:
     AlgorithmStepType
         The action of the container.
     """
-    if ContainerEnvNames.FUNCTION_ACTION.value not in os.environ:
+    action = get_context().action
+    if action is None:
         raise EnvironmentVariableError(
             f"Environment variable {ContainerEnvNames.FUNCTION_ACTION.value} not found."
         )
-
-    requested_action = os.environ[ContainerEnvNames.FUNCTION_ACTION.value]
-    try:
-        action = AlgorithmStepType(requested_action)
-    except ValueError as exc:
-        raise EnvironmentVariableError(
-            f"Environment variable {ContainerEnvNames.FUNCTION_ACTION.value} has value "
-            f"'{requested_action}' which is not a valid action."
-        ) from exc
-
     return action
@@ -0,0 +1,308 @@
+"""
+Long-lived worker mode for the algorithm wrapper.
+
+Starting a fresh Python process for every task means that the algorithm module and
+all of its dependencies are imported again for every task. For small tasks this
+startup time dominates the wall time. The worker imports the algorithm module once
+and then processes jobs from a spool directory one after another.
+
+A job is submitted by writing a JSON file with the extension ``.job`` to the spool
+directory (write it under another name first and rename it, so that the worker never
+reads a half-written job):
+
+.. code-block:: json
+
+    {
+        "input_file": "/mnt/data/input",
+        "method": "sum",
+        "action": "federated_compute",
+        "output_file": "/mnt/data/output",
+        "env": {"SESSION_FOLDER": "/mnt/session", "...": "..."}
+    }
+
+The optional ``env`` contains the (possibly node-encoded) container environment
+variables of the job. Every job starts from the environment the worker was started
+with, without its container variables (token, host, input file, databases, etc.),
+and only sees the container variables of its own ``env``. When the job has finished,
+the worker writes a ``<name>.done`` file containing the job status. The worker stops
+when a file named ``stop`` appears in the spool directory.
+
+A claimed job is renamed to ``<name>.<owner>.running``, where the owner identifies
+the worker process. When a worker starts, it returns the jobs of crashed workers on
+the same host to the queue.
+
+Jobs of the same session often read the same dataframes. Set
+``V6_DATAFRAME_CACHE_MB`` to keep recently read dataframes in memory between jobs
+(see ``vantage6.algorithm.tools.dataframe_cache``). The cache statistics are then
+added to the job status.
+"""
+
+import os
+import json
+import hashlib
+import socket
+import time
+import traceback
+
+from vantage6.common.globals import ContainerEnvNames
+from vantage6.algorithm.tools.context import reset_context
+from vantage6.algorithm.tools.dataframe_cache import get_dataframe_cache
+from vantage6.algorithm.tools.util import info, error, get_env_var
+from vantage6.algorithm.tools.timing import phase, timer
+from vantage6.algorithm.tools.wrap import (
+    _decode_env_vars,
+    _get_module_name,
+    _import_module,
+    run_job,
+)
+
+# environment variable that specifies the spool directory of the worker
+WORKER_SPOOL_ENV = "V6_WORKER_SPOOL"
+
+JOB_EXTENSION = ".job"
+RUNNING_EXTENSION = ".running"
+DONE_EXTENSION = ".done"
+STOP_FILE = "stop"
+
+
+def run_worker(
+    spool_dir: str | None = None,
+    poll_interval: float = 0.05,
+    max_jobs: int | None = None,
+    log_traceback: bool = True,
+) -> None:
+    """
+    Process algorithm jobs from a spool directory until asked to stop.
+
+    Parameters
+    ----------
+    spool_dir : str | None
+        Directory to watch for ``.job`` files. Defaults to the directory in the
+        ``V6_WORKER_SPOOL`` environment variable.
+    poll_interval : float
+        Time in seconds to wait before checking for new jobs when the spool
+        directory is empty.
+    max_jobs : int | None
+        Stop after this many jobs. By default the worker runs until a ``stop``
+        file is created in the spool directory.
+    log_traceback: bool
+        Whether to print the full error message from algorithms or not.
+    """
+    spool_dir = spool_dir or os.environ.get(WORKER_SPOOL_ENV)
+    if not spool_dir:
+        error(
+            f"No spool directory specified! Pass it or set the {WORKER_SPOOL_ENV} "
+            "environment variable. Exiting..."
+        )
+        exit(1)
+    os.makedirs(spool_dir, exist_ok=True)
+
+    module = _get_module_name()
+    info(f"worker for {module}, watching {spool_dir}")
+
+    # Decode environment variables that are encoded by the node.
+    _decode_env_vars()
+    base_environ = _base_environ()
+
+    _reclaim_stale_jobs(spool_dir)
+
+    # import the algorithm module once, it is cached in sys.modules for all jobs
+    _import_module(module, log_traceback=log_traceback)
+
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        if os.path.exists(os.path.join(spool_dir, STOP_FILE)):
+            info("Stop file found, stopping worker")
+            break
+
+        job_file = _claim_next_job(spool_dir)
+        if job_file is None:
+            time.sleep(poll_interval)
+            continue
+
+        status = _process_job(job_file, module, log_traceback, base_environ)
+        done_file = _job_name(job_file) + DONE_EXTENSION
+        with open(f"{done_file}.tmp", "w") as fp:
+            json.dump(status, fp)
+        os.replace(f"{done_file}.tmp", done_file)
+        os.remove(job_file)
+        processed += 1
+
+
+def _base_environ() -> dict:
+    """
+    Environment of the worker without the container variables of a job.
+
+    Returns
+    -------
+    dict
+        The environment variables that every job starts with.
+    """
+    container_variables = {name.value for name in ContainerEnvNames}
+    return {
+        key: value
+        for key, value in os.environ.items()
+        if key not in container_variables
+        and not key.startswith(ContainerEnvNames.DB_PARAM_PREFIX.value)
+        and not key.startswith("DATABASE_")
+    }
+
+
+def _owner() -> str:
+    """Identifier of this worker process: its pid and a hash of the host name."""
+    host = hashlib.sha256(socket.gethostname().encode()).hexdigest()[:8]
+    return f"{os.getpid()}-{host}"
+
+
+def _job_name(running_file: str) -> str:
+    """Path of a running job without the owner and extension."""
+    return running_file[: -len(RUNNING_EXTENSION)].rpartition(".")[0]
+
+
+def _reclaim_stale_jobs(spool_dir: str) -> None:
+    """
+    Return the jobs of crashed workers on this host to the queue.
+
+    A job is stale if the process that claimed it no longer exists. Jobs claimed on
+    other hosts can not be checked and are left alone.
+
+    Parameters
+    ----------
+    spool_dir : str
+        The spool directory.
+    """
+    own_pid, host = _owner().split("-")
+    for entry in os.scandir(spool_dir):
+        if not entry.name.endswith(RUNNING_EXTENSION):
+            continue
+        owner = entry.name[: -len(RUNNING_EXTENSION)].rpartition(".")[2]
+        pid, _, owner_host = owner.partition("-")
+        if owner_host != host or not pid.isdigit():
+            continue
+        # a restarted worker may get the pid of the crashed one, e.g. pid 1 in a
+        # container, but it has not claimed any job yet
+        if pid != own_pid and _process_exists(int(pid)):
+            continue
+        info(f"Returning job {entry.name} of a stopped worker to the queue")
+        try:
+            os.rename(entry.path, _job_name(entry.path) + JOB_EXTENSION)
+        except FileNotFoundError:
+            # reclaimed by another worker
+            pass
+
+
+def _process_exists(pid: int) -> bool:
+    """Whether a process with this pid exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # the process exists, but belongs to another user
+        return True
+    return True
+
+
+def _claim_next_job(spool_dir: str) -> str | None:
+    """
+    Claim the oldest job in the spool directory.
+
+    The job is claimed by renaming it to ``.<owner>.running``, which is atomic, so
+    multiple workers can share a spool directory.
+
+    Parameters
+    ----------
+    spool_dir : str
+        The spool directory.
+
+    Returns
+    -------
+    str | None
+        Path of the claimed job file, or None if there are no jobs.
+    """
+    jobs = sorted(
+        (entry.stat().st_mtime_ns, entry.path)
+        for entry in os.scandir(spool_dir)
+        if entry.name.endswith(JOB_EXTENSION)
+    )
+    for _, job_file in jobs:
+        running_file = (
+            f"{job_file[: -len(JOB_EXTENSION)]}.{_owner()}{RUNNING_EXTENSION}"
+        )
+        try:
+            os.rename(job_file, running_file)
+        except FileNotFoundError:
+            # claimed by another worker
+            continue
+        return running_file
+    return None
+
+
+def _process_job(
+    job_file: str, module: str, log_traceback: bool, base_environ: dict | None = None
+) -> dict:
+    """
+    Run a single job with its own environment.
+
+    Parameters
+    ----------
+    job_file : str
+        Path to the claimed job file.
+    module : str
+        Python module name of the algorithm.
+    log_traceback: bool
+        Whether to print the full error message from algorithms or not.
+    base_environ : dict | None
+        Environment the job starts from, see ``_base_environ``. Defaults to the
+        current environment.
+
+    Returns
+    -------
+    dict
+        The job status, containing the keys ``status``, ``duration`` and, for failed
+        jobs, ``error``.
+    """
+    start = time.perf_counter()
+    timer.reset()
+    environ = dict(os.environ)
+    cwd = os.getcwd()
+    try:
+        with open(job_file) as fp:
+            job = json.load(fp)
+
+        if base_environ is not None:
+            os.environ.clear()
+            os.environ.update(base_environ)
+        with phase("decode_env_vars"):
+            for key, value in job.get("env", {}).items():
+                # the worker environment was decoded at startup, so only decode the
+                # variables of this job
+                os.environ[key] = value
+                os.environ[key] = get_env_var(key)
+        os.environ[ContainerEnvNames.INPUT_FILE.value] = job["input_file"]
+        os.environ[ContainerEnvNames.OUTPUT_FILE.value] = job["output_file"]
+        os.environ[ContainerEnvNames.ALGORITHM_METHOD.value] = job["method"]
+        os.environ[ContainerEnvNames.FUNCTION_ACTION.value] = job["action"]
+        reset_context()
+
+        info(f"Running job {os.path.basename(job_file)}")
+        run_job(module, log_traceback=log_traceback)
+        status = {"status": "completed"}
+    except SystemExit as exc:
+        # the wrapper exits on algorithm errors, which must not stop the worker
+        status = {"status": "failed", "error": f"exited with code {exc.code}"}
+    except Exception as exc:
+        error(f"Job {os.path.basename(job_file)} failed: {exc}")
+        if log_traceback:
+            error(traceback.format_exc())
+        status = {"status": "failed", "error": str(exc)}
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+        os.chdir(cwd)
+        reset_context()
+
+    status["duration"] = time.perf_counter() - start
+    if get_dataframe_cache().enabled:
+        status["dataframe_cache"] = get_dataframe_cache().stats()
+    return status
@@ -2,17 +2,38 @@ import os
 import importlib
 import traceback
 import json
-import pyarrow.parquet as pq
 
+from types import ModuleType
 from typing import Any
 
 from vantage6.common import serialization
 from vantage6.common.client import deserialization
-from vantage6.common.globals import ContainerEnvNames
-from vantage6.algorithm.tools.util import info, error, get_env_var, get_action
+from vantage6.algorithm.tools.context import get_context, reset_context
+from vantage6.algorithm.tools.util import (
+    info,
+    error,
+    flush_logs,
+    get_env_var,
+    get_action,
+)
 from vantage6.algorithm.tools.exceptions import DeserializationError
+from vantage6.algorithm.tools.metrics import (
+    RESOURCE_METRICS_ENV,
+    report_resources,
+    resource_snapshot,
+)
+from vantage6.algorithm.tools.parquet import ParquetWriteProfile, get_write_profile
+from vantage6.algorithm.tools.timing import (
+    TIMINGS_SIDECAR_ENV,
+    phase,
+    report_timings,
+    timer,
+)
 from vantage6.common.enum import AlgorithmStepType
 
+# actions whose output is a session dataframe, which is written as parquet
+SESSION_ACTIONS = (AlgorithmStepType.DATA_EXTRACTION, AlgorithmStepType.PREPROCESSING)
+
 
 def wrap_algorithm(log_traceback: bool = True) -> None:
     """
@@ -40,6 +61,98 @@ def wrap_algorithm(log_traceback: bool = True) -> None:
         default False. Algorithm developers should set this to False if
         the error messages may contain sensitive information. By default True.
     """
+    timer.reset()
+    module = _get_module_name()
+    info(f"wrapper for {module}")
+
+    # Decode environment variables that are encoded by the node.
+    with phase("decode_env_vars"):
+        _decode_env_vars()
+    # build the container context from the decoded environment
+    reset_context()
+
+    run_job(module, log_traceback=log_traceback)
+
+
+def run_job(module: str, log_traceback: bool = True) -> None:
+    """
+    Run a single algorithm job described by the (decoded) environment variables.
+
+    The input file, method and output file are read from the ``INPUT_FILE``,
+    ``ALGORITHM_METHOD`` and ``OUTPUT_FILE`` environment variables, through the
+    container context (see ``vantage6.algorithm.tools.context``). When the job
+    ends, also when it fails, the time spent in each phase of the job and the
+    resources it used are logged (see ``vantage6.algorithm.tools.timing`` and
+    ``vantage6.algorithm.tools.metrics``).
+
+    Parameters
+    ----------
+    module : str
+        Python module name of the algorithm.
+    log_traceback: bool
+        Whether to print the full error message from algorithms or not.
+    """
+    context = get_context()
+    resources_start = resource_snapshot()
+    completed = False
+    try:
+        # read input from the mounted input file.
+        input_file = context.input_file
+
+        info(f"Reading input file {input_file}")
+        with phase("load_input"):
+            input_data = load_input(input_file)
+
+        # only session steps write parquet output. The profile is resolved before
+        # the method runs, so that invalid settings fail the task early.
+        write_profile = None
+        if context.action in SESSION_ACTIONS:
+            write_profile = get_write_profile(input_data)
+        typed = _typed_results(input_data)
+
+        # make the actual call to the method/function
+        method = context.method
+        info("Dispatching ...")
+        output = _run_algorithm_method(
+            method=method,
+            input_data=input_data,
+            module=module,
+            log_traceback=log_traceback,
+        )
+
+        # write output from the method to mounted output file. Which will be
+        # transferred back to the server by the node-instance.
+        output_file = context.output_file
+        info(f"Writing output to {output_file}")
+
+        with phase("write_output"):
+            _write_output(output, output_file, write_profile, typed)
+        completed = True
+    finally:
+        report_timings(
+            context.output_file,
+            sidecar=get_env_var(TIMINGS_SIDECAR_ENV, "false", as_type="bool"),
+        )
+        report_resources(
+            resources_start,
+            context.output_file,
+            write=get_env_var(RESOURCE_METRICS_ENV, "false", as_type="bool"),
+            method=context.method,
+            action=context.action.value if context.action else None,
+            status="completed" if completed else "failed",
+        )
+        flush_logs()
+
+
+def _get_module_name() -> str:
+    """
+    Get the name of the algorithm module, exit if it is not set.
+
+    Returns
+    -------
+    str
+        The module name from the ``PKG_NAME`` environment variable.
+    """
     # get the module name from the environment variable. Note that this env var
     # is set in the Dockerfile and is therefore not encoded.
     module = os.environ.get("PKG_NAME")
@@ -49,30 +162,34 @@ def wrap_algorithm(log_traceback: bool = True) -> None:
             "variable is specified in the Dockerfile. Exiting..."
         )
         exit(1)
-    info(f"wrapper for {module}")
-
-    # Decode environment variables that are encoded by the node.
-    _decode_env_vars()
-
-    # read input from the mounted input file.
-    input_file = os.environ[ContainerEnvNames.INPUT_FILE.value]
+    return module
 
-    info(f"Reading input file {input_file}")
-    input_data = load_input(input_file)
 
-    # make the actual call to the method/function
-    method = os.environ[ContainerEnvNames.ALGORITHM_METHOD.value]
-    info("Dispatching ...")
-    output = _run_algorithm_method(
-        method=method, input_data=input_data, module=module, log_traceback=log_traceback
-    )
+def _import_module(module: str, log_traceback: bool = True) -> ModuleType:
+    """
+    Import the algorithm module, exit if it can not be imported.
 
-    # write output from the method to mounted output file. Which will be
-    # transferred back to the server by the node-instance.
-    output_file = os.environ[ContainerEnvNames.OUTPUT_FILE.value]
-    info(f"Writing output to {output_file}")
+    Parameters
+    ----------
+    module : str
+        The module that contains the algorithm.
+    log_traceback: bool, optional
+        Whether to print the full error message or not. By default True.
 
-    _write_output(output, output_file)
+    Returns
+    -------
+    ModuleType
+        The imported algorithm module.
+    """
+    try:
+        lib = importlib.import_module(module)
+        info(f"Module '{module}' imported!")
+    except ModuleNotFoundError:
+        error(f"Module '{module}' can not be imported! Exiting...")
+        if log_traceback:
+            error(traceback.print_exc())
+        exit(1)
+    return lib
 
 
 def _run_algorithm_method(
@@ -103,15 +220,8 @@ def _run_algorithm_method(
     Any
         The result of the algorithm.
     """
-    # import algorithm module
-    try:
-        lib = importlib.import_module(module)
-        info(f"Module '{module}' imported!")
-    except ModuleNotFoundError:
-        error(f"Module '{module}' can not be imported! Exiting...")
-        if log_traceback:
-            error(traceback.print_exc())
-        exit(1)
+    with phase("import_module"):
+        lib = _import_module(module, log_traceback=log_traceback)
 
     # get algorithm method and attempt to load it
     try:
@@ -128,7 +238,8 @@ def _run_algorithm_method(
 
     # try to run the method
     try:
-        result = method_fn(*args, **kwargs)
+        with phase("method"):
+            result = method_fn(*args, **kwargs)
     except Exception as exc:
         error(f"Error encountered while calling {method}: {exc}")
         if log_traceback:
@@ -142,6 +253,10 @@ def load_input(input_file: str) -> Any:
     """
     Load the input from the input file.
 
+    The input is JSON, unless the file starts with the header of the binary input
+    format (see ``vantage6.common.serialization.serialize_binary``). In that case
+    array arguments are zero-copy views over the memory-mapped input file.
+
     Parameters
     ----------
     input_file : str
@@ -158,6 +273,9 @@ def load_input(input_file: str) -> Any:
         Failed to deserialize input data
     """
     with open(input_file, "rb") as fp:
+        if deserialization.is_binary(fp):
+            info("Input file is in the binary input format")
+            return deserialization.deserialize_binary(fp)
         try:
             input_data = deserialization.deserialize(fp)
         except DeserializationError as exc:
@@ -170,7 +288,19 @@ def load_input(input_file: str) -> Any:
     return input_data
 
 
-def _write_output(output: Any, output_file: str) -> None:
+def _typed_results(input_data: Any) -> bool:
+    """Whether the task input asks for results in the typed JSON encoding."""
+    return isinstance(input_data, dict) and bool(
+        input_data.get(serialization.TYPED_RESULTS_INPUT_KEY)
+    )
+
+
+def _write_output(
+    output: Any,
+    output_file: str,
+    write_profile: ParquetWriteProfile | None = None,
+    typed: bool = False,
+) -> None:
     """
     Write output to output file.
 
@@ -179,7 +309,8 @@ def _write_output(output: Any, output_file: str) -> None:
     data to the server.
 
     In the case we are building a session, the output of the algorithm is expected to
-    be a parquet table. In this case, the output file should contain the parquet data.
+    be a parquet table, or a record batch reader that is written batch by batch. In
+    this case, the output file should contain the parquet data.
 
     Parameters
     ----------
@@ -187,20 +318,28 @@ def _write_output(output: Any, output_file: str) -> None:
         Output of the algorithm
     output_file : str
         Path to the output file
+    write_profile : ParquetWriteProfile | None
+        Settings to write parquet output with. Defaults to the pyarrow defaults.
+    typed : bool
+        Whether to encode arrays and pandas objects in JSON output as typed objects,
+        which only vantage6 clients decode. Subtasks of which the results are read
+        by a central method ask for this in their input. By default the output is
+        plain JSON.
     """
     action = get_action()
 
-    if action in [AlgorithmStepType.DATA_EXTRACTION, AlgorithmStepType.PREPROCESSING]:
+    if action in SESSION_ACTIONS:
         # If the action is data extraction or preprocessing, the output should be a
         # parquet table. In this case, the output file should contain the parquet data.
         # It is important that we do not alter this format as it would complicate
         # writing algorithms that are not using this wrapper. So we use the standard
-        # paruet serialization method.
-        pq.write_table(output, output_file)
+        # paruet serialization method. The write profile only tunes how the
+        # standard parquet file is written.
+        (write_profile or ParquetWriteProfile()).write_table(output, output_file)
     else:
 
         with open(output_file, "wb") as fp:
-            serialized = serialization.serialize(output)
+            serialized = serialization.serialize(output, typed=typed)
             fp.write(serialized)
 
 
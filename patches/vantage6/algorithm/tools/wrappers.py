@@ -18,15 +18,44 @@ by the vantage6 node based on its configuration file.
 from __future__ import annotations
 import io
 import os
+import threading
 import pandas as pd
 
-from sqlalchemy import create_engine
 from enum import Enum
-from SPARQLWrapper import SPARQLWrapper, CSV
-
-from vantage6.algorithm.tools.util import info, error
-
-_SPARQL_RETURN_FORMAT = CSV
+from itertools import chain
+from typing import TYPE_CHECKING, Any
+
+from vantage6.algorithm.tools.exceptions import UserInputError
+from vantage6.algorithm.tools.source_cache import get_source_cache
+from vantage6.algorithm.tools.util import (
+    check_envvar_value_positive,
+    error,
+    get_env_var,
+    info,
+)
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    from sqlalchemy import Select
+    from sqlalchemy.engine import Engine
+
+# sqlalchemy and SPARQLWrapper are imported in the loaders that need them, so that
+# importing this module does not slow down the startup of every algorithm container.
+# This equals `SPARQLWrapper.CSV`.
+_SPARQL_RETURN_FORMAT = "csv"
+
+# connection pool settings of the SQL engines, see `get_sql_engine`
+SQL_POOL_SIZE_ENV = "V6_SQL_POOL_SIZE"
+SQL_POOL_PRE_PING_ENV = "V6_SQL_POOL_PRE_PING"
+# number of rows per batch of `load_sql_batches`
+SQL_CHUNK_SIZE_ENV = "V6_SQL_CHUNK_SIZE"
+DEFAULT_SQL_CHUNK_SIZE = 100_000
+
+# aggregate functions that `build_aggregate_query` can push down to the database
+SQL_AGGREGATES = ("sum", "count", "mean", "min", "max")
+
+_sql_engines: dict[str, Engine] = {}
+_sql_engines_lock = threading.Lock()
 
 
 class DatabaseType(str, Enum):
@@ -55,8 +84,13 @@ class DatabaseType(str, Enum):
 
 
 def load_data(
-    database_uri: str, db_type: str = None, query: str = None, sheet_name: str = None
-) -> pd.DataFrame:
+    database_uri: str,
+    db_type: str = None,
+    query: str = None,
+    sheet_name: str = None,
+    stream: bool = False,
+    chunksize: int | None = None,
+) -> pd.DataFrame | pa.RecordBatchReader:
     """
     Read data from database and give it back to the algorithm.
 
@@ -64,6 +98,10 @@ def load_data(
     is required for SQL and SparQL databases. If it is not present, this function will
     exit the algorithm.
 
+    The result of a SQL query can be streamed instead, see ``load_sql_batches``. A
+    data extraction function can return the reader, so that the result is written
+    to the session batch by batch and is never completely in memory.
+
     Parameters
     ----------
     database_uri : str
@@ -77,11 +115,17 @@ def load_data(
     sheet_name : str
         The sheet name to read from the Excel file. This is optional and
         only for Excel databases.
+    stream : bool
+        Whether to stream the result of a SQL query in batches. Other database
+        types are always loaded at once.
+    chunksize : int | None
+        Number of rows per batch when streaming. Defaults to the
+        ``V6_SQL_CHUNK_SIZE`` environment variable, or 100000.
 
     Returns
     -------
-    pd.DataFrame
-        The data from the database
+    pd.DataFrame | pa.RecordBatchReader
+        The data from the database, or a reader of its batches when streaming
     """
     # load initial dataframe
     df = pd.DataFrame()
@@ -101,6 +145,8 @@ def load_data(
         if not query:
             error(f"Query is required for database type '{db_type}'")
             exit(1)
+        if stream and db_type == DatabaseType.SQL:
+            return load_sql_batches(database_uri, query, chunksize=chunksize)
         df = loader(database_uri, query=query)
     else:
         df = loader(database_uri)
@@ -137,7 +183,7 @@ def _select_loader(database_type: str) -> callable | None:
         return None
 
 
-def load_csv_data(database_uri: str) -> pd.DataFrame:
+def load_csv_data(database_uri: str, as_table: bool = False) -> pd.DataFrame | pa.Table:
     """
     Load the local privacy-sensitive data from the database.
 
@@ -145,16 +191,23 @@ def load_csv_data(database_uri: str) -> pd.DataFrame:
     ----------
     database_uri : str
         URI of the csv file, supplied by te node
+    as_table : bool
+        Return an Arrow table, which is not copied when it is read from the source
+        cache. Use this when the data is passed on as is, e.g. to the session.
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame | pa.Table
         The data from the csv file
     """
-    return pd.read_csv(database_uri)
+    return get_source_cache().load(
+        database_uri, lambda: pd.read_csv(database_uri), as_table=as_table
+    )
 
 
-def load_excel_data(database_uri: str, sheet_name: str = None) -> pd.DataFrame:
+def load_excel_data(
+    database_uri: str, sheet_name: str = None, as_table: bool = False
+) -> pd.DataFrame | pa.Table:
     """
     Load the local privacy-sensitive data from the database.
 
@@ -165,10 +218,13 @@ def load_excel_data(database_uri: str, sheet_name: str = None) -> pd.DataFrame:
     sheet_name : str | None
         Sheet name to be read from the excel file. If None, the first sheet
         will be read.
+    as_table : bool
+        Return an Arrow table, which is not copied when it is read from the source
+        cache. Use this when the data is passed on as is, e.g. to the session.
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame | pa.Table
         The data from the excel file
     """
     if sheet_name:
@@ -177,7 +233,12 @@ def load_excel_data(database_uri: str, sheet_name: str = None) -> pd.DataFrame:
         # The default sheet_name is 0, which is the first sheet
         sheet_name = 0
     # TODO add try/except to check if sheet_name exists
-    return pd.read_excel(database_uri, sheet_name=sheet_name)
+    return get_source_cache().load(
+        database_uri,
+        lambda: pd.read_excel(database_uri, sheet_name=sheet_name),
+        as_table=as_table,
+        sheet_name=sheet_name,
+    )
 
 
 def load_sparql_data(database_uri: str, query: str) -> pd.DataFrame:
@@ -196,6 +257,8 @@ def load_sparql_data(database_uri: str, query: str) -> pd.DataFrame:
     pd.DataFrame
         The data from the triplestore
     """
+    from SPARQLWrapper import SPARQLWrapper
+
     sparql = SPARQLWrapper(database_uri, returnFormat=_SPARQL_RETURN_FORMAT)
     sparql.setQuery(query)
 
@@ -257,10 +320,93 @@ def _sqldb_uri_preprocess(database_uri: str) -> str:
         return database_uri
 
 
+def get_sql_engine(database_uri: str) -> Engine:
+    """
+    Get the SQLAlchemy engine of a database, shared by all loads in this process.
+
+    Creating an engine and opening a connection for every load is slow, in
+    particular for remote databases. The engine is created on the first call for a
+    URI and its connection pool is reused by later calls, e.g. by the next method
+    that runs in a warm worker. Extraction functions that receive the
+    ``connection_details`` of ``@source_database`` can share the pool as well:
+
+    .. code-block:: python
+
+        @data_extraction
+        @source_database
+        def read_patients(connection_details: dict) -> pd.DataFrame:
+            engine = get_sql_engine(connection_details["uri"])
+            with engine.connect() as connection:
+                return pd.read_sql_query("SELECT * FROM patients", connection)
+
+    The number of connections kept open is set by the ``V6_SQL_POOL_SIZE``
+    environment variable (default 5). Connections are tested before they are
+    handed out, unless ``V6_SQL_POOL_PRE_PING`` is 'false', so that connections the
+    database closed in the meantime are replaced.
+
+    Parameters
+    ----------
+    database_uri : str
+        URI of the sql database, supplied by the node
+
+    Returns
+    -------
+    Engine
+        The engine of the database
+    """
+    uri = _sqldb_uri_preprocess(database_uri)
+    with _sql_engines_lock:
+        engine = _sql_engines.get(uri)
+        if engine is None:
+            from sqlalchemy import create_engine
+
+            pool_size = get_env_var(SQL_POOL_SIZE_ENV, "5", as_type="int")
+            check_envvar_value_positive(SQL_POOL_SIZE_ENV, pool_size)
+            pre_ping = get_env_var(SQL_POOL_PRE_PING_ENV, "true", as_type="bool")
+            try:
+                engine = create_engine(uri, pool_size=pool_size, pool_pre_ping=pre_ping)
+            except TypeError:
+                # some dialects use a pool without a size, e.g. one that does not
+                # keep connections open
+                engine = create_engine(uri, pool_pre_ping=pre_ping)
+            _sql_engines[uri] = engine
+        return engine
+
+
+def dispose_sql_engines() -> None:
+    """Close the connections of all SQL engines of this process."""
+    with _sql_engines_lock:
+        for engine in _sql_engines.values():
+            engine.dispose()
+        _sql_engines.clear()
+
+
+def _forget_sql_engines_after_fork() -> None:
+    """
+    Drop the SQL engines inherited from the parent process in a forked child.
+
+    The pooled connections of the parent must not be used by two processes, so the
+    child disposes the pools without closing the connections, which the parent
+    still uses, and creates its own engines when it needs them.
+    """
+    global _sql_engines_lock
+    _sql_engines_lock = threading.Lock()
+    for engine in _sql_engines.values():
+        engine.dispose(close=False)
+    _sql_engines.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_sql_engines_after_fork)
+
+
 def load_sql_data(database_uri: str, query: str) -> pd.DataFrame:
     """
     Load the local privacy-sensitive data from the database.
 
+    The connection is taken from the pool of the engine of the database, see
+    ``get_sql_engine``.
+
     Parameters
     ----------
     database_uri : str
@@ -273,7 +419,7 @@ def load_sql_data(database_uri: str, query: str) -> pd.DataFrame:
     pd.DataFrame
         The data from the database
     """
-    engine = create_engine(_sqldb_uri_preprocess(database_uri))
+    engine = get_sql_engine(database_uri)
 
     dbapi_conn = engine.raw_connection()
 
@@ -282,6 +428,226 @@ def load_sql_data(database_uri: str, query: str) -> pd.DataFrame:
         df = pd.read_sql_query(query, con=dbapi_conn)
 
     finally:
-        dbapi_conn.close()  # Ensure the connection is closed
+        dbapi_conn.close()  # Return the connection to the pool
 
     return df
+
+
+def load_sql_batches(
+    database_uri: str,
+    query: str,
+    chunksize: int | None = None,
+    schema: pa.Schema | None = None,
+) -> pa.RecordBatchReader:
+    """
+    Stream the result of a query from the database in batches.
+
+    Unlike ``load_sql_data``, the result is never completely in memory: the rows
+    are fetched ``chunksize`` at a time, with a server-side cursor where the
+    database driver supports it (e.g. PostgreSQL), and every chunk is converted to
+    an Arrow record batch. Return the reader from a data extraction function to
+    write the batches to the session one by one:
+
+    .. code-block:: python
+
+        @data_extraction
+        @source_database
+        def read_visits(connection_details: dict) -> pa.RecordBatchReader:
+            return load_sql_batches(connection_details["uri"], "SELECT * FROM visits")
+
+    Parameters
+    ----------
+    database_uri : str
+        URI of the sql database, supplied by the node
+    query : str
+        Query to retrieve the data from the database
+    chunksize : int | None
+        Number of rows per batch. Defaults to the ``V6_SQL_CHUNK_SIZE`` environment
+        variable, or 100000.
+    schema : pa.Schema | None
+        Schema of the batches. By default the schema is inferred from the first
+        batch, so declare it if e.g. a column may only contain NULLs in the first
+        batch.
+
+    Returns
+    -------
+    pa.RecordBatchReader
+        Reader of the batches. The database connection is returned to the pool
+        when all batches have been read.
+    """
+    import pyarrow as pa
+
+    if chunksize is None:
+        chunksize = get_env_var(
+            SQL_CHUNK_SIZE_ENV, str(DEFAULT_SQL_CHUNK_SIZE), as_type="int"
+        )
+        check_envvar_value_positive(SQL_CHUNK_SIZE_ENV, chunksize)
+
+    def chunks():
+        engine = get_sql_engine(database_uri)
+        with engine.connect() as connection:
+            connection = connection.execution_options(
+                stream_results=True, max_row_buffer=chunksize
+            )
+            yield from pd.read_sql_query(query, con=connection, chunksize=chunksize)
+
+    def to_batch(chunk: pd.DataFrame, schema: pa.Schema | None) -> pa.RecordBatch:
+        batch = pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+        return batch if schema is None else batch.cast(schema)
+
+    batches = chunks()
+    first = next(batches, None)
+    if first is None:
+        # pandas yields no chunks for an empty result
+        return pa.RecordBatchReader.from_batches(schema or pa.schema([]), iter([]))
+
+    first = to_batch(first, schema)
+    return pa.RecordBatchReader.from_batches(
+        first.schema,
+        chain([first], (to_batch(chunk, first.schema) for chunk in batches)),
+    )
+
+
+def build_aggregate_query(
+    table_name: str,
+    aggregates: list[tuple[str, str | None]],
+    group_by: list[str] | None = None,
+) -> Select:
+    """
+    Build a query that computes aggregates of a table in the database.
+
+    The table and column names are quoted by SQLAlchemy for the dialect of the
+    database, they are never pasted into the SQL as is.
+
+    Parameters
+    ----------
+    table_name : str
+        Name of the table, optionally prefixed with its schema, e.g.
+        'clinical.visits'.
+    aggregates : list[tuple[str, str | None]]
+        Pairs of an aggregate function and a column name, as tuples or as lists
+        (e.g. from the JSON input of a task). The function is one of 'sum',
+        'count', 'mean', 'min' and 'max'. Use ``("count", None)`` to count the
+        rows. The result column of an aggregate is named '<function>_<column>', or
+        'count' for the number of rows.
+    group_by : list[str] | None
+        Columns to compute the aggregates per group of, e.g. ``["site"]`` together
+        with ``[("count", None)]`` counts the rows per site.
+
+    Returns
+    -------
+    Select
+        The query.
+
+    Raises
+    ------
+    UserInputError
+        If there are no aggregates, an aggregate is not a pair of a function and a
+        column name, the function is not supported or a column is missing.
+    """
+    from sqlalchemy import column, func, select, table
+
+    if not isinstance(aggregates, (list, tuple)) or not aggregates:
+        raise UserInputError(
+            "Aggregates must be a non-empty list of [function, column] pairs."
+        )
+    if not all(isinstance(name, str) for name in group_by or []):
+        raise UserInputError(f"Group by columns must be names, got {group_by!r}.")
+
+    schema, _, name = table_name.rpartition(".")
+    source = table(name, schema=schema or None)
+
+    selected = [column(name) for name in group_by or []]
+    for aggregate in aggregates:
+        if not isinstance(aggregate, (list, tuple)) or len(aggregate) != 2:
+            raise UserInputError(
+                f"Aggregate {aggregate!r} is not a [function, column] pair."
+            )
+        function, column_name = aggregate
+        if not isinstance(function, str) or function not in SQL_AGGREGATES:
+            raise UserInputError(
+                f"Unsupported aggregate {function!r}. Use one of "
+                f"{', '.join(SQL_AGGREGATES)}."
+            )
+        if column_name is None:
+            if function != "count":
+                raise UserInputError(f"Aggregate '{function}' needs a column.")
+            selected.append(func.count().label("count"))
+            continue
+        if not isinstance(column_name, str):
+            raise UserInputError(
+                f"Column of aggregate '{function}' must be a name, got "
+                f"{column_name!r}."
+            )
+        sql_function = func.avg if function == "mean" else getattr(func, function)
+        selected.append(
+            sql_function(column(column_name)).label(f"{function}_{column_name}")
+        )
+
+    query = select(*selected).select_from(source)
+    if group_by:
+        query = query.group_by(*[column(name) for name in group_by])
+    return query
+
+
+def aggregate_sql_data(
+    database_uri: str,
+    table_name: str,
+    aggregates: list[tuple[str, str | None]],
+    group_by: list[str] | None = None,
+) -> list[dict]:
+    """
+    Compute aggregates of a table in the database itself.
+
+    Only the aggregates are transferred from the database, never the rows of the
+    table. See ``build_aggregate_query`` for the parameters.
+
+    Parameters
+    ----------
+    database_uri : str
+        URI of the sql database, supplied by the node
+    table_name : str
+        Name of the table, optionally prefixed with its schema.
+    aggregates : list[tuple[str, str | None]]
+        Pairs of an aggregate function and a column name.
+    group_by : list[str] | None
+        Columns to compute the aggregates per group of.
+
+    Returns
+    -------
+    list[dict]
+        One record per group (a single record without ``group_by``), with the
+        group columns and the aggregates. All values are JSON serializable.
+    """
+    query = build_aggregate_query(table_name, aggregates, group_by)
+    with get_sql_engine(database_uri).connect() as connection:
+        rows = connection.execute(query).mappings().all()
+
+    return [{key: _json_safe(value) for key, value in row.items()} for row in rows]
+
+
+def _json_safe(value: Any) -> Any:
+    """
+    Convert a value returned by the database driver to a JSON serializable value.
+
+    E.g. PostgreSQL returns the sum of integers as a decimal, and the group columns
+    or the min and max of a column may be dates, times or binary data. Decimals
+    become floats, dates and times ISO 8601 strings, durations seconds, binary data
+    hexadecimal strings and UUIDs strings.
+    """
+    from datetime import date, time, timedelta
+    from decimal import Decimal
+    from uuid import UUID
+
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, time)):
+        # datetime is a subclass of date
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
@@ -1,12 +1,26 @@
 from io import BufferedReader
+import base64
 import json
+import mmap
+import struct
 from typing import Any
 
+from vantage6.common.globals import STRING_ENCODING
+from vantage6.common.serialization import (
+    BINARY_ALIGNMENT,
+    BINARY_BUFFER_KEY,
+    BINARY_MAGIC,
+    TYPED_OBJECT_KEY,
+)
+
 
 def deserialize(file: BufferedReader) -> Any:
     """
     Deserialize data from a file using JSON
 
+    Typed objects written by `vantage6.common.serialization.serialize` are decoded
+    into numpy arrays and pandas objects.
+
     Parameters
     ----------
     file: BufferedReader
@@ -17,4 +31,144 @@ def deserialize(file: BufferedReader) -> Any:
     Any
         The deserialized data
     """
-    return json.load(file)
+    return json.load(file, object_hook=decode_typed_object)
+
+
+def _decode_array(value: Any) -> Any:
+    """Decode an array encoded by `serialize`, plain lists are returned as is."""
+    if not isinstance(value, dict):
+        return value
+    import numpy as np
+
+    return np.frombuffer(
+        bytearray(base64.b64decode(value["data"])), dtype=value["dtype"]
+    ).reshape(value["shape"])
+
+
+def decode_typed_object(value: dict) -> Any:
+    """
+    Decode a typed JSON object (numpy array, pandas Series, DataFrame or the values
+    of a column with a pandas extension dtype)
+
+    This is meant as ``object_hook`` for `json.load` and `json.loads`. Objects
+    without a ``__v6_type__`` key are returned unchanged.
+
+    Parameters
+    ----------
+    value: dict
+        A decoded JSON object
+
+    Returns
+    -------
+    Any
+        The numpy array or pandas object, or the original dictionary
+    """
+    kind = value.get(TYPED_OBJECT_KEY)
+    if kind is None:
+        return value
+    if kind == "ndarray":
+        return _decode_array(value)
+
+    import pandas as pd
+
+    if kind == "categorical":
+        return pd.Categorical.from_codes(
+            _decode_array(value["codes"]),
+            categories=value["categories"],
+            ordered=value["ordered"],
+        )
+    if kind == "extension":
+        return pd.array(value["values"], dtype=value["dtype"])
+
+    index = _decode_array(value["index"])
+    if kind == "series":
+        return pd.Series(
+            _decode_array(value["values"]), index=index, name=value["name"]
+        )
+    if kind == "dataframe":
+        columns = [_decode_array(column) for column in value["data"]]
+        return pd.DataFrame(dict(enumerate(columns)), index=index).set_axis(
+            value["columns"], axis=1
+        )
+    return value
+
+
+def is_binary(file: BufferedReader) -> bool:
+    """
+    Check whether a file is in the binary input format, without consuming it
+
+    Parameters
+    ----------
+    file: BufferedReader
+        The file to check
+
+    Returns
+    -------
+    bool
+        True if the file starts with the binary input header
+    """
+    return file.peek(len(BINARY_MAGIC))[: len(BINARY_MAGIC)] == BINARY_MAGIC
+
+
+def deserialize_binary(file: BufferedReader) -> Any:
+    """
+    Deserialize data in the binary input format (see `serialize_binary`)
+
+    The file is memory-mapped. NumPy arrays are returned as read-only views and Arrow
+    tables reference the mapped buffers, so the array data is never copied and is
+    only paged in from disk when it is used.
+
+    Because the arrays are read-only (``array.flags.writeable`` is False), code that
+    modifies an input array in place must copy it first, e.g. with ``array.copy()``.
+
+    Parameters
+    ----------
+    file: BufferedReader
+        The file to deserialize the data from
+
+    Returns
+    -------
+    Any
+        The deserialized data
+    """
+    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+
+    offset = len(BINARY_MAGIC)
+    (header_size,) = struct.unpack_from("<Q", mapped, offset)
+    offset += struct.calcsize("<Q")
+    header = json.loads(
+        bytes(view[offset : offset + header_size]).decode(STRING_ENCODING)
+    )
+    offset += header_size
+    data_start = offset + (-offset % BINARY_ALIGNMENT)
+
+    def load_buffer(description: dict) -> Any:
+        start = data_start + description["offset"]
+        buffer = view[start : start + description["size"]]
+        if description["type"] == "ndarray":
+            import numpy as np
+
+            return np.frombuffer(buffer, dtype=description["dtype"]).reshape(
+                description["shape"]
+            )
+
+        import pyarrow as pa
+
+        reader = pa.ipc.open_stream(pa.py_buffer(buffer))
+        if description["type"] == "record_batch":
+            return reader.read_next_batch()
+        return reader.read_all()
+
+    buffers = [load_buffer(description) for description in header["buffers"]]
+
+    def restore_arrays(value: Any) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {BINARY_BUFFER_KEY}:
+                return buffers[value[BINARY_BUFFER_KEY]]
+            return {key: restore_arrays(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [restore_arrays(item) for item in value]
+        return value
+
+    return restore_arrays(header["data"])
@@ -1,7 +1,11 @@
+import base64
 import json
+import struct
 
 import logging
 
+from typing import Any
+
 from vantage6.common.globals import STRING_ENCODING
 from vantage6.common import logger_name
 
@@ -12,18 +16,272 @@ log = logging.getLogger(module_name)
 
 # TODO BvB 2023-02-03: I feel this function could be given a better name. And
 # it might not have to be in a separate file.
-def serialize(data: any) -> bytes:
+def serialize(data: any, typed: bool = False) -> bytes:
     """
     Serialize data using the specified format
 
+    Besides the standard JSON types, numpy scalars, numpy arrays and pandas objects
+    are supported. By default these become plain JSON: scalars become numbers,
+    arrays and Series become (nested) lists and DataFrames become lists of records,
+    so that every JSON consumer, e.g. the user interface, can read the result.
+
+    With ``typed=True``, arrays, Series and DataFrames are instead encoded as JSON
+    objects with a ``__v6_type__`` key, in which numeric data is stored as base64
+    encoded raw bytes and the dtypes are kept, including the pandas nullable and
+    categorical dtypes. These objects are decoded back into arrays and frames by
+    `vantage6.common.client.deserialization.decode_typed_object`. This is meant for
+    results that are read by another algorithm container, see
+    ``TYPED_RESULTS_INPUT_KEY``.
+
     Parameters
     ----------
     data: any
         The data to be serialized
+    typed: bool
+        Whether to encode arrays and pandas objects as typed JSON objects
 
     Returns
     -------
     bytes
         A JSON-serialized and then encoded bytes object representing the data
     """
-    return json.dumps(data).encode(STRING_ENCODING)
+    default = _encode_typed_object if typed else _encode_plain_object
+    return json.dumps(data, default=default).encode(STRING_ENCODING)
+
+
+# key that marks the JSON objects that encode numpy and pandas objects
+TYPED_OBJECT_KEY = "__v6_type__"
+
+# key of the task input with which a (central) method asks for typed results
+TYPED_RESULTS_INPUT_KEY = "typed_results"
+
+
+def _encode_plain_object(value: Any) -> Any:
+    """
+    Encode the numpy and pandas objects that `json.dumps` does not support as plain
+    JSON values.
+
+    Parameters
+    ----------
+    value: Any
+        Object that is not JSON serializable by default
+
+    Returns
+    -------
+    Any
+        JSON serializable representation of the object
+
+    Raises
+    ------
+    TypeError
+        If the object is not supported either
+    """
+    module = type(value).__module__.split(".")[0]
+    if module == "numpy":
+        import numpy as np
+
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+    elif module == "pandas":
+        import pandas as pd
+
+        if value is pd.NA or value is pd.NaT:
+            return None
+        if isinstance(value, pd.Series):
+            return value.tolist()
+        if isinstance(value, pd.DataFrame):
+            return value.to_dict(orient="records")
+        if isinstance(value, pd.Timestamp):
+            return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode_array(array: Any) -> Any:
+    """
+    Encode a numpy array as a typed JSON object.
+
+    Arrays of Python objects (e.g. strings in a pandas column) can not be stored as
+    raw bytes, these are encoded as a (nested) list instead.
+    """
+    import numpy as np
+
+    if array.dtype.hasobject:
+        return array.tolist()
+    array = np.ascontiguousarray(array)
+    return {
+        TYPED_OBJECT_KEY: "ndarray",
+        "dtype": array.dtype.str,
+        "shape": array.shape,
+        "data": base64.b64encode(array.reshape(-1).view(np.uint8)).decode("ascii"),
+    }
+
+
+def _encode_values(values: Any) -> Any:
+    """
+    Encode the values of a pandas Series or index, keeping their dtype.
+
+    Categorical values are stored as codes and categories. Values with another
+    pandas extension dtype (e.g. the nullable ``Int64`` or ``str``) are stored as a
+    list, in which missing values are null, together with the name of the dtype.
+    """
+    import numpy as np
+    import pandas as pd
+
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categorical = pd.Categorical(values)
+        return {
+            TYPED_OBJECT_KEY: "categorical",
+            "categories": _encode_values(categorical.categories),
+            "codes": _encode_array(categorical.codes),
+            "ordered": bool(dtype.ordered),
+        }
+    if isinstance(dtype, np.dtype):
+        return _encode_array(np.asarray(values))
+    return {
+        TYPED_OBJECT_KEY: "extension",
+        "dtype": str(dtype),
+        "values": [None if pd.isna(item) else item for item in values.tolist()],
+    }
+
+
+def _encode_index(index: Any) -> Any:
+    """Encode a pandas index, None for the default range index."""
+    import pandas as pd
+
+    if isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1:
+        return None
+    return _encode_values(index)
+
+
+def _encode_typed_object(value: Any) -> Any:
+    """
+    Encode the numpy and pandas objects that `json.dumps` does not support as typed
+    JSON objects.
+
+    Parameters
+    ----------
+    value: Any
+        Object that is not JSON serializable by default
+
+    Returns
+    -------
+    Any
+        JSON serializable representation of the object
+
+    Raises
+    ------
+    TypeError
+        If the object is not supported either
+    """
+    # numpy and pandas are only imported when the data contains their types
+    module = type(value).__module__.split(".")[0]
+    if module == "numpy":
+        import numpy as np
+
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return _encode_array(value)
+    elif module == "pandas":
+        import pandas as pd
+
+        if isinstance(value, pd.Series):
+            return {
+                TYPED_OBJECT_KEY: "series",
+                "name": value.name,
+                "index": _encode_index(value.index),
+                "values": _encode_values(value),
+            }
+        if isinstance(value, pd.DataFrame):
+            return {
+                TYPED_OBJECT_KEY: "dataframe",
+                "columns": value.columns.tolist(),
+                "index": _encode_index(value.index),
+                "data": [
+                    _encode_values(value.iloc[:, i]) for i in range(value.shape[1])
+                ],
+            }
+    return _encode_plain_object(value)
+
+
+# Header of the binary input format. It is followed by the length of the JSON header
+# as a little endian uint64, the JSON header itself and the aligned data buffers.
+BINARY_MAGIC = b"V6BIN\x00\x01\x00"
+BINARY_ALIGNMENT = 64
+BINARY_BUFFER_KEY = "__v6_buffer__"
+
+
+def serialize_binary(data: Any) -> bytes:
+    """
+    Serialize data in the binary input format.
+
+    Large arrays and tables are stored as raw, aligned buffers instead of JSON lists,
+    so that the algorithm can use them as zero-copy views over the (memory-mapped)
+    input file. NumPy arrays are stored with their dtype and shape, pyarrow Tables
+    and RecordBatches as Arrow IPC streams. All other values are stored as JSON in
+    the header, in which each array is replaced by ``{"__v6_buffer__": <index>}``.
+
+    Parameters
+    ----------
+    data: Any
+        JSON serializable data that may contain numpy arrays and pyarrow tables
+
+    Returns
+    -------
+    bytes
+        The data in the binary input format
+    """
+    buffers = []
+    descriptions = []
+    size = 0
+
+    def add_buffer(description: dict, buffer: bytes | memoryview) -> dict:
+        nonlocal size
+        padding = -size % BINARY_ALIGNMENT
+        buffers.append(b"\x00" * padding)
+        buffers.append(buffer)
+        descriptions.append(
+            {**description, "offset": size + padding, "size": len(buffer)}
+        )
+        size += padding + len(buffer)
+        return {BINARY_BUFFER_KEY: len(descriptions) - 1}
+
+    def replace_arrays(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: replace_arrays(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [replace_arrays(item) for item in value]
+
+        # numpy and pyarrow are only imported when the data contains their types
+        module = type(value).__module__.split(".")[0]
+        if module == "numpy":
+            import numpy as np
+
+            if isinstance(value, np.generic):
+                return value.item()
+            array = np.ascontiguousarray(value)
+            if array.dtype.hasobject:
+                raise TypeError("Arrays of Python objects can not be stored binary")
+            return add_buffer(
+                {"type": "ndarray", "dtype": array.dtype.str, "shape": array.shape},
+                memoryview(array.reshape(-1).view(np.uint8)),
+            )
+        if module == "pyarrow" and hasattr(value, "schema"):
+            import pyarrow as pa
+
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, value.schema) as writer:
+                writer.write(value)
+            kind = "table" if isinstance(value, pa.Table) else "record_batch"
+            return add_buffer({"type": kind}, sink.getvalue())
+        return value
+
+    header = json.dumps({"data": replace_arrays(data), "buffers": descriptions}).encode(
+        STRING_ENCODING
+    )
+    prefix = BINARY_MAGIC + struct.pack("<Q", len(header)) + header
+    prefix += b"\x00" * (-len(prefix) % BINARY_ALIGNMENT)
+    return b"".join([prefix, *buffers])
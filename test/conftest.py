@@ -0,0 +1,11 @@
+"""
+Test configuration: the patched vantage6 modules in `patches/` are put in front of
+the installed ones, as the Docker image does, and the algorithm package in the
+repository root is made importable.
+"""
+
+import sys
+from pathlib import Path
+
+repo_path = Path(__file__).parent.parent
+sys.path[:0] = [str(repo_path / "patches"), str(repo_path)]
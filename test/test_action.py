@@ -0,0 +1,47 @@
+"""
+Tests of the action decorators, which convert the output of session steps.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from vantage6.algorithm.decorator.action import _convert_to_parquet
+from vantage6.algorithm.tools.exceptions import DataTypeError
+
+df = pd.read_csv(Path(__file__).parent / "test_data.csv")
+
+
+def test_tables_and_batches_are_converted():
+    table = _convert_to_parquet(df, preserve_index=False)
+    assert isinstance(table, pa.Table)
+    assert table.to_pandas().equals(df)
+
+    batch = pa.RecordBatch.from_pandas(df, preserve_index=False)
+    assert _convert_to_parquet(batch).equals(table)
+
+    # a declared schema is applied to tables as well
+    schema = table.schema.set(
+        table.schema.get_field_index("Age"), pa.field("Age", pa.float64())
+    )
+    assert _convert_to_parquet(table, schema=schema).schema == schema
+
+
+def test_streams_become_a_reader_with_one_schema():
+    def chunks():
+        yield df.iloc[:10]
+        yield pa.RecordBatch.from_pandas(df.iloc[10:], preserve_index=False)
+
+    reader = _convert_to_parquet(chunks(), preserve_index=False)
+    assert isinstance(reader, pa.RecordBatchReader)
+    assert reader.read_all().to_pandas().equals(df)
+
+    try:
+        _convert_to_parquet(iter([]))
+    except DataTypeError:
+        pass
+    else:
+        raise AssertionError("an empty stream without a schema was accepted")
+    schema = pa.schema([("Age", pa.int64())])
+    assert _convert_to_parquet(iter([]), schema=schema).read_all().num_rows == 0
@@ -0,0 +1,32 @@
+"""
+Tests of the algorithm client that algorithm containers use to create subtasks.
+"""
+
+from unittest import mock
+
+import jwt
+
+from vantage6.algorithm.client import AlgorithmClient
+
+
+def algorithm_client() -> AlgorithmClient:
+    token = jwt.encode({"sub": {"node_id": 1, "image": "v6-session-basics"}}, "key")
+    return AlgorithmClient(token=token, host="http://proxy", port=80)
+
+
+def test_wait_for_results_survives_failing_progress_lookups():
+    client = algorithm_client()
+    statuses = iter(["pending", "active", "completed"])
+    with mock.patch.object(
+        client.task, "get", side_effect=lambda _: {"status": next(statuses)}
+    ), mock.patch.object(
+        client.run, "from_task", side_effect=ConnectionError("proxy unreachable")
+    ), mock.patch.object(
+        client.result, "from_task", return_value=[{"sum": 3}]
+    ), mock.patch(
+        "time.sleep"
+    ):
+        assert client.wait_for_results(task_id=1) == [{"sum": 3}]
+
+    with mock.patch.object(client.run, "from_task", return_value={"msg": "error"}):
+        assert client._run_progress(1) is None
@@ -0,0 +1,51 @@
+"""
+Tests of the container context, the parsed environment of the algorithm container.
+"""
+
+import os
+from unittest import mock
+
+from vantage6.common.enum import AlgorithmStepType
+from vantage6.algorithm.tools.context import (
+    ContainerContext,
+    get_context,
+    reset_context,
+)
+from vantage6.algorithm.tools.exceptions import EnvironmentVariableError
+
+
+def test_context_is_parsed_from_the_environment():
+    context = ContainerContext.from_environ(
+        {
+            "FUNCTION_ACTION": "data_extraction",
+            "ALGORITHM_METHOD": "read_csv",
+            "USER_REQUESTED_DATAFRAMES": "a,b",
+            "DATABASE_URI": "/data/a.csv",
+            "DB_PARAM_SHEET": "first",
+        }
+    )
+    assert context.action == AlgorithmStepType.DATA_EXTRACTION
+    assert context.method == "read_csv"
+    assert context.dataframes == ("a", "b")
+    assert context.database_uri == "/data/a.csv"
+    assert dict(context.database_parameters) == {"SHEET": "first"}
+
+    try:
+        ContainerContext.from_environ({"FUNCTION_ACTION": "no-such-action"})
+    except EnvironmentVariableError:
+        pass
+    else:
+        raise AssertionError("an invalid action was accepted")
+
+
+def test_context_is_parsed_once_until_it_is_reset():
+    with mock.patch.dict(os.environ, {"ALGORITHM_METHOD": "sum"}):
+        reset_context()
+        context = get_context()
+        os.environ["ALGORITHM_METHOD"] = "len"
+        assert get_context() is context
+        assert get_context().method == "sum"
+
+        reset_context()
+        assert get_context().method == "len"
+    reset_context()
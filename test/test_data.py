@@ -0,0 +1,93 @@
+"""
+Tests of the ``@data`` decorator, which reads the session dataframes of a task.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from importlib import import_module
+from pathlib import Path
+from typing import Iterator
+from unittest import mock
+
+import pandas as pd
+import pyarrow as pa
+
+from vantage6.algorithm.decorator import data
+from vantage6.algorithm.tools.context import reset_context
+
+# the package exports the `data` decorator under the name of its module
+data_module = import_module("vantage6.algorithm.decorator.data")
+
+df = pd.read_csv(Path(__file__).parent / "test_data.csv")
+
+
+@contextmanager
+def session(**dataframes: pd.DataFrame) -> Iterator[str]:
+    """Store dataframes in a session folder and request them for the task."""
+    with tempfile.TemporaryDirectory() as session_folder:
+        for name, dataframe in dataframes.items():
+            dataframe.to_parquet(os.path.join(session_folder, f"{name}.parquet"))
+        environ = {
+            "SESSION_FOLDER": session_folder,
+            "USER_REQUESTED_DATAFRAMES": ",".join(dataframes),
+        }
+        with mock.patch.dict(os.environ, environ):
+            reset_context()
+            try:
+                yield session_folder
+            finally:
+                reset_context()
+
+
+def test_dataframes_are_read_concurrently_and_passed_in_order():
+    @data(3)
+    def sizes(*dfs: pd.DataFrame) -> list[int]:
+        return [len(df_) for df_ in dfs]
+
+    with session(a=df, b=df.head(5), c=df.head(2)), mock.patch.object(
+        data_module, "ThreadPoolExecutor", wraps=data_module.ThreadPoolExecutor
+    ) as pool:
+        assert sizes() == [len(df), 5, 2]
+    pool.assert_called_once_with(max_workers=3)
+
+    # the mock data is passed in the same order
+    assert sizes(mock_data=[df, df.head(5), df.head(2)]) == [len(df), 5, 2]
+
+
+def test_arrow_backends():
+    @data(1, backend="arrow", column_args=["column"])
+    def as_table(table: pa.Table, column: str) -> pa.Table:
+        return table
+
+    @data(1, backend="pandas_arrow")
+    def as_frame(frame: pd.DataFrame) -> pd.DataFrame:
+        return frame
+
+    with session(default=df):
+        table = as_table(column="Age")
+        frame = as_frame()
+    assert isinstance(table, pa.Table)
+    assert table.column_names == ["Age"]
+    assert table.column("Age").to_pylist() == df["Age"].tolist()
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in frame.dtypes)
+    assert frame["Age"].tolist() == df["Age"].tolist()
+
+    # mock data is converted to the backend as well
+    assert isinstance(as_table(column="Age", mock_data=[df]), pa.Table)
+
+
+def test_lazy_backend_decodes_only_the_accessed_columns():
+    @data(1, backend="lazy")
+    def lazy(frame):
+        return frame
+
+    with session(default=df):
+        frame = lazy(data_filters=[["Gender", "==", "F"]])
+        assert frame.columns == df.columns.tolist()
+        assert frame.loaded_columns == []
+
+        ages = frame["Age"]
+        assert frame.loaded_columns == ["Age"]
+        assert ages.tolist() == df.loc[df["Gender"] == "F", "Age"].tolist()
+        assert len(frame) == (df["Gender"] == "F").sum()
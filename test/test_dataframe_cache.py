@@ -0,0 +1,75 @@
+"""
+Tests of the in-process cache of the session dataframes read by ``@data``.
+"""
+
+import os
+import tempfile
+from importlib import import_module
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from vantage6.algorithm.tools import dataframe_cache
+from vantage6.algorithm.tools.context import reset_context
+from vantage6.algorithm.tools.dataframe_cache import DataFrameCache
+
+# the package exports the `data` decorator under the name of its module
+data_decorator = import_module("vantage6.algorithm.decorator.data")
+
+data = pd.read_csv(Path(__file__).parent / "test_data.csv")
+
+
+def test_least_recently_used_dataframes_are_evicted():
+    frame_bytes = int(data.memory_usage(deep=True).sum())
+    cache = DataFrameCache(max_bytes=2 * frame_bytes)
+    cache.put("a", data)
+    cache.put("b", data)
+    assert cache.get("a") is not None
+    cache.put("c", data)
+
+    assert cache.get("b") is None, "the least recently used dataframe is evicted"
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+    # a dataframe larger than the budget is not cached
+    cache.put("large", pd.concat([data] * 3))
+    assert cache.get("large") is None
+
+
+def test_session_dataframes_hit_and_miss():
+    cache = DataFrameCache(max_bytes=2**20)
+    with tempfile.TemporaryDirectory() as session_folder, mock.patch.dict(
+        os.environ, {"SESSION_FOLDER": session_folder}
+    ), mock.patch.object(dataframe_cache, "_cache", cache):
+        reset_context()
+        parquet_file = os.path.join(session_folder, "default.parquet")
+        data.to_parquet(parquet_file)
+
+        first = data_decorator._read_df_from_disk("default")
+        first["Age"] = 0
+        second = data_decorator._read_df_from_disk("default")
+        assert cache.stats()["hits"] == 1
+        pd.testing.assert_frame_equal(second, data)
+
+        # other columns and a rewritten file are read again
+        data_decorator._read_df_from_disk("default", columns=["Age"])
+        data.head(5).to_parquet(parquet_file)
+        os.utime(parquet_file, ns=(0, 0))
+        assert len(data_decorator._read_df_from_disk("default")) == 5
+        assert cache.stats()["misses"] == 3
+    reset_context()
+
+
+@pytest.mark.parametrize("budget", ["abc", "-1"])
+def test_invalid_budget_disables_the_cache(budget):
+    with mock.patch.dict(
+        os.environ, {"V6_DATAFRAME_CACHE_MB": budget}
+    ), mock.patch.object(dataframe_cache, "_cache", None), mock.patch.object(
+        dataframe_cache, "warn"
+    ) as warn:
+        cache = dataframe_cache.get_dataframe_cache()
+
+    assert not cache.enabled
+    warn.assert_called_once()
+    assert "V6_DATAFRAME_CACHE_MB" in warn.call_args.args[0]
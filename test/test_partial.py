@@ -0,0 +1,211 @@
+"""
+Tests of the partial and central methods of the algorithm, using the mock client.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from importlib import import_module
+from pathlib import Path
+from typing import Iterator
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from vantage6.algorithm.tools.context import reset_context
+from vantage6.algorithm.tools.exceptions import CollectResultsError
+from vantage6.algorithm.tools.mock_client import MockAlgorithmClient
+
+partial = import_module("v6-session-basics.partial")
+
+data = pd.read_csv(Path(__file__).parent / "test_data.csv")
+
+
+def mock_client(n_organizations: int = 2) -> MockAlgorithmClient:
+    return MockAlgorithmClient(
+        datasets=[[{"database": data}] for _ in range(n_organizations)],
+        module="v6-session-basics",
+    )
+
+
+@contextmanager
+def container_action(action: str) -> Iterator[None]:
+    """Run as the container of ``action``, and restore the environment afterwards."""
+    with mock.patch.dict(os.environ, {"FUNCTION_ACTION": action}):
+        reset_context()
+        try:
+            yield
+        finally:
+            reset_context()
+
+
+def run_central(method: str, client: MockAlgorithmClient | None = None, **kwargs):
+    """Run a central method as the central compute container would."""
+    with container_action("central_compute"):
+        return getattr(partial, method)(mock_client=client or mock_client(), **kwargs)
+
+
+def run_federated(method: str, df: pd.DataFrame = data, **kwargs):
+    """Run a federated method, on a single dataframe if it uses ``@data``."""
+    method = getattr(partial, method)
+    if getattr(method, "wrapped_in_data_decorator", False):
+        kwargs["mock_data"] = [df.copy()]
+    with container_action("federated_compute"):
+        return method(**kwargs)
+
+
+def test_linear_regression_matches_pooled_ols():
+    features, target = ["Age", "Height(in)"], "Weight(lbs)"
+    result = run_central(
+        "central_linear_regression",
+        feature_columns=features,
+        target_column=target,
+        chunk_size=5,
+    )
+
+    # two organizations with the same data give the OLS fit of the data itself
+    x = np.column_stack((np.ones(len(data)), data[features].to_numpy(float)))
+    expected = np.linalg.lstsq(x, data[target].to_numpy(float), rcond=None)[0]
+    assert np.allclose(list(result["coefficients"].values()), expected)
+    assert result["count"] == 2 * len(data)
+
+
+def test_gram_matrix_rejects_non_positive_chunk_size():
+    for chunk_size in (0, -1):
+        try:
+            run_federated(
+                "gram_matrix",
+                feature_columns=["Age"],
+                target_column="Weight(lbs)",
+                chunk_size=chunk_size,
+            )
+        except ValueError:
+            continue
+        raise AssertionError(f"chunk_size={chunk_size} was accepted")
+
+
+def test_workload_reports_requested_load():
+    result = run_federated("workload", duration=0.3, memory_mb=2, payload_kb=4)
+    report = result["report"]
+    assert report["wall_time_s"] >= 0.3
+    assert report["peak_allocated_mb"] == 2
+    assert len(result["payload"]) == 4 * 1024
+    assert report["payload_bytes"] == len(result["payload"].encode())
+
+
+def test_central_average_of_one_column_uses_federated_avg():
+    client = mock_client()
+    # federated_avg sleeps 15 seconds on purpose, as a diagnostic
+    with mock.patch("time.sleep") as sleep:
+        result = run_central("central_average", client, column_name="Age")
+    sleep.assert_called_with(15)
+    assert result == {"average": data["Age"].mean()}
+
+
+def test_central_average_of_several_columns():
+    result = run_central("central_average", column_name=["Age", "Weight(lbs)"])
+    assert result == {
+        "averages": {
+            "Age": data["Age"].mean(),
+            "Weight(lbs)": data["Weight(lbs)"].mean(),
+        }
+    }
+
+
+def test_partial_results_cache_hit_and_miss():
+    client = mock_client()
+    with tempfile.TemporaryDirectory() as session_folder, mock.patch.dict(
+        os.environ,
+        {"SESSION_FOLDER": session_folder, "USER_REQUESTED_DATAFRAMES": "default"},
+    ):
+        parquet_file = os.path.join(session_folder, "default.parquet")
+        data.to_parquet(parquet_file)
+
+        first = run_central(
+            "central_average", client, column_name=["Age"], use_cache=True
+        )
+        n_tasks = len(client.tasks)
+        second = run_central(
+            "central_average", client, column_name=["Age"], use_cache=True
+        )
+        assert second == first
+        assert len(client.tasks) == n_tasks, "cached results were not used"
+
+        # a changed session dataframe invalidates the cached results
+        data.head(5).to_parquet(parquet_file)
+        run_central("central_average", client, column_name=["Age"], use_cache=True)
+        assert len(client.tasks) == n_tasks + 1
+
+
+def polling_client(*polls: list[str]) -> mock.Mock:
+    """
+    Client of which the runs of a task have the statuses of ``polls``, one list per
+    poll. The last poll is repeated.
+    """
+    polls = list(polls)
+
+    def from_task(task_id):
+        statuses = polls.pop(0) if len(polls) > 1 else polls[0]
+        return [
+            {"id": i, "status": status, "organization": {"id": i}}
+            for i, status in enumerate(statuses)
+        ]
+
+    client = mock.Mock()
+    client.run.from_task.side_effect = from_task
+    client.result.get.side_effect = lambda run_id: {"run": run_id}
+    client.organization.list.return_value = [{"id": i} for i in range(3)]
+    client.task.create.return_value = {"id": 1}
+    return client
+
+
+def test_quorum_returns_before_all_runs_finished():
+    client = polling_client(
+        ["completed", "active", "pending"], ["completed", "completed", "active"]
+    )
+    with mock.patch("time.sleep") as sleep:
+        results, excluded = partial._wait_for_quorum(client, 1, quorum=2)
+    assert results == [{"run": 0}, {"run": 1}]
+    assert excluded == [2]
+    assert sleep.call_count == 1
+
+
+def test_deadline_stops_the_wait():
+    client = polling_client(["completed", "active", "active"])
+    with mock.patch("time.sleep") as sleep, mock.patch(
+        "time.monotonic", side_effect=[0, 4, 8, 12]
+    ):
+        results, excluded = partial._wait_for_quorum(client, 1, deadline=10)
+    assert results == [{"run": 0}]
+    assert excluded == [1, 2]
+    assert sleep.call_count == 2
+
+
+def test_unreachable_quorum_is_an_error():
+    client = polling_client(["completed", "failed", "active"])
+    with mock.patch("time.sleep") as sleep:
+        try:
+            partial._run_partial(client, method="sum", input_={}, quorum=3)
+        except CollectResultsError:
+            pass
+        else:
+            raise AssertionError("results below the quorum were accepted")
+    # a failed run can not complete anymore, so there is no need to wait
+    sleep.assert_not_called()
+
+
+def test_quorum_excludes_empty_and_undecodable_results():
+    client = mock_client(3)
+    with container_action("central_compute"):
+        task = client.task.create(
+            method="federated_sum_count",
+            organizations=[0, 1, 2],
+            input_={"args": [["Age"]]},
+        )
+    client.results[0]["result"] = "null"
+    client.results[1]["result"] = "{not json"
+
+    results, excluded = partial._wait_for_quorum(client, task["id"], quorum=3)
+    assert len(results) == 1
+    assert sorted(excluded) == [0, 1]
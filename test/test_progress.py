@@ -0,0 +1,51 @@
+"""
+Tests of the rate-limited progress logging of polling loops.
+"""
+
+import os
+from unittest import mock
+
+import pytest
+
+from vantage6.algorithm.tools import progress
+from vantage6.algorithm.tools.progress import (
+    DEFAULT_PROGRESS_INTERVAL,
+    ProgressLogger,
+)
+
+
+def test_summaries_are_logged_at_most_once_per_interval():
+    lines = []
+    clock = [100.0]
+    with mock.patch.object(progress.time, "monotonic", lambda: clock[0]):
+        logger = ProgressLogger("Waiting", interval=10, log=lines.append)
+        logged = []
+        for now in (100, 104, 109, 110, 115, 121):
+            clock[0] = float(now)
+            logged.append(logger.update(lambda: f"at {clock[0]:.0f}"))
+        logger.done("all finished")
+
+    assert logged == [True, False, False, True, False, True]
+    assert lines == [
+        "Waiting: waited 0 s, at 100",
+        "Waiting: waited 10 s, at 110",
+        "Waiting: waited 21 s, at 121",
+        "Waiting: finished after 21 s, all finished",
+    ]
+
+
+def test_interval_is_read_from_the_environment():
+    with mock.patch.dict(os.environ, {"V6_PROGRESS_INTERVAL": "2.5"}):
+        assert ProgressLogger("Waiting", log=print).interval == 2.5
+
+
+@pytest.mark.parametrize("value", ["abc", "0", "-5", "nan"])
+def test_invalid_interval_falls_back_to_the_default(value):
+    with mock.patch.dict(
+        os.environ, {"V6_PROGRESS_INTERVAL": value}
+    ), mock.patch.object(progress, "warn") as warn:
+        logger = ProgressLogger("Waiting", log=print)
+
+    assert logger.interval == DEFAULT_PROGRESS_INTERVAL
+    warn.assert_called_once()
+    assert "V6_PROGRESS_INTERVAL" in warn.call_args.args[0]
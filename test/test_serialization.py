@@ -0,0 +1,122 @@
+"""
+Tests of the (binary) serialization of task input and results.
+"""
+
+import json
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from vantage6.common import base64s_to_bytes
+from vantage6.common.client import deserialization
+from vantage6.common.serialization import serialize, serialize_binary
+from vantage6.algorithm.tools.context import reset_context
+from vantage6.algorithm.tools.mock_client import MockAlgorithmClient
+
+
+def test_results_are_plain_json_by_default():
+    result = {
+        "array": np.arange(4),
+        "mean": np.float64(1.5),
+        "series": pd.Series([1, None], dtype="Int64"),
+        "frame": pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}),
+    }
+    assert json.loads(serialize(result)) == {
+        "array": [0, 1, 2, 3],
+        "mean": 1.5,
+        "series": [1, None],
+        "frame": [{"a": 1, "b": "x"}, {"a": 2, "b": "y"}],
+    }
+
+
+def test_typed_round_trip_keeps_dtypes():
+    frame = pd.DataFrame(
+        {
+            "count": pd.array([1, None, 3], dtype="Int64"),
+            "group": pd.Categorical(["b", "a", "b"], categories=["b", "a"]),
+            "name": pd.array(["x", None, "z"], dtype="str"),
+            "weight": [1.5, 2.5, np.nan],
+        },
+        index=[10, 20, 30],
+    )
+    result = {"frame": frame, "xtx": np.eye(3), "count": frame["count"]}
+
+    decoded = json.loads(
+        serialize(result, typed=True),
+        object_hook=deserialization.decode_typed_object,
+    )
+
+    pd.testing.assert_frame_equal(decoded["frame"], frame)
+    pd.testing.assert_series_equal(decoded["count"], frame["count"])
+    assert np.array_equal(decoded["xtx"], np.eye(3))
+
+
+def read_binary(serialized: bytes):
+    with tempfile.TemporaryFile() as fp:
+        fp.write(serialized)
+        fp.flush()
+        fp.seek(0)
+        assert deserialization.is_binary(fp)
+        return deserialization.deserialize_binary(fp)
+
+
+def test_binary_round_trip():
+    array = np.arange(12, dtype="<f8").reshape(3, 4)
+    table = pa.table({"age": [31, 45, 27], "name": ["a", "b", "c"]})
+    input_ = {
+        "method": "gram_matrix",
+        "args": [array],
+        "kwargs": {"table": table, "columns": ["age"], "scale": np.float32(0.5)},
+    }
+
+    result = read_binary(serialize_binary(input_))
+
+    assert result["method"] == "gram_matrix"
+    assert np.array_equal(result["args"][0], array)
+    assert result["args"][0].dtype == array.dtype
+    assert result["kwargs"]["table"].equals(table)
+    assert result["kwargs"]["columns"] == ["age"]
+    assert result["kwargs"]["scale"] == 0.5
+
+
+def test_binary_arrays_are_read_only():
+    result = read_binary(serialize_binary({"x": np.zeros(4)}))
+    assert not result["x"].flags.writeable
+    try:
+        result["x"][0] = 1
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("the array of the input file was modified")
+
+    # a copy can be modified in place
+    x = result["x"].copy()
+    x[0] = 1
+    assert x[0] == 1
+
+
+def test_mock_task_with_binary_input():
+    client = MockAlgorithmClient(
+        datasets=[[{"database": pa.table({"a": [1]}).to_pandas()}]],
+        module="v6-session-basics",
+    )
+    with mock.patch.dict(os.environ, {"FUNCTION_ACTION": "central_compute"}):
+        reset_context()
+        try:
+            task = client.task.create(
+                method="workload",
+                organizations=[0],
+                input_={"kwargs": {"duration": 0, "payload_kb": np.int64(1)}},
+                binary_input=True,
+            )
+        finally:
+            reset_context()
+
+    run = client.run.from_task(task["id"])[0]
+    assert base64s_to_bytes(run["input"]).startswith(deserialization.BINARY_MAGIC)
+    (result,) = client.result.from_task(task["id"])
+    assert len(result["payload"]) == 1024
@@ -0,0 +1,114 @@
+"""
+Tests of the logging of the algorithm tools.
+"""
+
+import contextlib
+import io
+import json
+import os
+import time
+from unittest import mock
+
+import jwt
+
+from vantage6.algorithm.tools import util
+from vantage6.algorithm.tools.context import reset_context
+
+
+@contextlib.contextmanager
+def logging_to(stdout: io.StringIO, **environ):
+    """Log to `stdout` with the writer configured by the given environment."""
+    with mock.patch.dict(os.environ, environ), contextlib.redirect_stdout(stdout):
+        reset_context()
+        util.configure_logging()
+        try:
+            yield
+        finally:
+            util.configure_logging()
+            reset_context()
+
+
+def test_invalid_log_settings_fall_back_to_the_defaults():
+    stdout, stderr = io.StringIO(), io.StringIO()
+    environ = {
+        "V6_LOG_FORMAT": "xml",
+        "V6_LOG_BUFFER_SIZE": "many",
+        "V6_LOG_FLUSH_INTERVAL": "-1",
+    }
+    with mock.patch.dict(os.environ, environ), contextlib.redirect_stdout(
+        stdout
+    ), contextlib.redirect_stderr(stderr):
+        util._log_setting_warnings.clear()
+        try:
+            util.configure_logging()
+            util.info("first")
+            util.configure_logging()
+            util.info("second")
+        finally:
+            util.configure_logging()
+
+    assert stdout.getvalue() == "info > first\ninfo > second\n"
+    warnings = stderr.getvalue().splitlines()
+    assert len(warnings) == 3, "every invalid setting is reported once"
+    assert all(line.startswith("warn > ") for line in warnings)
+
+
+def test_json_lines_carry_the_time_level_and_run_labels():
+    stdout = io.StringIO()
+    token = jwt.encode({"sub": {"task_id": 7, "organization_id": 2}}, "key")
+    environ = {
+        "V6_LOG_FORMAT": "json",
+        "ALGORITHM_METHOD": "partial_average",
+        "CONTAINER_TOKEN": token,
+    }
+    with logging_to(stdout, **environ):
+        util.info('say "hi"')
+
+    line = json.loads(stdout.getvalue())
+    assert set(line) == {
+        "time",
+        "monotonic",
+        "level",
+        "method",
+        "task_id",
+        "organization_id",
+        "message",
+    }
+    assert line["level"] == "info"
+    assert line["method"] == "partial_average"
+    assert (line["task_id"], line["organization_id"]) == (7, 2)
+    assert line["message"] == 'say "hi"'
+
+
+def test_buffered_messages_are_written_when_full_or_on_error():
+    stdout = io.StringIO()
+    environ = {"V6_LOG_BUFFER_SIZE": "3", "V6_LOG_FLUSH_INTERVAL": "60"}
+    with logging_to(stdout, **environ):
+        util.info("one")
+        util.info("two")
+        assert stdout.getvalue() == ""
+        util.info("three")
+        assert stdout.getvalue() == "info > one\ninfo > two\ninfo > three\n"
+
+        util.info("four")
+        util.error("five")
+        assert stdout.getvalue().endswith("info > four\nerror > five\n")
+
+
+def test_buffered_messages_are_flushed_periodically_and_explicitly():
+    stdout = io.StringIO()
+    environ = {"V6_LOG_BUFFER_SIZE": "100", "V6_LOG_FLUSH_INTERVAL": "0.05"}
+    with logging_to(stdout, **environ):
+        util.info("periodic")
+        deadline = time.monotonic() + 5
+        while not stdout.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert stdout.getvalue() == "info > periodic\n"
+
+    stdout = io.StringIO()
+    environ = {"V6_LOG_BUFFER_SIZE": "100", "V6_LOG_FLUSH_INTERVAL": "60"}
+    with logging_to(stdout, **environ):
+        util.info("explicit")
+        assert stdout.getvalue() == ""
+        util.flush_logs()
+        assert stdout.getvalue() == "info > explicit\n"
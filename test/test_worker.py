@@ -0,0 +1,91 @@
+"""
+Tests of the warm worker mode of the algorithm wrapper.
+"""
+
+import json
+import os
+import tempfile
+from unittest import mock
+
+from vantage6.algorithm.tools import worker
+
+
+def submit(spool_dir: str, name: str, job: dict) -> None:
+    with open(os.path.join(spool_dir, f"{name}.tmp"), "w") as fp:
+        json.dump(job, fp)
+    os.rename(
+        os.path.join(spool_dir, f"{name}.tmp"), os.path.join(spool_dir, f"{name}.job")
+    )
+
+
+def test_worker_runs_jobs():
+    with tempfile.TemporaryDirectory() as spool_dir, mock.patch.dict(
+        os.environ, {"PKG_NAME": "v6-session-basics"}
+    ):
+        input_file = os.path.join(spool_dir, "input")
+        with open(input_file, "w") as fp:
+            json.dump({"kwargs": {"duration": 0}}, fp)
+        submit(
+            spool_dir,
+            "job-1",
+            {
+                "input_file": input_file,
+                "output_file": os.path.join(spool_dir, "output"),
+                "method": "workload",
+                "action": "federated_compute",
+            },
+        )
+
+        worker.run_worker(spool_dir, max_jobs=1)
+
+        with open(os.path.join(spool_dir, "job-1.done")) as fp:
+            assert json.load(fp)["status"] == "completed"
+        assert os.path.exists(os.path.join(spool_dir, "output"))
+
+
+def test_jobs_do_not_inherit_container_variables_of_the_worker():
+    environments = []
+
+    def run_job(module, log_traceback):
+        environments.append(dict(os.environ))
+
+    with tempfile.TemporaryDirectory() as spool_dir, mock.patch.dict(
+        os.environ,
+        {
+            "PKG_NAME": "v6-session-basics",
+            "CONTAINER_TOKEN": "token-of-the-worker",
+            "DATABASE_URI": "/data/worker.csv",
+        },
+    ), mock.patch.object(worker, "run_job", run_job), mock.patch.object(
+        worker, "_import_module"
+    ):
+        job = {
+            "input_file": "input",
+            "output_file": "output",
+            "method": "workload",
+            "action": "federated_compute",
+        }
+        submit(spool_dir, "job-1", {**job, "env": {"CONTAINER_TOKEN": "token-1"}})
+        worker.run_worker(spool_dir, max_jobs=1)
+        submit(spool_dir, "job-2", job)
+        worker.run_worker(spool_dir, max_jobs=1)
+
+    assert environments[0]["CONTAINER_TOKEN"] == "token-1"
+    assert "CONTAINER_TOKEN" not in environments[1]
+    assert "DATABASE_URI" not in environments[1]
+    assert environments[1]["PKG_NAME"] == "v6-session-basics"
+
+
+def test_stale_running_jobs_are_reclaimed():
+    _, host = worker._owner().split("-")
+    with tempfile.TemporaryDirectory() as spool_dir:
+        # the claim of a process that no longer exists, and of a running process
+        stale = os.path.join(spool_dir, f"stale.999999999-{host}.running")
+        alive = os.path.join(spool_dir, f"alive.{os.getppid()}-{host}.running")
+        for path in (stale, alive):
+            open(path, "w").close()
+
+        worker._reclaim_stale_jobs(spool_dir)
+
+        assert os.path.exists(os.path.join(spool_dir, "stale.job"))
+        assert os.path.exists(alive)
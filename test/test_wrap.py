@@ -0,0 +1,220 @@
+"""
+Tests of the algorithm wrapper, which runs a method as the algorithm container does.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from vantage6.common.client.deserialization import deserialize
+from vantage6.algorithm.tools.context import reset_context
+from vantage6.algorithm.tools.exceptions import UserInputError
+from vantage6.algorithm.tools.wrappers import dispose_sql_engines
+from vantage6.algorithm.tools.wrap import run_job
+
+data_file = Path(__file__).parent / "test_data.csv"
+
+
+def run(
+    folder: str,
+    method: str,
+    action: str,
+    kwargs: dict,
+    input_: dict | None = None,
+    **env,
+) -> str:
+    """Run a method in ``folder`` and return the path of its output file."""
+    session_folder = os.path.join(folder, "session")
+    os.makedirs(session_folder, exist_ok=True)
+    pd.read_csv(data_file).to_parquet(os.path.join(session_folder, "default.parquet"))
+    input_file = os.path.join(folder, "input")
+    with open(input_file, "w") as fp:
+        json.dump({"kwargs": kwargs, **(input_ or {})}, fp)
+
+    output_file = os.path.join(folder, "output")
+    environ = {
+        "PKG_NAME": "v6-session-basics",
+        "INPUT_FILE": input_file,
+        "OUTPUT_FILE": output_file,
+        "ALGORITHM_METHOD": method,
+        "FUNCTION_ACTION": action,
+        "SESSION_FOLDER": session_folder,
+        "USER_REQUESTED_DATAFRAMES": "default",
+        **env,
+    }
+    with mock.patch.dict(os.environ, environ):
+        reset_context()
+        try:
+            run_job("v6-session-basics")
+        finally:
+            reset_context()
+    return output_file
+
+
+def test_write_profile_is_ignored_by_compute_tasks():
+    with tempfile.TemporaryDirectory() as folder:
+        output_file = run(
+            folder,
+            "sum",
+            "federated_compute",
+            {"column": "Age"},
+            V6_PARQUET_PROFILE="no-such-profile",
+        )
+        with open(output_file) as fp:
+            assert json.load(fp) == {"sum": int(pd.read_csv(data_file)["Age"].sum())}
+
+
+def test_data_reads_the_column_arguments_and_filtered_rows():
+    df = pd.read_csv(data_file)
+    with tempfile.TemporaryDirectory() as folder, mock.patch(
+        "pandas.read_parquet", wraps=pd.read_parquet
+    ) as read_parquet:
+        output_file = run(
+            folder,
+            "sum",
+            "federated_compute",
+            {"column": "Age", "data_filters": [["Gender", "==", "F"]]},
+        )
+        with open(output_file) as fp:
+            result = json.load(fp)
+
+    assert read_parquet.call_args.kwargs["columns"] == ["Age"]
+    assert result == {"sum": int(df.loc[df["Gender"] == "F", "Age"].sum())}
+
+
+def test_results_are_typed_only_on_request():
+    kwargs = {"feature_columns": ["Age"], "target_column": "Weight(lbs)"}
+    with tempfile.TemporaryDirectory() as folder:
+        output_file = run(folder, "gram_matrix", "federated_compute", kwargs)
+        with open(output_file) as fp:
+            plain = json.load(fp)
+        assert isinstance(plain["xtx"], list)
+
+        output_file = run(
+            folder,
+            "gram_matrix",
+            "federated_compute",
+            kwargs,
+            input_={"typed_results": True},
+        )
+        with open(output_file, "rb") as fp:
+            typed = deserialize(fp)
+        assert typed["xtx"].dtype == "float64"
+        assert typed["xtx"].tolist() == plain["xtx"]
+
+
+def test_resource_metrics_are_written_on_request():
+    with tempfile.TemporaryDirectory() as folder:
+        output_file = run(folder, "sum", "federated_compute", {"column": "Age"})
+        assert not os.path.exists(f"{output_file}.metrics.json")
+
+        output_file = run(
+            folder,
+            "sum",
+            "federated_compute",
+            {"column": "Age"},
+            V6_RESOURCE_METRICS="true",
+        )
+        with open(f"{output_file}.metrics.json") as fp:
+            metrics = json.load(fp)
+        assert metrics["method"] == "sum"
+        assert metrics["status"] == "completed"
+
+
+def test_sql_extraction_is_streamed_in_full_row_groups():
+    df = pd.read_csv(data_file)
+    with tempfile.TemporaryDirectory() as folder:
+        database = os.path.join(folder, "data.db")
+        with sqlite3.connect(database) as connection:
+            df.to_sql("patients", connection, index=False)
+
+        try:
+            output_file = run(
+                folder,
+                "read_sql",
+                "data_extraction",
+                {"query": "SELECT * FROM patients", "chunksize": 3},
+                DATABASE_URI=f"sqlite:///{database}",
+                DATABASE_TYPE="sql",
+                V6_PARQUET_ROW_GROUP_SIZE="8",
+            )
+        finally:
+            dispose_sql_engines()
+
+        metadata = pq.read_metadata(output_file)
+        row_groups = [
+            metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)
+        ]
+        assert row_groups == [8, 8, len(df) - 16]
+        pd.testing.assert_frame_equal(pd.read_parquet(output_file), df)
+
+
+def test_sql_aggregates_are_extracted_to_the_session():
+    df = pd.read_csv(data_file)
+    with tempfile.TemporaryDirectory() as folder:
+        database = os.path.join(folder, "data.db")
+        with sqlite3.connect(database) as connection:
+            df.to_sql("patients", connection, index=False)
+
+        try:
+            output_file = run(
+                folder,
+                "sql_aggregate",
+                "data_extraction",
+                {
+                    "table": "patients",
+                    "aggregates": [["sum", "Age"], ["count", None]],
+                    "group_by": ["Gender"],
+                },
+                DATABASE_URI=f"sqlite:///{database}",
+                DATABASE_TYPE="sql",
+            )
+        finally:
+            dispose_sql_engines()
+
+        result = pd.read_parquet(output_file).set_index("Gender")
+        expected = df.groupby("Gender")["Age"].agg(["sum", "count"])
+        assert result["sum_Age"].to_dict() == expected["sum"].to_dict()
+        assert result["count"].to_dict() == expected["count"].to_dict()
+
+
+def test_phase_timings_are_written_on_request():
+    with tempfile.TemporaryDirectory() as folder:
+        output_file = run(folder, "sum", "federated_compute", {"column": "Age"})
+        assert not os.path.exists(f"{output_file}.timings.json")
+
+        output_file = run(
+            folder,
+            "sum",
+            "federated_compute",
+            {"column": "Age"},
+            V6_TIMINGS_SIDECAR="true",
+        )
+        with open(f"{output_file}.timings.json") as fp:
+            timings = json.load(fp)
+    for name in ("load_input", "read_dataframes", "write_output"):
+        assert timings[name] >= 0, f"phase '{name}' is not timed"
+
+
+def test_invalid_write_profile_fails_extraction_before_it_runs():
+    with tempfile.TemporaryDirectory() as folder:
+        try:
+            run(
+                folder,
+                "read_csv",
+                "data_extraction",
+                {},
+                V6_PARQUET_PROFILE="no-such-profile",
+                DATABASE_URI=str(data_file),
+                DATABASE_TYPE="csv",
+            )
+        except UserInputError:
+            assert not os.path.exists(os.path.join(folder, "output"))
+        else:
+            raise AssertionError("the invalid write profile was accepted")
@@ -0,0 +1,194 @@
+"""
+Tests of the data loaders of the algorithm wrappers.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from vantage6.algorithm.tools import wrappers
+from vantage6.algorithm.tools.exceptions import UserInputError
+
+data = pd.read_csv(Path(__file__).parent / "test_data.csv")
+
+
+def sqlite_database(folder: str) -> str:
+    """Store the test data in a SQLite database and return its URI."""
+    path = os.path.join(folder, "data.db")
+    with sqlite3.connect(path) as connection:
+        data.to_sql("patients", connection, index=False)
+    return f"sqlite:///{path}"
+
+
+def test_parsed_source_files_are_cached():
+    with tempfile.TemporaryDirectory() as folder, mock.patch.dict(
+        os.environ, {"V6_SOURCE_CACHE_DIR": os.path.join(folder, "cache")}
+    ), mock.patch("pandas.read_csv", wraps=pd.read_csv) as read_csv:
+        csv_file = os.path.join(folder, "data.csv")
+        data.to_csv(csv_file, index=False)
+
+        first = wrappers.load_csv_data(csv_file)
+        second = wrappers.load_csv_data(csv_file)
+        assert read_csv.call_count == 1, "the second read is a cache hit"
+        pd.testing.assert_frame_equal(second, first)
+
+        # a changed file is parsed again, and replaces the outdated table
+        data.head(5).to_csv(csv_file, index=False)
+        os.utime(csv_file, ns=(0, 0))
+        assert len(wrappers.load_csv_data(csv_file)) == 5
+        assert read_csv.call_count == 2
+        assert len(os.listdir(os.path.join(folder, "cache"))) == 1
+
+
+def test_cached_source_tables_are_not_copied():
+    with tempfile.TemporaryDirectory() as folder, mock.patch.dict(
+        os.environ, {"V6_SOURCE_CACHE_DIR": os.path.join(folder, "cache")}
+    ):
+        csv_file = os.path.join(folder, "data.csv")
+        data.to_csv(csv_file, index=False)
+
+        first = wrappers.load_csv_data(csv_file, as_table=True)
+        allocated = pa.total_allocated_bytes()
+        second = wrappers.load_csv_data(csv_file, as_table=True)
+        # the columns point to the memory-mapped file, not to allocated memory
+        assert pa.total_allocated_bytes() == allocated
+        assert second.equals(first)
+
+        # a DataFrame is a copy that can be modified in place
+        df = wrappers.load_csv_data(csv_file)
+        df.loc[0, "Age"] = 99
+        assert second.column("Age")[0].as_py() == data["Age"][0]
+
+
+def test_sheets_of_an_excel_file_are_cached_separately():
+    with tempfile.TemporaryDirectory() as folder, mock.patch.dict(
+        os.environ, {"V6_SOURCE_CACHE_DIR": os.path.join(folder, "cache")}
+    ):
+        excel_file = os.path.join(folder, "data.xlsx")
+        with pd.ExcelWriter(excel_file) as writer:
+            data.to_excel(writer, sheet_name="all", index=False)
+            data.head(5).to_excel(writer, sheet_name="head", index=False)
+
+        for _ in range(2):
+            assert len(wrappers.load_excel_data(excel_file, sheet_name="all")) == len(
+                data
+            )
+            assert len(wrappers.load_excel_data(excel_file, sheet_name="head")) == 5
+        assert len(os.listdir(os.path.join(folder, "cache"))) == 2
+
+
+def test_sql_engine_is_reused():
+    with tempfile.TemporaryDirectory() as folder, mock.patch.dict(
+        os.environ, {"V6_SQL_POOL_SIZE": "2"}
+    ):
+        uri = sqlite_database(folder)
+        try:
+            first = wrappers.load_sql_data(uri, "SELECT * FROM patients")
+            second = wrappers.load_sql_data(uri, "SELECT Age FROM patients")
+            assert len(wrappers._sql_engines) == 1
+            engine = wrappers.get_sql_engine(uri)
+            assert engine.pool.size() == 2
+        finally:
+            wrappers.dispose_sql_engines()
+    pd.testing.assert_frame_equal(first, data)
+    assert second["Age"].tolist() == data["Age"].tolist()
+
+
+def test_in_memory_sqlite_accepts_the_pool_size():
+    with mock.patch.dict(os.environ, {"V6_SQL_POOL_SIZE": "2"}):
+        try:
+            result = wrappers.load_sql_data("sqlite://", "SELECT 1 AS one")
+        finally:
+            wrappers.dispose_sql_engines()
+    assert result["one"].tolist() == [1]
+
+
+def test_forked_process_does_not_inherit_sql_engines():
+    with tempfile.TemporaryDirectory() as folder:
+        uri = sqlite_database(folder)
+        try:
+            wrappers.load_sql_data(uri, "SELECT * FROM patients")
+            pid = os.fork()
+            if pid == 0:
+                # the exit code of the child is the number of inherited engines
+                os._exit(len(wrappers._sql_engines))
+            _, status = os.waitpid(pid, 0)
+            assert os.waitstatus_to_exitcode(status) == 0
+            assert len(wrappers._sql_engines) == 1
+        finally:
+            wrappers.dispose_sql_engines()
+
+
+def test_aggregates_are_json_serializable():
+    with tempfile.TemporaryDirectory() as folder:
+        uri = sqlite_database(folder)
+        with sqlite3.connect(os.path.join(folder, "data.db")) as connection:
+            connection.execute("CREATE TABLE visits (site BLOB, cost INTEGER)")
+            connection.executemany(
+                "INSERT INTO visits VALUES (?, ?)",
+                [(b"\x01", 10), (b"\x01", 20), (b"\x02", 5)],
+            )
+        try:
+            records = wrappers.aggregate_sql_data(
+                uri, "visits", [("sum", "cost"), ("count", None)], group_by=["site"]
+            )
+        finally:
+            wrappers.dispose_sql_engines()
+
+    assert sorted(records, key=lambda record: record["site"]) == [
+        {"site": "01", "sum_cost": 30, "count": 2},
+        {"site": "02", "sum_cost": 5, "count": 1},
+    ]
+    values = [
+        Decimal("1.5"),
+        datetime.date(2024, 1, 31),
+        datetime.datetime(2024, 1, 31, 12, 30),
+        datetime.timedelta(minutes=1),
+        memoryview(b"\xff"),
+    ]
+    assert json.loads(json.dumps([wrappers._json_safe(value) for value in values])) == [
+        1.5,
+        "2024-01-31",
+        "2024-01-31T12:30:00",
+        60.0,
+        "ff",
+    ]
+
+
+@pytest.mark.parametrize(
+    "aggregates",
+    [
+        [],
+        "sum",
+        [("median", "Age")],
+        [("sum",)],
+        [("sum", "Age", "Height(in)")],
+        ["count"],
+        [("sum", None)],
+        [("mean", 1)],
+        [(None, "Age")],
+    ],
+)
+def test_invalid_aggregates_are_rejected(aggregates):
+    with pytest.raises(UserInputError):
+        wrappers.build_aggregate_query("patients", aggregates)
+
+
+def test_aggregates_can_be_given_as_lists():
+    query = wrappers.build_aggregate_query(
+        "patients", [["mean", "Age"], ["count", None]], group_by=["Gender"]
+    )
+    assert [column.name for column in query.selected_columns] == [
+        "Gender",
+        "mean_Age",
+        "count",
+    ]
@@ -7,33 +7,57 @@ encryption if that is enabled). From there, they are sent to the partial task
 or directly to the user (if they requested partial results).
 """
 
+from __future__ import annotations
+
+import numpy as np
 import pandas as pd
-from vantage6.algorithm.decorator import data, source_database
-from vantage6.algorithm.client import AlgorithmClient
-from vantage6.algorithm.decorator import algorithm_client, data
-import time
+from vantage6.algorithm.decorator import algorithm_client, data, source_database
 from vantage6.algorithm.decorator.action import (
     data_extraction,
     pre_processing,
     federated,
     central,
 )
-import argparse
-import csv
 import time
-import requests
-import psutil
 import os
-from typing import Any
+from typing import Any, TYPE_CHECKING
 import json
 import socket
-import platform
-import dns.resolver
-
+import base64
+import tempfile
+import hashlib
+import builtins
+
+from vantage6.common.enum import RunStatus
+from vantage6.common.globals import ContainerEnvNames
+from vantage6.common.serialization import serialize
+from vantage6.common.client.deserialization import deserialize
 from vantage6.algorithm.tools.util import info, warn, error
+from vantage6.algorithm.tools.exceptions import CollectResultsError, UserInputError
+from vantage6.algorithm.tools.wrappers import (
+    aggregate_sql_data,
+    load_csv_data,
+    load_data,
+)
+
+# requests, psutil and platform are imported by the methods that use them, so that
+# methods such as `sum` do not pay for importing them when the container starts.
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+    from vantage6.algorithm.client import AlgorithmClient
+
+# granularity of the synthetic workload loop, in seconds
+WORKLOAD_SLICE_SECONDS = 0.1
+WORKLOAD_BLOCK_BYTES = 1024 * 1024
+
+# folder (inside the session folder) where central methods cache partial results
+PARTIAL_CACHE_FOLDER = ".partial_cache"
 
 
 def get_ip_addresses(family):
+    import psutil
+
     for interface, snics in psutil.net_if_addrs().items():
         for snic in snics:
             if snic.family == family:
@@ -81,6 +105,8 @@ def is_proxy_reachable(host: str, port: int):
 
 
 def check_http_connection():
+    import requests
+
     try:
         # Attempt to reach www.google.com
         url = "http://www.google.com"
@@ -92,7 +118,7 @@ def check_http_connection():
         # If the request was successful, return True
         return response.status_code == 200
     except requests.RequestException as e:
-        print(f"HTTP connection failed: {e}")
+        warn(f"HTTP connection failed: {e}")
         return False
 
 
@@ -121,16 +147,37 @@ def external_dns_reachable():
             return False
 
     except socket.error as e:
-        print(f"Connection error (can't determine Internet connection status): {e}")
+        warn(f"Connection error (can't determine Internet connection status): {e}")
         return False
 
 
 @data_extraction
 @source_database
-def read_csv(connection_details: dict) -> dict:
+def read_csv(connection_details: dict) -> pa.Table:
     info(f"Reading CSV file from {connection_details['uri']}")
-    return pd.read_csv(connection_details["uri"])
+    # the table is written to the session as is, so a cached table is not copied
+    return load_csv_data(connection_details["uri"], as_table=True)
+
 
+@data_extraction
+@source_database
+def read_sql(
+    connection_details: dict, query: str, chunksize: int | None = None
+) -> pa.RecordBatchReader:
+    """
+    Stream the result of a query on the SQL database of the node to the session.
+
+    The rows are fetched ``chunksize`` at a time and written to the session parquet
+    file in full row groups, so the result is never completely in memory.
+    """
+    info(f"Streaming the result of the query from {connection_details['type']}")
+    return load_data(
+        connection_details["uri"],
+        connection_details["type"],
+        query=query,
+        stream=True,
+        chunksize=chunksize,
+    )
 
 
 @data_extraction
@@ -141,8 +188,8 @@ def slow_read_csv(connection_details: dict) -> dict:
     ipv6s = list(get_ip_addresses(socket.AF_INET6))
     proxy_host = os.environ.get("HOST")
     proxy_port = os.environ.get("PORT")
-    print(f"HOST env var: {proxy_host}")
-    print(f"PORT env var: {proxy_port}")
+    info(f"HOST env var: {proxy_host}")
+    info(f"PORT env var: {proxy_port}")
 
     # host includes the protocol
     if proxy_host.startswith("http://") or proxy_host.startswith("https://"):
@@ -151,42 +198,42 @@ def slow_read_csv(connection_details: dict) -> dict:
     try:
         resolved_host = socket.gethostbyname(proxy_host)
         k8s_dns_enabled = True
-        print(f">>>>>Proxy FQDN {proxy_host} solved as {resolved_host}")
+        info(f">>>>>Proxy FQDN {proxy_host} solved as {resolved_host}")
     except socket.gaierror:
-        print(f"Unable to resolve Proxy FQDN {proxy_host} - DNS disabled for this POD")
+        warn(f"Unable to resolve Proxy FQDN {proxy_host} - DNS disabled for this POD")
         k8s_dns_enabled = False
-    
-    print(f"Host architecture:{platform.uname()[4]}")
-    print("IPv4 Addresses:")
+
+    import platform
+
+    info(f"Host architecture:{platform.uname()[4]}")
+    info("IPv4 Addresses:")
     for interface, ipv4 in ipv4s:
-        print(f"{interface}: {ipv4}")
+        info(f"{interface}: {ipv4}")
 
-    print("\nIPv6 Addresses:")
+    info("IPv6 Addresses:")
     for interface, ipv6 in ipv6s:
-        print(f"{interface}: {ipv6}")
+        info(f"{interface}: {ipv6}")
 
     external_dns_enabled = external_dns_reachable()
-    print(
+    info(
         f'External DNS reachable (socket connection to port 53 test) :{"ENABLED" if external_dns_reachable else "DISABLED"}'
     )
 
     http_outbound_connection = check_http_connection()
-    print(
+    info(
         f'Internet access (http connection test) :{"ENABLED" if http_outbound_connection else "DISABLED"}'
     )
 
     proxy_rechable = is_proxy_reachable(proxy_host, proxy_port)
-    print(
+    info(
         f'V6-proxy status :{f"REACHABLE at {proxy_host}:{proxy_port}" if proxy_rechable else f"DISABLED or unreachable at {proxy_host}:{proxy_port}"}'
     )
 
-
     info(f"Slowly reading CSV file from {connection_details['uri']}...")
     time.sleep(300)
     return pd.read_csv(connection_details["uri"])
 
 
-
 # @data_extraction
 # @source_database
 # def read_csv(database_uri: str) -> dict:
@@ -208,7 +255,7 @@ def pre_process2(df1: pd.DataFrame, column, new_column) -> pd.DataFrame:
 
 
 @federated
-@data(1)
+@data(1, column_args=["column"])
 def sum(df1: pd.DataFrame, column) -> dict:
     return {"sum": int(df1[column].sum())}
 
@@ -220,20 +267,20 @@ def echo(df1: pd.DataFrame, input) -> dict:
 
 
 @federated
-@data(1)
+@data(1, column_args=["column"])
 def len(df1: pd.DataFrame, column) -> dict:
     return {"len": int(df1[column].size), "data": 5}
 
 
 @federated
-@data(1)
+@data(1, column_args=["column"])
 def fed_avg(df1: pd.DataFrame, column) -> dict:
     numbers = df1[column]
     return {"len": int(numbers.size), "data": int(numbers.sum())}
 
 
 @federated
-@data(1)
+@data(1, column_args=["column"])
 def federated_avg(df1: pd.DataFrame, column) -> dict:
     # extract the column numbers from the CSV
     numbers = df1[column]
@@ -242,8 +289,8 @@ def federated_avg(df1: pd.DataFrame, column) -> dict:
     local_sum = numbers.sum()
     local_count = numbers.size
 
-    print(f">>>>>>>>>localsum:{local_sum}, {type(local_sum)}")
-    print(f">>>>>>>>>localcount:{local_count}, {type(local_count)}")
+    info(f">>>>>>>>>localsum:{local_sum}, {type(local_sum)}")
+    info(f">>>>>>>>>localcount:{local_count}, {type(local_count)}")
 
     time.sleep(15)
 
@@ -251,6 +298,207 @@ def federated_avg(df1: pd.DataFrame, column) -> dict:
     return {"sum": int(local_sum), "count": int(local_count)}
 
 
+@federated
+@data(1, column_args=["feature_columns", "target_column"])
+def gram_matrix(
+    df1: pd.DataFrame,
+    feature_columns: list[str],
+    target_column: str,
+    fit_intercept: bool = True,
+    chunk_size: int | None = None,
+) -> dict:
+    """
+    Compute the local X^T X and X^T y for a linear regression.
+
+    The matrices are accumulated over blocks of ``chunk_size`` rows so that only one
+    block is converted to a dense float64 array at a time. When ``chunk_size`` is not
+    given the whole dataframe is processed as a single block.
+    """
+    # note that `len` and `sum` are shadowed by the federated methods in this module
+    rows = df1[[*feature_columns, target_column]].dropna()
+    n_rows, n_columns = rows.shape
+    n_features = n_columns - 1 + int(fit_intercept)
+    xtx = np.zeros((n_features, n_features), dtype=np.float64)
+    xty = np.zeros(n_features, dtype=np.float64)
+
+    if chunk_size is not None and int(chunk_size) <= 0:
+        raise ValueError(f"chunk_size must be a positive number, got {chunk_size}")
+    step = int(chunk_size) if chunk_size else max(n_rows, 1)
+
+    for start in range(0, n_rows, step):
+        block = rows.iloc[start : start + step].to_numpy(dtype=np.float64)
+        x = block[:, :-1]
+        y = block[:, -1]
+        if fit_intercept:
+            x = np.column_stack((np.ones(x.shape[0]), x))
+        # matmul dispatches to the BLAS gemm/gemv routines numpy is linked against
+        xtx += x.T @ x
+        xty += x.T @ y
+
+    return {"xtx": xtx, "xty": xty, "count": n_rows}
+
+
+def _workload_memory_target(profile: str, progress: float, memory_bytes: int) -> int:
+    """Number of bytes that should be allocated at ``progress`` (0-1) of the run."""
+    if profile == "constant":
+        return memory_bytes
+    elif profile == "ramp":
+        return int(memory_bytes * progress)
+    elif profile == "spike":
+        # hold the full allocation during the middle fifth of the run only
+        return memory_bytes if 0.4 <= progress < 0.6 else 0
+    raise ValueError(
+        f"Unknown memory profile '{profile}'. Use 'constant', 'ramp' or 'spike'."
+    )
+
+
+@federated
+def workload(
+    duration: float = 10,
+    cpu_load: float = 1.0,
+    memory_mb: int = 0,
+    memory_profile: str = "constant",
+    io_mb: int = 0,
+    payload_kb: int = 0,
+) -> dict:
+    """Generate a synthetic CPU, memory, I/O and payload load for capacity testing."""
+    import psutil
+
+    cpu_load = min(max(float(cpu_load), 0.0), 1.0)
+    memory_bytes = int(memory_mb) * WORKLOAD_BLOCK_BYTES
+    io_bytes = int(io_mb) * WORKLOAD_BLOCK_BYTES
+    # fail early on an unknown memory profile
+    _workload_memory_target(memory_profile, 0.0, memory_bytes)
+
+    folder = os.environ.get(ContainerEnvNames.SESSION_FOLDER.value) or (
+        tempfile.gettempdir()
+    )
+    io_block = np.random.default_rng().bytes(WORKLOAD_BLOCK_BYTES)
+    process = psutil.Process()
+    rng = np.random.default_rng()
+    matrix = rng.standard_normal((256, 256))
+    scratch = rng.standard_normal((256, 256))
+
+    blocks = []
+    allocated = peak_allocated = 0
+    peak_rss = process.memory_info().rss
+    written = read = cpu_iterations = 0
+    cpu_start = time.process_time()
+
+    info(
+        f"Generating workload for {duration}s: cpu_load={cpu_load}, "
+        f"memory={memory_mb}MB ({memory_profile}), io={io_mb}MB, "
+        f"payload={payload_kb}kB"
+    )
+    fd, scratch_file = tempfile.mkstemp(prefix="workload-", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            start = time.monotonic()
+            while (elapsed := time.monotonic() - start) < duration:
+                progress = elapsed / duration
+
+                target = _workload_memory_target(memory_profile, progress, memory_bytes)
+                while allocated < target:
+                    # np.ones writes every page, so the memory is actually resident
+                    blocks.append(np.ones(WORKLOAD_BLOCK_BYTES, dtype=np.uint8))
+                    allocated += WORKLOAD_BLOCK_BYTES
+                while blocks and allocated - WORKLOAD_BLOCK_BYTES >= target:
+                    blocks.pop()
+                    allocated -= WORKLOAD_BLOCK_BYTES
+                peak_allocated = max(peak_allocated, allocated)
+
+                while written < min(io_bytes, int(io_bytes * progress)):
+                    fp.write(io_block)
+                    written += WORKLOAD_BLOCK_BYTES
+
+                slice_start = time.monotonic()
+                busy_until = slice_start + cpu_load * WORKLOAD_SLICE_SECONDS
+                while time.monotonic() < busy_until:
+                    scratch = np.tanh(matrix @ scratch)
+                    cpu_iterations += 1
+
+                peak_rss = max(peak_rss, process.memory_info().rss)
+                idle = WORKLOAD_SLICE_SECONDS - (time.monotonic() - slice_start)
+                if idle > 0:
+                    time.sleep(idle)
+
+            while written < io_bytes:
+                fp.write(io_block)
+                written += WORKLOAD_BLOCK_BYTES
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        buffer = bytearray(WORKLOAD_BLOCK_BYTES)
+        with open(scratch_file, "rb") as fp:
+            while n_bytes := fp.readinto(buffer):
+                read += n_bytes
+    finally:
+        os.remove(scratch_file)
+        blocks.clear()
+
+    wall_time = time.monotonic() - start
+    cpu_time = time.process_time() - cpu_start
+    # base64 encodes 3 bytes as 4 characters, so this yields payload_kb of text
+    payload = base64.b64encode(os.urandom(int(payload_kb) * 1024 * 3 // 4)).decode()
+
+    report = {
+        "wall_time_s": wall_time,
+        "cpu_time_s": cpu_time,
+        "cpu_utilization": cpu_time / wall_time if wall_time else 0.0,
+        "cpu_iterations": cpu_iterations,
+        # a 256x256 matmul followed by tanh is ~2 * 256^3 floating point operations
+        "gflops": cpu_iterations * 2 * 256**3 / wall_time / 1e9 if wall_time else 0.0,
+        "peak_allocated_mb": peak_allocated / WORKLOAD_BLOCK_BYTES,
+        "peak_rss_mb": peak_rss / WORKLOAD_BLOCK_BYTES,
+        "io_written_mb": written / WORKLOAD_BLOCK_BYTES,
+        "io_read_mb": read / WORKLOAD_BLOCK_BYTES,
+        # `len` is shadowed by the federated method of this module
+        "payload_bytes": builtins.len(payload.encode()),
+    }
+    info(f"Workload finished: {json.dumps(report)}")
+    return {"report": report, "payload": payload}
+
+
+@federated
+@data(1, column_args=["columns"])
+def federated_sum_count(df1: pd.DataFrame, columns: list[str]) -> dict:
+    """Per-column sum and row count, used by ``central_average``."""
+    numbers = df1[columns]
+    sums = numbers.sum().tolist()
+    count = int(numbers.shape[0])
+    return {
+        column: {"sum": column_sum, "count": count}
+        for column, column_sum in zip(columns, sums)
+    }
+
+
+@data_extraction
+@source_database
+def sql_aggregate(
+    connection_details: dict,
+    table: str,
+    aggregates: list[list[str | None]],
+    group_by: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Extract aggregates of a table of a SQL source database, computed by the database.
+
+    Unlike ``read_sql``, the rows of the table are not extracted to the session:
+    only the aggregates leave the database. ``aggregates`` are ``[function, column]``
+    pairs with function 'sum', 'count', 'mean', 'min' or 'max'; ``["count", None]``
+    counts the rows. The session dataframe has one row per group, with the group
+    columns and a '<function>_<column>' column per aggregate, which federated
+    methods such as ``sum`` can combine over the nodes. To combine means, also
+    request the ``count`` of the column.
+    """
+    if connection_details["type"] != "sql":
+        raise UserInputError(
+            f"sql_aggregate needs a SQL database, got '{connection_details['type']}'"
+        )
+    records = aggregate_sql_data(connection_details["uri"], table, aggregates, group_by)
+    return pd.DataFrame(records)
+
+
 @federated
 def network_status(sleep_time: int):
 
@@ -258,48 +506,48 @@ def network_status(sleep_time: int):
     ipv6s = list(get_ip_addresses(socket.AF_INET6))
     proxy_host = os.environ.get("HOST")
     proxy_port = os.environ.get("PORT")
-    print(f"HOST env var: {proxy_host}")
-    print(f"PORT env var: {proxy_port}")
+    info(f"HOST env var: {proxy_host}")
+    info(f"PORT env var: {proxy_port}")
 
     # host includes the protocol
     if proxy_host.startswith("http://") or proxy_host.startswith("https://"):
         proxy_host = proxy_host.split("://", 1)[1]
 
-    
-
     try:
         resolved_host = socket.gethostbyname(proxy_host)
         k8s_dns_enabled = True
-        print(f">>>>>Proxy FQDN {proxy_host} solved as {resolved_host}")
+        info(f">>>>>Proxy FQDN {proxy_host} solved as {resolved_host}")
     except socket.gaierror:
-        print(f"Unable to resolve Proxy FQDN {proxy_host} - DNS disabled for this POD")
+        warn(f"Unable to resolve Proxy FQDN {proxy_host} - DNS disabled for this POD")
         k8s_dns_enabled = False
-    
-    print(f"Host architecture:{platform.uname()[4]}")
-    print("IPv4 Addresses:")
+
+    import platform
+
+    info(f"Host architecture:{platform.uname()[4]}")
+    info("IPv4 Addresses:")
     for interface, ipv4 in ipv4s:
-        print(f"{interface}: {ipv4}")
+        info(f"{interface}: {ipv4}")
 
-    print("\nIPv6 Addresses:")
+    info("IPv6 Addresses:")
     for interface, ipv6 in ipv6s:
-        print(f"{interface}: {ipv6}")
+        info(f"{interface}: {ipv6}")
 
     external_dns_enabled = external_dns_reachable()
-    print(
+    info(
         f'External DNS reachable (socket connection to port 53 test) :{"ENABLED" if external_dns_reachable else "DISABLED"}'
     )
 
     http_outbound_connection = check_http_connection()
-    print(
+    info(
         f'Internet access (http connection test) :{"ENABLED" if http_outbound_connection else "DISABLED"}'
     )
 
     proxy_rechable = is_proxy_reachable(proxy_host, proxy_port)
-    print(
+    info(
         f'V6-proxy status :{f"REACHABLE at {proxy_host}:{proxy_port}" if proxy_rechable else f"DISABLED or unreachable at {proxy_host}:{proxy_port}"}'
     )
 
-    print(f"Waiting {sleep_time} seconds before finishing the job.")
+    info(f"Waiting {sleep_time} seconds before finishing the job.")
     time.sleep(int(sleep_time))
 
     return {
@@ -313,10 +561,220 @@ def network_status(sleep_time: int):
     }
 
 
+def _dataframe_fingerprints(validation: str = "mtime") -> dict | None:
+    """
+    Fingerprint the session dataframes this task was started with.
+
+    With ``validation="mtime"`` the size and modification time of each parquet file
+    are used, with ``validation="hash"`` the SHA-256 of its content. Returns None
+    when there is no session folder to fingerprint.
+    """
+    folder = os.environ.get(ContainerEnvNames.SESSION_FOLDER.value)
+    dataframes = os.environ.get(ContainerEnvNames.USER_REQUESTED_DATAFRAMES.value)
+    if not folder or not dataframes:
+        return None
+
+    fingerprints = {}
+    for name in dataframes.split(","):
+        path = os.path.join(folder, f"{name}.parquet")
+        if not os.path.exists(path):
+            fingerprints[name] = None
+        elif validation == "hash":
+            digest = hashlib.sha256()
+            with open(path, "rb") as fp:
+                while block := fp.read(WORKLOAD_BLOCK_BYTES):
+                    digest.update(block)
+            fingerprints[name] = digest.hexdigest()
+        elif validation == "mtime":
+            stat = os.stat(path)
+            fingerprints[name] = [stat.st_size, stat.st_mtime_ns]
+        else:
+            raise ValueError(
+                f"Unknown cache validation '{validation}'. Use 'mtime' or 'hash'."
+            )
+    return fingerprints
+
+
+def _wait_for_quorum(
+    client: AlgorithmClient,
+    task_id: int,
+    quorum: int | None = None,
+    deadline: float | None = None,
+    interval: float = 1,
+) -> tuple[list, list[int]]:
+    """
+    Poll the runs of a task until a quorum of them completed or a deadline passed.
+
+    Polling stops as soon as ``quorum`` runs have completed, the quorum can no longer
+    be reached, ``deadline`` seconds have passed or all runs have finished,
+    whichever comes first. The results of the
+    runs that completed by then are returned together with the ids of the
+    organizations whose results were not included, which are also the organizations
+    whose result is empty or could not be decoded.
+    """
+    start = time.monotonic()
+    reported = -1
+    while True:
+        runs = client.run.from_task(task_id)
+        completed = [
+            run for run in runs if run.get("status") == RunStatus.COMPLETED.value
+        ]
+        finished = [run for run in runs if RunStatus.has_finished(run.get("status"))]
+
+        if builtins.len(finished) != reported:
+            reported = builtins.len(finished)
+            info(
+                f"{builtins.len(completed)}/{builtins.len(runs)} runs of task "
+                f"{task_id} completed"
+            )
+
+        if quorum is not None and builtins.len(completed) >= quorum:
+            break
+        # runs that finished without completing will never contribute a result
+        unfinished = builtins.len(runs) - builtins.len(finished)
+        if quorum is not None and builtins.len(completed) + unfinished < quorum:
+            warn(f"Quorum of {quorum} can no longer be reached for task {task_id}")
+            break
+        if builtins.len(finished) == builtins.len(runs):
+            break
+        if deadline is not None and time.monotonic() - start >= deadline:
+            warn(f"Deadline of {deadline}s passed for task {task_id}")
+            break
+        time.sleep(interval)
+
+    results = []
+    included = set()
+    for run in completed:
+        organization_id = run["organization"]["id"]
+        try:
+            result = client.result.get(run.get("id"))
+        except Exception as e:
+            warn(f"Could not get the result of organization {organization_id}: {e}")
+            continue
+        if result is None:
+            warn(f"Organization {organization_id} completed without a result")
+            continue
+        results.append(result)
+        included.add(organization_id)
+    excluded = [
+        run["organization"]["id"]
+        for run in runs
+        if run["organization"]["id"] not in included
+    ]
+    if excluded:
+        info(f"Aggregating without the results of organizations {excluded}")
+    return results, excluded
+
+
+def _run_partial(
+    client: AlgorithmClient,
+    method: str,
+    input_: dict,
+    name: str = "subtask",
+    use_cache: bool = False,
+    cache_validation: str = "mtime",
+    quorum: int | None = None,
+    deadline: float | None = None,
+) -> tuple[list, list[int]]:
+    """
+    Run ``method`` as a subtask on all organizations and collect the results.
+
+    Returns the results and the ids of the organizations whose result is missing.
+    By default all organizations are waited for. When ``quorum`` (a number of
+    organizations) and/or ``deadline`` (in seconds) is given, the results are
+    collected as soon as ``quorum`` organizations completed or the deadline passed,
+    and the remaining organizations are excluded. If fewer than ``quorum``
+    organizations returned a result, a ``CollectResultsError`` is raised.
+
+    When ``use_cache`` is set, the decoded results are stored in the session folder
+    and reused by later calls with the same session, dataframes, method, input and
+    organizations, until one of the dataframes changes. Changes are detected by the
+    parquet file size and mtime, or by the content hash when
+    ``cache_validation="hash"``. The central container can only see the dataframes
+    of its own node; as session dataframes are built by the same steps on every
+    node, those stand in for the dataframe version of the whole session.
+    """
+    # Collect all organization that participate in this collaboration.
+    # These organizations will receive the task to compute the partial.
+    organizations = client.organization.list()
+    ids = [organization.get("id") for organization in organizations]
+
+    cache_file = fingerprints = None
+    if use_cache:
+        fingerprints = _dataframe_fingerprints(cache_validation)
+        if fingerprints is None:
+            warn("No session dataframes found, partial results are not cached")
+        else:
+            key = json.dumps(
+                {
+                    "session": getattr(client, "session_id", None),
+                    "dataframes": sorted(fingerprints),
+                    "method": method,
+                    "input": input_,
+                    "organizations": ids,
+                },
+                sort_keys=True,
+            )
+            cache_folder = os.path.join(
+                os.environ[ContainerEnvNames.SESSION_FOLDER.value],
+                PARTIAL_CACHE_FOLDER,
+            )
+            cache_file = os.path.join(
+                cache_folder, f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+            )
+
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file, "rb") as fp:
+            cached = deserialize(fp)
+        if cached["fingerprints"] == fingerprints:
+            info(f"Using cached partial results of '{method}'")
+            return cached["results"], []
+        info(f"Session dataframes changed, discarding cached results of '{method}'")
+
+    task = client.task.create(
+        name=name,
+        description="subtask",
+        organizations=ids,
+        method=method,
+        input_=input_,
+    )
+
+    info(f"Waiting for results...{task.get('id')}")
+    if quorum is None and deadline is None:
+        results = client.wait_for_results(task_id=task.get("id"))
+        excluded = []
+    else:
+        results, excluded = _wait_for_quorum(
+            client, task.get("id"), quorum=quorum, deadline=deadline
+        )
+    if not results:
+        raise CollectResultsError(f"No organization returned a result for '{method}'")
+    if quorum is not None and builtins.len(results) < quorum:
+        raise CollectResultsError(
+            f"Only {builtins.len(results)} organizations returned a result for "
+            f"'{method}', while a quorum of {quorum} is required"
+        )
+    info("Partial results are in!")
+
+    # incomplete results depend on timing, so only complete results are cached
+    if cache_file and not excluded:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        # write to a temporary file first so that readers never see a partial file
+        with open(f"{cache_file}.tmp", "wb") as fp:
+            fp.write(
+                serialize(
+                    {"fingerprints": fingerprints, "results": results}, typed=True
+                )
+            )
+        os.replace(f"{cache_file}.tmp", cache_file)
+
+    return results, excluded
+
+
 @central
 @algorithm_client
 def sleep(client: AlgorithmClient, sleep_time: int):
-    print(f">>>> Sleeping for {sleep_time} seconds")
+    info(f">>>> Sleeping for {sleep_time} seconds")
     time.sleep(sleep_time)
 
 
@@ -328,8 +786,8 @@ def central_network_diagnostics(client: AlgorithmClient, sleep_time: int):
     ipv6s = list(get_ip_addresses(socket.AF_INET6))
     proxy_host = os.environ.get("HOST")
     proxy_port = os.environ.get("PORT")
-    print(f"HOST env var: {proxy_host}")
-    print(f"PORT env var: {proxy_port}")
+    info(f"HOST env var: {proxy_host}")
+    info(f"PORT env var: {proxy_port}")
 
     # host includes the protocol
     if proxy_host.startswith("http://") or proxy_host.startswith("https://"):
@@ -337,31 +795,33 @@ def central_network_diagnostics(client: AlgorithmClient, sleep_time: int):
 
     try:
         resolved_host = socket.gethostbyname(proxy_host)
-        print(f">>>>>Proxy FQDN {proxy_host} solved as {resolved_host}")
+        info(f">>>>>Proxy FQDN {proxy_host} solved as {resolved_host}")
     except socket.gaierror:
-        print(f"Unable to resolve Proxy FQDN {proxy_host} - DNS disabled for this POD")
+        warn(f"Unable to resolve Proxy FQDN {proxy_host} - DNS disabled for this POD")
 
-    print(f"Host architecture:{platform.uname()[4]}")
-    print("IPv4 Addresses:")
+    import platform
+
+    info(f"Host architecture:{platform.uname()[4]}")
+    info("IPv4 Addresses:")
     for interface, ipv4 in ipv4s:
-        print(f"{interface}: {ipv4}")
+        info(f"{interface}: {ipv4}")
 
-    print("\nIPv6 Addresses:")
+    info("IPv6 Addresses:")
     for interface, ipv6 in ipv6s:
-        print(f"{interface}: {ipv6}")
+        info(f"{interface}: {ipv6}")
 
     external_dns_enabled = external_dns_reachable()
-    print(
+    info(
         f'External DNS reachable (socket connection to port 53 test) :{"ENABLED" if external_dns_reachable else "DISABLED"}'
     )
 
     http_outbound_connection = check_http_connection()
-    print(
+    info(
         f'Internet access (http connection test) :{"ENABLED" if http_outbound_connection else "DISABLED"}'
     )
 
     proxy_rechable = is_proxy_reachable(proxy_host, proxy_port)
-    print(
+    info(
         f'V6-proxy status :{f"REACHABLE at {proxy_host}:{proxy_port}" if proxy_rechable else f"DISABLED or unreachable at {proxy_host}:{proxy_port}"}'
     )
 
@@ -377,7 +837,7 @@ def central_network_diagnostics(client: AlgorithmClient, sleep_time: int):
     # Info messages can help you when an algorithm crashes. These info
     # messages are stored in a log file which is send to the server when
     # either a task finished or crashes.
-    print("Collecting participating organizations")
+    info("Collecting participating organizations")
 
     # Collect all organization that participate in this collaboration.
     # These organizations will receive the task to compute the partial.
@@ -404,7 +864,7 @@ def central_network_diagnostics(client: AlgorithmClient, sleep_time: int):
     for partial_result in results:
         output["partial_statuses"].append(partial_result)
 
-    print(f"Waiting {sleep_time} seconds before finishing the job.")
+    info(f"Waiting {sleep_time} seconds before finishing the job.")
     time.sleep(int(sleep_time))
 
     return output
@@ -412,42 +872,120 @@ def central_network_diagnostics(client: AlgorithmClient, sleep_time: int):
 
 @central
 @algorithm_client
-def central_average(client: AlgorithmClient, column_name: str):
+def central_average(
+    client: AlgorithmClient,
+    column_name: str | list[str],
+    use_cache: bool = False,
+    cache_validation: str = "mtime",
+    quorum: int | None = None,
+    deadline: float | None = None,
+):
+    """
+    Compute the global average of one or more columns.
+
+    A single column name is averaged with ``federated_avg`` and gives
+    ``{"average": ...}``. A list of columns is handled by a single
+    ``federated_sum_count`` subtask per organization and gives
+    ``{"averages": {column: average}}``. See ``_run_partial`` for the
+    ``use_cache``, ``cache_validation``, ``quorum`` and ``deadline`` options. In
+    quorum mode the ids of the organizations that were left out are returned as
+    ``excluded_organizations``.
+    """
+    columns = [column_name] if isinstance(column_name, str) else list(column_name)
 
     # Info messages can help you when an algorithm crashes. These info
     # messages are stored in a log file which is send to the server when
     # either a task finished or crashes.
-    print("Collecting participating organizations")
-
-    # Collect all organization that participate in this collaboration.
-    # These organizations will receive the task to compute the partial.
-    organizations = client.organization.list()
-    ids = [organization.get("id") for organization in organizations]
+    info("Collecting participating organizations")
 
-    task = client.task.create(
+    single_column = isinstance(column_name, str)
+    results, excluded = _run_partial(
+        client,
+        method="federated_avg" if single_column else "federated_sum_count",
+        input_={"args": [column_name if single_column else columns], "kwargs": {}},
         name="central-fedavg",
-        description="subtask",
-        organizations=ids,
-        method="federated_avg",
-        input_={
-            # "method": "federated_avg",
-            "args": [column_name],
-            "kwargs": {},
-        },
+        use_cache=use_cache,
+        cache_validation=cache_validation,
+        quorum=quorum,
+        deadline=deadline,
     )
 
-    info(f"Waiting for results...{task.get('id')}")
-    results = client.wait_for_results(task_id=task.get("id"))
-    info("Partial results are in!")
-
-    info("Computing global average")
-    global_sum = 0
-    global_count = 0
+    info(f"Computing global average of {columns}")
+    global_sum = dict.fromkeys(columns, 0)
+    global_count = dict.fromkeys(columns, 0)
     for output in results:
-        global_sum += output["sum"]
-        global_count += output["count"]
+        if single_column:
+            output = {column_name: output}
+        for column in columns:
+            global_sum[column] += output[column]["sum"]
+            global_count[column] += output[column]["count"]
+
+    info(f">>>{global_sum}")
+    info(f">>>{global_count}")
+
+    averages = {column: global_sum[column] / global_count[column] for column in columns}
+    if single_column:
+        output = {"average": averages[column_name]}
+    else:
+        output = {"averages": averages}
+    if quorum is not None or deadline is not None:
+        output["excluded_organizations"] = excluded
+    return output
+
+
+@central
+@algorithm_client
+def central_linear_regression(
+    client: AlgorithmClient,
+    feature_columns: list[str],
+    target_column: str,
+    fit_intercept: bool = True,
+    chunk_size: int | None = None,
+    use_cache: bool = False,
+    cache_validation: str = "mtime",
+    quorum: int | None = None,
+    deadline: float | None = None,
+):
+    """
+    Fit an ordinary least squares model in a single federated round.
+
+    Every organization returns its local X^T X and X^T y (see ``gram_matrix``). As
+    these are additive over rows, their sums equal the matrices of the pooled data,
+    so solving the normal equations centrally gives the pooled OLS coefficients.
+    """
+    results, excluded = _run_partial(
+        client,
+        method="gram_matrix",
+        input_={
+            "args": [feature_columns, target_column],
+            "kwargs": {"fit_intercept": fit_intercept, "chunk_size": chunk_size},
+            # send the matrices as raw float64 buffers instead of lists of numbers
+            "typed_results": True,
+        },
+        name="central-linear-regression",
+        use_cache=use_cache,
+        cache_validation=cache_validation,
+        quorum=quorum,
+        deadline=deadline,
+    )
 
-    print(f">>>{global_sum}")
-    print(f">>>{global_count}")
+    info("Solving the normal equations")
+    xtx = np.sum([np.asarray(output["xtx"]) for output in results], axis=0)
+    xty = np.sum([np.asarray(output["xty"]) for output in results], axis=0)
+    count = int(np.sum([output["count"] for output in results]))
 
-    return {"average": global_sum / global_count}
+    try:
+        coefficients = np.linalg.solve(xtx, xty)
+    except np.linalg.LinAlgError:
+        # singular system (e.g. collinear columns), fall back to least squares
+        warn("X^T X is singular, using the least squares solution instead")
+        coefficients = np.linalg.lstsq(xtx, xty, rcond=None)[0]
+
+    names = (["intercept"] if fit_intercept else []) + list(feature_columns)
+    output = {
+        "coefficients": dict(zip(names, coefficients.tolist())),
+        "count": count,
+    }
+    if quorum is not None or deadline is not None:
+        output["excluded_organizations"] = excluded
+    return output